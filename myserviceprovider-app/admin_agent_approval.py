@@ -3,32 +3,42 @@ ServiceFlow AI Admin Agent Approval Script
 Use this script to review and approve agents from the Agents-pending directory
 """
 
-import os
+import sys
 import json
-import shutil
-from pathlib import Path
+import time
+import fnmatch
+import argparse
+
+from agent_index import AgentIndex, AGENT_LOCATIONS
+from agent_batch import TransactionLog, decide, run_batch, resume_batch, rollback_batch
+from agent_prescreen import pending_agent_files, prescreen_agents
+from agent_profiler import BUDGET_MODE, check_budget, profile_agents
+from agent_watcher import PendingWatcher
 
 # Directories
-PENDING_DIR = Path("./Agents-pending")
-APPROVED_DIR = Path("./Agents")
-REJECTED_DIR = Path("./Agents-rejected")
+PENDING_DIR = AGENT_LOCATIONS["pending"]
+APPROVED_DIR = AGENT_LOCATIONS["approved"]
+REJECTED_DIR = AGENT_LOCATIONS["rejected"]
+
+PAGE_SIZE = 20
+
+_agent_index = None
 
-def list_pending_agents():
-    """List all agents pending approval"""
+def get_agent_index():
+    """Open the agent index and bring it up to date (only changed files are re-read)"""
+    global _agent_index
+    if _agent_index is None:
+        _agent_index = AgentIndex()
+        _agent_index.refresh()
+    return _agent_index
+
+def list_pending_agents(search=None, limit=-1, after=None):
+    """List agents pending approval from the index; pass limit/after to page through them"""
     if not PENDING_DIR.exists():
         print("No Agents-pending directory found.")
         return []
     
-    agents = []
-    for file in PENDING_DIR.glob("*_agent.py"):
-        config_file = PENDING_DIR / f"{file.stem.replace('_agent', '')}_config.json"
-        agents.append({
-            'python_file': file,
-            'config_file': config_file if config_file.exists() else None,
-            'name': file.stem.replace('_agent', '').replace('_', ' ').title()
-        })
-    
-    return agents
+    return get_agent_index().list_agents("pending", search=search, limit=limit, after=after)
 
 def show_agent_details(agent):
     """Show detailed information about an agent"""
@@ -36,94 +46,321 @@ def show_agent_details(agent):
     print(f"AGENT: {agent['name']}")
     print(f"{'='*60}")
     
-    # Show Python file header
-    with open(agent['python_file'], 'r') as f:
-        content = f.read()
-        if content.startswith('"""'):
-            # Extract the docstring
-            end_idx = content.find('"""', 3)
-            if end_idx != -1:
-                header = content[3:end_idx]
-                print("METADATA:")
-                print(header)
+    # Show Python file header (indexed, no file read)
+    if agent.get('header'):
+        print("METADATA:")
+        print(agent['header'])
     
     # Show config if available
-    if agent['config_file'] and agent['config_file'].exists():
-        with open(agent['config_file'], 'r') as f:
-            config = json.load(f)
-            print(f"\nCONFIGURATION:")
-            print(f"Model: {config.get('model', 'Unknown')}")
-            print(f"Tools: {', '.join(config.get('tools', []))}")
-            print(f"Description: {config.get('description', 'No description')}")
+    if agent['config_file']:
+        print(f"\nCONFIGURATION:")
+        print(f"Model: {agent.get('model') or 'Unknown'}")
+        print(f"Tools: {', '.join(agent.get('tools') or [])}")
+        print(f"Description: {agent.get('description') or 'No description'}")
     
     print(f"\nFILE LOCATION: {agent['python_file']}")
     print(f"{'='*60}")
 
+def format_profile(profile):
+    """One-line summary of an import profile"""
+    if profile.get('status') != 'ok':
+        return f"import failed ({profile.get('error')})"
+    rss = f", peak RSS {profile['peak_rss_mb']:.0f}MB" if profile.get('peak_rss_mb') is not None else ""
+    return f"import {profile['import_seconds']:.2f}s, {profile['module_count']} modules{rss}"
+
 def approve_agent(agent):
-    """Approve an agent and move it to the main Agents directory"""
-    APPROVED_DIR.mkdir(exist_ok=True)
-    
-    # Move Python file
-    new_python_path = APPROVED_DIR / agent['python_file'].name
-    shutil.move(str(agent['python_file']), str(new_python_path))
-    
-    # Move config file if it exists
-    if agent['config_file'] and agent['config_file'].exists():
-        new_config_path = APPROVED_DIR / agent['config_file'].name
-        shutil.move(str(agent['config_file']), str(new_config_path))
-        
-        # Update status in config
-        with open(new_config_path, 'r') as f:
-            config = json.load(f)
-        config['metadata']['status'] = 'APPROVED'
-        with open(new_config_path, 'w') as f:
-            json.dump(config, f, indent=2)
+    """Profile an agent's import cost, then approve it and move it to the main Agents directory
+    
+    Returns False when the agent exceeds its budget and the approval was blocked or declined.
+    """
+    profile = profile_agents([agent['agent_id']])[agent['agent_id']]
+    violations = check_budget(profile)
+    print(f"⏱️ Profile: {format_profile(profile)}")
+    if violations:
+        for violation in violations:
+            print(f"⚠️ {violation}")
+        if BUDGET_MODE == 'block':
+            print(f"🚫 Agent '{agent['name']}' exceeds its budget and was not approved")
+            return False
+        if input("Approve anyway? (y/n): ").strip().lower() != 'y':
+            return False
+    
+    try:
+        new_python_path = decide(agent['agent_id'], 'approve')
+    except FileExistsError as e:
+        print(f"🚫 {e}; rename the agent before approving it")
+        return False
+    get_agent_index().refresh_agent(agent['agent_id'])
     
     print(f"✅ Agent '{agent['name']}' has been APPROVED and moved to {new_python_path}")
+    return True
 
 def reject_agent(agent, reason=""):
-    """Reject an agent and move it to rejected directory"""
-    REJECTED_DIR.mkdir(exist_ok=True)
-    
-    # Move Python file
-    new_python_path = REJECTED_DIR / agent['python_file'].name
-    shutil.move(str(agent['python_file']), str(new_python_path))
-    
-    # Move config file if it exists
-    if agent['config_file'] and agent['config_file'].exists():
-        new_config_path = REJECTED_DIR / agent['config_file'].name
-        shutil.move(str(agent['config_file']), str(new_config_path))
-        
-        # Update status in config
-        with open(new_config_path, 'r') as f:
-            config = json.load(f)
-        config['metadata']['status'] = 'REJECTED'
-        config['metadata']['rejection_reason'] = reason
-        with open(new_config_path, 'w') as f:
-            json.dump(config, f, indent=2)
+    """Reject an agent and move it to rejected directory
+    
+    Returns False when an agent with the same id was already rejected and the agent stays pending.
+    """
+    try:
+        new_python_path = decide(agent['agent_id'], 'reject', reason)
+    except FileExistsError as e:
+        print(f"🚫 {e}; rename the agent before rejecting it")
+        return False
+    get_agent_index().refresh_agent(agent['agent_id'])
     
     print(f"❌ Agent '{agent['name']}' has been REJECTED and moved to {new_python_path}")
     if reason:
         print(f"Reason: {reason}")
+    return True
+
+def select_agents(args):
+    """Agent ids named on the command line, or every pending agent matching the selector"""
+    if args.agents:
+        agent_ids = args.agents
+    elif args.all or args.match or args.model or args.search or args.prescreen:
+        agents = get_agent_index().list_agents("pending", model=args.model, search=args.search, limit=-1)
+        agent_ids = [agent['agent_id'] for agent in agents]
+        if args.match:
+            agent_ids = [agent_id for agent_id in agent_ids if fnmatch.fnmatch(agent_id, args.match)]
+    else:
+        return []
+    
+    if args.prescreen:
+        selected = set(agent_ids)
+        results, _ = prescreen_agents([agent for agent in pending_agent_files() if agent[0] in selected])
+        agent_ids = [result['agent_id'] for result in results if result['verdict'] == args.prescreen]
+    return agent_ids
 
-def main():
-    """Main approval workflow"""
+def run_prescreen_command(args):
+    """Screen every pending agent and list the ones that need a reviewer"""
+    results, stats = prescreen_agents(workers=args.workers)
+    print(f"🔎 Screened {stats['agents']} agents in {stats['elapsed_s']}s "
+          f"({stats['screened']} analyzed, {stats['cached']} cached): {stats['flagged']} need review")
+    
+    for result in results:
+        if result['verdict'] == 'pass':
+            continue
+        print(f"\n{'❌' if result['verdict'] == 'fail' else '⚠️'} {result['agent_id']} ({result['verdict']})")
+        for issue in result['issues']:
+            line = f" line {issue['line']}" if issue['line'] else ""
+            print(f"   [{issue['severity']}] {issue['check']}{line}: {issue['message']}")
+    
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'stats': stats, 'results': results}, f, indent=2)
+        print(f"\nResults written to {args.json}")
+    return 0
+
+def run_profile_command(args):
+    """Import-profile pending agents and report the ones over budget"""
+    agent_ids = args.agents or [agent_id for agent_id, _, _ in pending_agent_files()]
+    if not agent_ids:
+        print("No agents pending approval.")
+        return 0
+    
+    profiles = profile_agents(agent_ids, workers=args.workers, refresh=args.refresh)
+    over_budget = 0
+    for agent_id, profile in profiles.items():
+        violations = check_budget(profile)
+        over_budget += bool(violations)
+        print(f"{'⚠️' if violations else '✅'} {agent_id}: {format_profile(profile)}")
+        for violation in violations:
+            print(f"   {violation}")
+        if args.verbose and profile.get('imports'):
+            for module in profile['imports']:
+                print(f"   {module['cumulative_ms']:>10.1f}ms  {module['module']}")
+    print(f"\n⏱️ Profiled {len(profiles)} agents: {over_budget} over budget")
+    
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(profiles, f, indent=2)
+        print(f"Profiles written to {args.json}")
+    return 0
+
+def enforce_budgets(agent_ids, args):
+    """Profile agents about to be approved; drops the ones over budget in block mode"""
+    mode = args.budget_mode or BUDGET_MODE
+    profiles = profile_agents(agent_ids, workers=args.profile_workers)
+    allowed = []
+    for agent_id in agent_ids:
+        violations = check_budget(profiles[agent_id])
+        for violation in violations:
+            print(f"{'🚫' if mode == 'block' else '⚠️'} {agent_id}: {violation}")
+        if not violations or mode != 'block':
+            allowed.append(agent_id)
+    return allowed
+
+def run_batch_command(args):
+    """Non-interactive approve/reject of many agents"""
+    agent_ids = select_agents(args)
+    if not agent_ids:
+        print("No agents selected. Name agents or use --all, --match, --model or --search.")
+        return 1
+    
+    if args.dry_run:
+        print(f"Would {args.command} {len(agent_ids)} agents:")
+        for agent_id in agent_ids:
+            print(f"- {agent_id}")
+        return 0
+    
+    blocked = 0
+    if args.command == 'approve' and not args.skip_profile:
+        allowed = enforce_budgets(agent_ids, args)
+        blocked = len(agent_ids) - len(allowed)
+        agent_ids = allowed
+        if blocked:
+            print(f"🚫 {blocked} agents blocked by their import budget")
+        if not agent_ids:
+            return 1
+    
+    started = time.perf_counter()
+    batch_id, results = run_batch(agent_ids, args.command, args.reason, workers=args.workers)
+    get_agent_index().refresh()
+    
+    failed = [result for result in results if result['status'] != 'ok']
+    verb = "APPROVED" if args.command == 'approve' else "REJECTED"
+    print(f"{'✅' if args.command == 'approve' else '❌'} {len(results) - len(failed)} agents {verb} "
+          f"in {time.perf_counter() - started:.2f}s (batch {batch_id})")
+    for result in failed:
+        print(f"⚠️ {result['agent_id']}: {result['error']}")
+    return 1 if failed or blocked else 0
+
+def make_pipeline(profile=False, announce=print):
+    """Watcher callbacks that index, pre-screen and optionally profile agents as they arrive"""
+    state = {}
+    
+    def index():
+        # Callbacks run on the watcher's thread, which needs its own SQLite connection
+        if 'index' not in state:
+            state['index'] = AgentIndex()
+        return state['index']
+    
+    def on_ready(agent_id, python_file, config_file):
+        index().refresh_agent(agent_id)
+        results, _ = prescreen_agents([(agent_id, python_file, config_file)])
+        result = results[0]
+        icon = {'pass': '✅', 'flag': '⚠️', 'fail': '❌'}[result['verdict']]
+        config_note = "" if config_file else " (no config)"
+        announce(f"📥 {agent_id} ready for review{config_note}: pre-screen {icon} {result['verdict']}")
+        for issue in result['issues']:
+            announce(f"   [{issue['severity']}] {issue['check']}: {issue['message']}")
+        if profile:
+            agent_profile = profile_agents([agent_id])[agent_id]
+            violations = check_budget(agent_profile)
+            announce(f"   ⏱️ {format_profile(agent_profile)}{' — over budget' if violations else ''}")
+    
+    def on_removed(agent_id):
+        index().refresh_agent(agent_id)
+        announce(f"📤 {agent_id} left the pending queue")
+    
+    return on_ready, on_removed
+
+def run_watch_command(args):
+    """Follow Agents-pending and push new submissions through pre-screening until interrupted"""
+    get_agent_index()
+    on_ready, on_removed = make_pipeline(profile=args.profile)
+    watcher = PendingWatcher(on_ready, on_removed, debounce=args.debounce, polling=args.poll,
+                             emit_existing=args.existing)
+    print(f"👀 Watching {watcher.directory} for new agents (Ctrl+C to stop)")
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+    return 0
+
+def run_recovery_command(args):
+    """Resume or roll back transactions from the log"""
+    batch_id = TransactionLog().last_batch_id() if args.batch == 'last' else args.batch
+    if args.command == 'resume':
+        agent_ids = resume_batch(batch_id)
+        print(f"🔁 Completed {len(agent_ids)} interrupted decisions")
+    else:
+        agent_ids = rollback_batch(batch_id)
+        print(f"↩️ Rolled back {len(agent_ids)} decisions; the agents are pending again")
+    for agent_id in agent_ids:
+        print(f"- {agent_id}")
+    get_agent_index().refresh()
+    return 0
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Review and approve agents from the Agents-pending directory")
+    commands = parser.add_subparsers(dest="command")
+    
+    for action in ('approve', 'reject'):
+        batch = commands.add_parser(action, help=f"{action.title()} agents without prompting")
+        batch.add_argument("agents", nargs="*", help="Agent ids (file name without _agent.py)")
+        batch.add_argument("--all", action="store_true", help="Select every pending agent (combine with filters)")
+        batch.add_argument("--match", help="Glob on agent ids, e.g. 'spam_*'")
+        batch.add_argument("--model", help="Only agents configured for this model")
+        batch.add_argument("--search", help="Only agents whose id, name or description contains this text")
+        batch.add_argument("--prescreen", choices=("pass", "flag", "fail"),
+                           help="Only agents with this pre-screen verdict")
+        batch.add_argument("--reason", default="", help="Recorded in rejected agents' config")
+        batch.add_argument("--workers", type=int, default=8, help="Agents processed in parallel")
+        batch.add_argument("--dry-run", action="store_true", help="List the selected agents and exit")
+        if action == 'approve':
+            batch.add_argument("--budget-mode", choices=("warn", "block"),
+                               help=f"What to do with agents over their import budget (default: {BUDGET_MODE})")
+            batch.add_argument("--profile-workers", type=int, default=1, help="Agents import-profiled in parallel")
+            batch.add_argument("--skip-profile", action="store_true", help="Approve without import profiling")
+    
+    prescreen = commands.add_parser('prescreen', help="Run automated checks over every pending agent")
+    prescreen.add_argument("--workers", type=int, help="Worker processes (default: all cores)")
+    prescreen.add_argument("--json", help="Also write the results to this file")
+    
+    profile = commands.add_parser('profile', help="Measure import time and memory of pending agents")
+    profile.add_argument("agents", nargs="*", help="Agent ids (default: every pending agent)")
+    profile.add_argument("--workers", type=int, default=1, help="Agents profiled in parallel")
+    profile.add_argument("--refresh", action="store_true", help="Re-profile agents that already have a profile")
+    profile.add_argument("--verbose", action="store_true", help="List each agent's imports by cost")
+    profile.add_argument("--json", help="Also write the profiles to this file")
+    
+    for command, help_text in (('resume', "Finish decisions interrupted by a crash"),
+                               ('rollback', "Undo interrupted decisions, or a whole batch with --batch")):
+        recovery = commands.add_parser(command, help=help_text)
+        recovery.add_argument("--batch", help="Batch id from the transaction log, or 'last'")
+    
+    watch = commands.add_parser('watch', help="Pre-screen new submissions as they arrive in Agents-pending")
+    watch.add_argument("--profile", action="store_true", help="Also import-profile each new agent")
+    watch.add_argument("--existing", action="store_true", help="Process agents already pending at startup")
+    watch.add_argument("--debounce", type=float, help="Seconds an agent's files must be quiet before processing")
+    watch.add_argument("--poll", action="store_true", help="Poll the directory instead of using inotify")
+    
+    parser.add_argument("--watch", action="store_true",
+                        help="Interactive review: pick up new submissions while reviewing")
+    
+    return parser.parse_args(argv)
+
+def interactive_review(watch=False):
+    """Interactive approval workflow; with `watch` new submissions appear without a restart"""
     print("🤖 ServiceFlow AI Agent Approval System")
     print("=" * 40)
     
-    pending_agents = list_pending_agents()
-    
-    if not pending_agents:
+    if not list_pending_agents(limit=1) and not watch:
         print("No agents pending approval.")
         return
     
-    print(f"Found {len(pending_agents)} agents pending approval:\n")
+    index = get_agent_index()
+    watcher = PendingWatcher(*make_pipeline()).start() if watch else None
+    search = None
+    page_starts = [None]
+    
+    def show_page():
+        agents = list_pending_agents(search=search, limit=PAGE_SIZE, after=page_starts[-1])
+        total = index.count("pending", search=search)
+        first = (len(page_starts) - 1) * PAGE_SIZE
+        filter_note = f" matching '{search}'" if search else ""
+        print(f"\nFound {total} agents pending approval{filter_note} (showing {first + 1}-{first + len(agents)}):\n")
+        for i, agent in enumerate(agents, 1):
+            print(f"{i}. {agent['name']}")
+        return agents
     
-    for i, agent in enumerate(pending_agents, 1):
-        print(f"{i}. {agent['name']}")
+    pending_agents = show_page()
     
     print("\nCommands:")
     print("- Enter number to review agent")
+    print("- 'n' / 'p' for the next / previous page")
+    print("- 'r' to reload the page (picks up new submissions in watch mode)")
+    print("- '/text' to filter by name or description ('/' clears the filter)")
     print("- 'q' to quit")
     print("- 'all' to see all agents at once")
     
@@ -134,8 +371,32 @@ def main():
             if choice == 'q':
                 break
             elif choice == 'all':
-                for agent in pending_agents:
-                    show_agent_details(agent)
+                after = None
+                while True:
+                    agents = list_pending_agents(search=search, limit=PAGE_SIZE, after=after)
+                    for agent in agents:
+                        show_agent_details(agent)
+                    if len(agents) < PAGE_SIZE:
+                        break
+                    after = agents[-1]['agent_id']
+            elif choice == 'r':
+                pending_agents = show_page()
+            elif choice == 'n':
+                if len(pending_agents) == PAGE_SIZE:
+                    page_starts.append(pending_agents[-1]['agent_id'])
+                    pending_agents = show_page()
+                else:
+                    print("Already on the last page.")
+            elif choice == 'p':
+                if len(page_starts) > 1:
+                    page_starts.pop()
+                    pending_agents = show_page()
+                else:
+                    print("Already on the first page.")
+            elif choice.startswith('/'):
+                search = choice[1:].strip() or None
+                page_starts = [None]
+                pending_agents = show_page()
             elif choice.isdigit():
                 idx = int(choice) - 1
                 if 0 <= idx < len(pending_agents):
@@ -145,16 +406,18 @@ def main():
                     action = input("\nAction? (a)pprove, (r)eject, (s)kip: ").strip().lower()
                     
                     if action == 'a':
-                        approve_agent(agent)
+                        if not approve_agent(agent):
+                            continue
                         pending_agents.pop(idx)
-                        if not pending_agents:
+                        if not index.count("pending") and not watch:
                             print("All agents have been processed!")
                             break
                     elif action == 'r':
                         reason = input("Rejection reason (optional): ").strip()
-                        reject_agent(agent, reason)
+                        if not reject_agent(agent, reason):
+                            continue
                         pending_agents.pop(idx)
-                        if not pending_agents:
+                        if not index.count("pending") and not watch:
                             print("All agents have been processed!")
                             break
                     elif action == 's':
@@ -170,6 +433,25 @@ def main():
             break
         except Exception as e:
             print(f"Error: {e}")
+    
+    if watcher is not None:
+        watcher.stop()
+
+def main(argv=None):
+    """Main approval workflow: interactive review, or a batch/recovery/watch command"""
+    args = parse_args(argv)
+    if args.command in ('approve', 'reject'):
+        return run_batch_command(args)
+    if args.command in ('resume', 'rollback'):
+        return run_recovery_command(args)
+    if args.command == 'prescreen':
+        return run_prescreen_command(args)
+    if args.command == 'profile':
+        return run_profile_command(args)
+    if args.command == 'watch':
+        return run_watch_command(args)
+    interactive_review(watch=args.watch)
+    return 0
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
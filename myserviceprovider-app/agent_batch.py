@@ -0,0 +1,258 @@
+"""
+ServiceFlow AI Agent Batch Decisions
+Crash-safe bulk approve/reject for pending agents
+
+Every decision is journaled to an append-only JSONL transaction log before any file is
+touched. The config is written atomically (temp file + rename) into the destination
+directory, then the agent file is renamed, which is the commit point, and finally the
+pending config is removed. A batch interrupted at any step can be resumed or rolled back
+from the log.
+"""
+
+import os
+import json
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from agent_index import AGENT_LOCATIONS, AGENT_SUFFIX, CONFIG_SUFFIX
+
+TRANSACTION_LOG = Path(os.getenv("AGENT_TRANSACTION_LOG", ".agent_transactions.jsonl"))
+
+# Action -> (destination location, status written to the config)
+ACTIONS = {
+    "approve": ("approved", "APPROVED"),
+    "reject": ("rejected", "REJECTED"),
+}
+
+
+class TransactionLog:
+    """Append-only JSONL journal; every record is flushed to disk before the step it guards"""
+
+    def __init__(self, path=TRANSACTION_LOG):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def append(self, record):
+        record = {**record, "logged_at": time.time()}
+        line = json.dumps(record) + "\n"
+        with self._lock:
+            with open(self.path, "a") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def records(self):
+        if not self.path.exists():
+            return []
+        records = []
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # A torn final line from a crash mid-append; everything before it is intact
+                    continue
+        return records
+
+    def unfinished(self, batch_id=None, records=None):
+        """Begin records without a matching commit or rollback, oldest first
+
+        Pass `records` already read from the log to avoid reading it again.
+        """
+        open_transactions = {}
+        for record in self.records() if records is None else records:
+            if batch_id and record.get("batch_id") != batch_id:
+                continue
+            if record["step"] == "begin":
+                open_transactions[record["txn_id"]] = record
+            elif record["step"] in ("commit", "rollback"):
+                open_transactions.pop(record["txn_id"], None)
+        return list(open_transactions.values())
+
+    def steps(self, txn_id):
+        """Names of the steps already journaled for one transaction"""
+        return {record["step"] for record in self.records() if record.get("txn_id") == txn_id}
+
+    def steps_by_transaction(self, records=None):
+        """Names of the journaled steps of every transaction, from one pass over the log"""
+        steps = {}
+        for record in self.records() if records is None else records:
+            steps.setdefault(record.get("txn_id"), set()).add(record["step"])
+        return steps
+
+    def last_batch_id(self):
+        records = self.records()
+        return records[-1].get("batch_id") if records else None
+
+
+def write_json_atomic(path, data):
+    """Write JSON to a temp file in the same directory, fsync it, then rename over `path`"""
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def _paths(agent_id, location, locations):
+    directory = locations[location]
+    return directory / f"{agent_id}{AGENT_SUFFIX}", directory / f"{agent_id}{CONFIG_SUFFIX}"
+
+
+def plan_decision(agent_id, action, reason="", batch_id=None, locations=None):
+    """Begin record for one decision, including the original config for rollback"""
+    locations = locations or AGENT_LOCATIONS
+    destination, status = ACTIONS[action]
+    python_file, config_file = _paths(agent_id, "pending", locations)
+    if not python_file.exists():
+        raise FileNotFoundError(f"{agent_id} is not pending approval")
+    if _paths(agent_id, destination, locations)[0].exists():
+        raise FileExistsError(f"{agent_id} already exists in {destination}")
+
+    original_config = None
+    if config_file.exists():
+        with open(config_file) as f:
+            original_config = json.load(f)
+
+    new_config = None
+    if original_config is not None:
+        new_config = json.loads(json.dumps(original_config))
+        metadata = new_config.setdefault("metadata", {})
+        metadata["status"] = status
+        if action == "reject":
+            metadata["rejection_reason"] = reason
+
+    return {
+        "step": "begin",
+        "txn_id": uuid.uuid4().hex,
+        "batch_id": batch_id,
+        "agent_id": agent_id,
+        "action": action,
+        "reason": reason,
+        "destination": destination,
+        "original_config": original_config,
+        "new_config": new_config,
+    }
+
+
+def apply_transaction(txn, log, locations=None, steps=None):
+    """Carry a begun transaction through to commit; every step is idempotent, so resuming is safe
+
+    Whether the config was written is read from the journal, not inferred from the files: the
+    destination may hold an unrelated agent with the same id. `steps` are the transaction's
+    journaled steps when the caller already knows them (none for a fresh decision); otherwise
+    the log is read.
+    """
+    locations = locations or AGENT_LOCATIONS
+    agent_id = txn["agent_id"]
+    pending_py, pending_config = _paths(agent_id, "pending", locations)
+    dest_py, dest_config = _paths(agent_id, txn["destination"], locations)
+    locations[txn["destination"]].mkdir(exist_ok=True)
+
+    if steps is None:
+        steps = log.steps(txn["txn_id"])
+    if txn["new_config"] is not None and "config_written" not in steps:
+        write_json_atomic(dest_config, txn["new_config"])
+        log.append({"step": "config_written", "txn_id": txn["txn_id"], "batch_id": txn["batch_id"],
+                    "agent_id": agent_id})
+    if pending_py.exists():
+        os.replace(pending_py, dest_py)
+    if pending_config.exists() and txn["new_config"] is not None:
+        pending_config.unlink()
+
+    log.append({"step": "commit", "txn_id": txn["txn_id"], "batch_id": txn["batch_id"], "agent_id": agent_id})
+    return dest_py
+
+
+def rollback_transaction(txn, log, locations=None):
+    """Return an agent to pending exactly as it was before the transaction began"""
+    locations = locations or AGENT_LOCATIONS
+    agent_id = txn["agent_id"]
+    pending_py, pending_config = _paths(agent_id, "pending", locations)
+    dest_py, dest_config = _paths(agent_id, txn["destination"], locations)
+
+    if txn["original_config"] is not None:
+        write_json_atomic(pending_config, txn["original_config"])
+    if dest_py.exists() and not pending_py.exists():
+        os.replace(dest_py, pending_py)
+    if txn["new_config"] is not None and dest_config.exists():
+        dest_config.unlink()
+
+    log.append({"step": "rollback", "txn_id": txn["txn_id"], "batch_id": txn["batch_id"], "agent_id": agent_id})
+
+
+def decide(agent_id, action, reason="", log=None, batch_id=None, locations=None):
+    """Journal and apply one approve/reject decision; returns the agent's new path"""
+    log = log or TransactionLog()
+    txn = plan_decision(agent_id, action, reason, batch_id, locations)
+    log.append(txn)
+    # Just begun, so nothing beyond the begin record is journaled yet
+    return apply_transaction(txn, log, locations, steps={"begin"})
+
+
+def run_batch(agent_ids, action, reason="", workers=8, log=None, locations=None):
+    """Apply one action to many agents concurrently; returns (batch_id, results)
+
+    Each result is {"agent_id", "status": "ok" | "error", "path" | "error"}.
+    """
+    if action not in ACTIONS:
+        raise ValueError(f"Unknown action: {action}")
+    log = log or TransactionLog()
+    batch_id = uuid.uuid4().hex
+    agent_ids = list(dict.fromkeys(agent_ids))
+
+    def run_one(agent_id):
+        try:
+            path = decide(agent_id, action, reason, log, batch_id, locations)
+            return {"agent_id": agent_id, "status": "ok", "path": str(path)}
+        except Exception as e:
+            return {"agent_id": agent_id, "status": "error", "error": str(e)}
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        results = list(executor.map(run_one, agent_ids))
+    return batch_id, results
+
+
+def resume_batch(batch_id=None, log=None, locations=None):
+    """Finish transactions a crashed run left open; returns the agent ids completed"""
+    log = log or TransactionLog()
+    records = log.records()
+    steps = log.steps_by_transaction(records)
+    completed = []
+    for txn in log.unfinished(batch_id, records):
+        apply_transaction(txn, log, locations, steps[txn["txn_id"]])
+        completed.append(txn["agent_id"])
+    return completed
+
+
+def rollback_batch(batch_id=None, log=None, locations=None):
+    """Undo a batch: open transactions first, then committed ones in reverse order
+
+    Without `batch_id` only transactions left open by a crash are rolled back.
+    """
+    log = log or TransactionLog()
+    records = log.records()
+    rolled_back = []
+    for txn in reversed(log.unfinished(batch_id, records)):
+        rollback_transaction(txn, log, locations)
+        rolled_back.append(txn["agent_id"])
+
+    if batch_id:
+        settled = {record["txn_id"]: record["step"] for record in records
+                   if record.get("batch_id") == batch_id and record["step"] in ("commit", "rollback")}
+        begins = [record for record in records
+                  if record.get("batch_id") == batch_id and record["step"] == "begin"]
+        for txn in reversed(begins):
+            if settled.get(txn["txn_id"]) == "commit":
+                rollback_transaction(txn, log, locations)
+                rolled_back.append(txn["agent_id"])
+    return rolled_back
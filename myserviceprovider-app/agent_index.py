@@ -0,0 +1,212 @@
+"""
+ServiceFlow AI Agent Index
+Persistent SQLite index of submitted agents for the admin approval tools
+
+Each agent is a `<id>_agent.py` file plus an optional `<id>_config.json`. The index keeps
+the docstring header, a config summary, status and file mtime/size, and refreshes
+incrementally: only files whose mtime or size changed are read again, and agent files are
+read only up to the end of their header.
+"""
+
+import os
+import json
+import time
+import sqlite3
+from pathlib import Path
+
+# Directories, keyed by the location name stored in the index
+AGENT_LOCATIONS = {
+    "pending": Path("./Agents-pending"),
+    "approved": Path("./Agents"),
+    "rejected": Path("./Agents-rejected"),
+}
+
+DEFAULT_INDEX_PATH = os.getenv("AGENT_INDEX_DB", ".agent_index.db")
+HEADER_BYTES = int(os.getenv("AGENT_INDEX_HEADER_BYTES", "4096"))
+
+AGENT_SUFFIX = "_agent.py"
+CONFIG_SUFFIX = "_config.json"
+
+_COLUMNS = (
+    "location", "agent_id", "name", "python_file", "config_file", "header", "model", "tools",
+    "description", "status", "py_mtime_ns", "py_size", "config_mtime_ns", "config_size", "indexed_at"
+)
+_SEARCH_COLUMNS = ("agent_id", "name", "description")
+
+
+def like_pattern(text):
+    """LIKE pattern matching `text` anywhere, with its % and _ taken literally (ESCAPE '\\')"""
+    return "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def display_name(agent_id):
+    return agent_id.replace('_', ' ').title()
+
+
+def read_header(python_file, max_bytes=HEADER_BYTES):
+    """Leading docstring of an agent file, reading at most `max_bytes`"""
+    with open(python_file, 'rb') as f:
+        head = f.read(max_bytes).decode('utf-8', errors='replace')
+    if not head.startswith('"""'):
+        return ""
+    end_idx = head.find('"""', 3)
+    # Headers longer than the read window are truncated rather than read in full
+    return head[3:end_idx] if end_idx != -1 else head[3:]
+
+
+def summarize_config(config_file):
+    """Model, tools, description and status from an agent config"""
+    with open(config_file, 'r') as f:
+        config = json.load(f)
+    metadata = config.get('metadata') or {}
+    return {
+        'model': config.get('model', 'Unknown'),
+        'tools': config.get('tools', []),
+        'description': config.get('description', 'No description'),
+        'status': metadata.get('status', 'PENDING'),
+    }
+
+
+class AgentIndex:
+    """SQLite index over the pending, approved and rejected agent directories"""
+
+    def __init__(self, db_path=None, locations=None):
+        self.db_path = db_path or DEFAULT_INDEX_PATH
+        self.locations = locations or AGENT_LOCATIONS
+        self.db = sqlite3.connect(self.db_path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS agents ("
+            "location TEXT NOT NULL, agent_id TEXT NOT NULL, name TEXT NOT NULL, "
+            "python_file TEXT NOT NULL, config_file TEXT, header TEXT, model TEXT, tools TEXT, "
+            "description TEXT, status TEXT, py_mtime_ns INTEGER, py_size INTEGER, "
+            "config_mtime_ns INTEGER, config_size INTEGER, indexed_at REAL, "
+            "PRIMARY KEY (location, agent_id))"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS agents_status ON agents (location, status, agent_id)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS agents_model ON agents (location, model, agent_id)")
+        self.db.commit()
+
+    def refresh(self, locations=None):
+        """Bring the index up to date with the directories; returns counts of changed rows"""
+        changes = {'added': 0, 'updated': 0, 'removed': 0, 'unchanged': 0}
+        with self.db:
+            for location in locations or self.locations:
+                self._refresh_location(location, changes)
+        return changes
+
+    def _refresh_location(self, location, changes):
+        directory = self.locations[location]
+        agent_files, config_files = {}, {}
+        if directory.exists():
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name.endswith(AGENT_SUFFIX):
+                        agent_files[entry.name[:-len(AGENT_SUFFIX)]] = entry
+                    elif entry.name.endswith(CONFIG_SUFFIX):
+                        config_files[entry.name[:-len(CONFIG_SUFFIX)]] = entry
+
+        known = {
+            row[0]: row[1:] for row in self.db.execute(
+                "SELECT agent_id, py_mtime_ns, py_size, config_mtime_ns, config_size FROM agents WHERE location = ?",
+                (location,)
+            )
+        }
+
+        for agent_id, entry in agent_files.items():
+            config_entry = config_files.get(agent_id)
+            py_stat = entry.stat()
+            config_stat = config_entry.stat() if config_entry else None
+            signature = (
+                py_stat.st_mtime_ns, py_stat.st_size,
+                config_stat.st_mtime_ns if config_stat else None, config_stat.st_size if config_stat else None
+            )
+            previous = known.pop(agent_id, None)
+            if previous is not None and tuple(previous) == signature:
+                changes['unchanged'] += 1
+                continue
+            self._index_agent(location, agent_id, Path(entry.path), Path(config_entry.path) if config_entry else None,
+                              signature)
+            changes['added' if previous is None else 'updated'] += 1
+
+        for agent_id in known:
+            self.db.execute("DELETE FROM agents WHERE location = ? AND agent_id = ?", (location, agent_id))
+            changes['removed'] += 1
+
+    def _index_agent(self, location, agent_id, python_file, config_file, signature):
+        header = read_header(python_file)
+        summary = {'model': None, 'tools': [], 'description': None, 'status': 'PENDING'}
+        if config_file is not None:
+            try:
+                summary = summarize_config(config_file)
+            except (OSError, ValueError) as e:
+                summary['description'] = f"Unreadable config: {e}"
+        self.db.execute(
+            f"INSERT OR REPLACE INTO agents ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+            (location, agent_id, display_name(agent_id), str(python_file),
+             str(config_file) if config_file else None, header, summary['model'], json.dumps(summary['tools']),
+             summary['description'], summary['status'], *signature, time.time())
+        )
+
+    def refresh_agent(self, agent_id):
+        """Re-index one agent in every location, e.g. after it was moved"""
+        with self.db:
+            for location, directory in self.locations.items():
+                python_file = directory / f"{agent_id}{AGENT_SUFFIX}"
+                config_file = directory / f"{agent_id}{CONFIG_SUFFIX}"
+                if not python_file.exists():
+                    self.db.execute("DELETE FROM agents WHERE location = ? AND agent_id = ?", (location, agent_id))
+                    continue
+                py_stat = python_file.stat()
+                config_stat = config_file.stat() if config_file.exists() else None
+                signature = (
+                    py_stat.st_mtime_ns, py_stat.st_size,
+                    config_stat.st_mtime_ns if config_stat else None, config_stat.st_size if config_stat else None
+                )
+                self._index_agent(location, agent_id, python_file, config_file if config_stat else None, signature)
+
+    @staticmethod
+    def _to_agent(row):
+        agent = dict(zip(_COLUMNS, row))
+        agent['python_file'] = Path(agent['python_file'])
+        agent['config_file'] = Path(agent['config_file']) if agent['config_file'] else None
+        agent['tools'] = json.loads(agent['tools'] or '[]')
+        return agent
+
+    def _filters(self, location, status, model, search):
+        clauses, params = ["location = ?"], [location]
+        if status:
+            clauses.append("status = ?")
+            params.append(status.upper())
+        if model:
+            clauses.append("model = ?")
+            params.append(model)
+        if search:
+            clauses.append("(" + " OR ".join(f"{column} LIKE ? ESCAPE '\\'" for column in _SEARCH_COLUMNS) + ")")
+            params.extend([like_pattern(search)] * len(_SEARCH_COLUMNS))
+        return clauses, params
+
+    def list_agents(self, location="pending", status=None, model=None, search=None, limit=50, after=None):
+        """One page of agents ordered by id; pass the last agent_id of a page as `after` for the next"""
+        clauses, params = self._filters(location, status, model, search)
+        if after:
+            clauses.append("agent_id > ?")
+            params.append(after)
+        rows = self.db.execute(
+            f"SELECT {', '.join(_COLUMNS)} FROM agents WHERE {' AND '.join(clauses)} ORDER BY agent_id LIMIT ?",
+            (*params, limit)
+        ).fetchall()
+        return [self._to_agent(row) for row in rows]
+
+    def count(self, location="pending", status=None, model=None, search=None):
+        clauses, params = self._filters(location, status, model, search)
+        return self.db.execute(f"SELECT COUNT(*) FROM agents WHERE {' AND '.join(clauses)}", params).fetchone()[0]
+
+    def get(self, agent_id, location="pending"):
+        row = self.db.execute(
+            f"SELECT {', '.join(_COLUMNS)} FROM agents WHERE location = ? AND agent_id = ?", (location, agent_id)
+        ).fetchone()
+        return self._to_agent(row) if row else None
+
+    def close(self):
+        self.db.close()
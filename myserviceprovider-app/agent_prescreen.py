@@ -0,0 +1,266 @@
+"""
+ServiceFlow AI Agent Pre-screening
+Automated checks over pending agents, run in a process pool across all cores
+
+Each agent file is parsed and compiled, its imports are checked against an allow-list,
+dangerous calls are flagged and its _config.json is validated. Results are cached by the
+hash of the agent and config contents (plus the rule version), so unchanged agents are
+never analyzed twice.
+"""
+
+import os
+import ast
+import json
+import time
+import sqlite3
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from agent_index import AGENT_LOCATIONS, AGENT_SUFFIX, CONFIG_SUFFIX
+
+# Bump when checks change so cached verdicts are recomputed
+RULES_VERSION = "1"
+
+DEFAULT_PRESCREEN_DB = os.getenv("AGENT_PRESCREEN_DB", ".agent_prescreen.db")
+
+# Top-level modules agents may import; extend with AGENT_IMPORT_ALLOWLIST (comma separated)
+ALLOWED_IMPORTS = frozenset({
+    "agno", "pydantic", "httpx", "requests", "openai", "anthropic",
+    "typing", "typing_extensions", "dataclasses", "enum", "abc", "functools", "itertools", "collections",
+    "json", "re", "math", "decimal", "fractions", "statistics", "random", "uuid", "hashlib", "base64",
+    "datetime", "time", "zoneinfo", "calendar", "textwrap", "string", "logging", "asyncio", "os", "pathlib",
+} | {name.strip() for name in os.getenv("AGENT_IMPORT_ALLOWLIST", "").split(",") if name.strip()})
+
+# Fully qualified calls that need a reviewer's eyes
+DANGEROUS_CALLS = {
+    "eval": "high", "exec": "high", "compile": "medium", "__import__": "high",
+    "os.system": "high", "os.popen": "high", "os.remove": "medium", "os.unlink": "medium",
+    "os.rmdir": "medium", "os.kill": "high", "os.fork": "high",
+    "shutil.rmtree": "high", "pickle.loads": "high", "pickle.load": "high", "marshal.loads": "high",
+    "importlib.import_module": "medium", "subprocess.run": "high", "subprocess.Popen": "high",
+    "subprocess.call": "high", "subprocess.check_output": "high", "socket.socket": "medium",
+}
+# Whole module families: os.exec*, os.spawn*
+DANGEROUS_PREFIXES = {"os.exec": "high", "os.spawn": "high"}
+
+CONFIG_STATUSES = ("PENDING", "APPROVED", "REJECTED")
+
+
+def _issue(check, severity, message, line=None):
+    return {"check": check, "severity": severity, "message": message, "line": line}
+
+
+def _qualified_name(node, aliases):
+    """Dotted call target with import aliases resolved (`sp.run` -> `subprocess.run`)"""
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(aliases.get(node.id, node.id))
+    return ".".join(reversed(parts))
+
+
+def _collect(tree):
+    """Imports, import aliases and calls in one walk over the tree"""
+    imports, aliases, calls = [], {}, []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call):
+            calls.append(node)
+        elif isinstance(node, ast.Import):
+            for alias in node.names:
+                imports.append((alias.name, node.lineno))
+                root = alias.name.split(".")[0]
+                aliases[alias.asname or root] = alias.name if alias.asname else root
+        elif isinstance(node, ast.ImportFrom):
+            module = node.module or ""
+            imports.append((module if not node.level else "." * node.level + module, node.lineno))
+            for alias in node.names:
+                aliases[alias.asname or alias.name] = f"{module}.{alias.name}" if module else alias.name
+    # Aliases are resolved after the walk, so imports placed below their use still count
+    return imports, [(_qualified_name(call.func, aliases), call.lineno) for call in calls]
+
+
+def check_source(source, filename="<agent>"):
+    """Syntax, compile, import allow-list and dangerous-call checks for one agent file"""
+    try:
+        tree = ast.parse(source, filename)
+        compile(tree, filename, "exec")
+    except (SyntaxError, ValueError) as e:
+        return [_issue("compile", "error", f"Does not compile: {e}", getattr(e, "lineno", None))]
+
+    imports, calls = _collect(tree)
+    issues = []
+    for module, line in imports:
+        if module.startswith("."):
+            issues.append(_issue("imports", "high", f"Relative import '{module}'", line))
+        elif module.split(".")[0] not in ALLOWED_IMPORTS:
+            issues.append(_issue("imports", "medium", f"Import '{module}' is not on the allow-list", line))
+
+    for name, line in calls:
+        if name is None:
+            continue
+        severity = DANGEROUS_CALLS.get(name)
+        if severity is None:
+            severity = next((level for prefix, level in DANGEROUS_PREFIXES.items() if name.startswith(prefix)), None)
+        if severity is not None:
+            issues.append(_issue("calls", severity, f"Calls {name}()", line))
+    return issues
+
+
+def check_config(config_text):
+    """Schema check of an agent config: model, tools and metadata.status"""
+    if config_text is None:
+        return [_issue("config", "medium", "No _config.json submitted")]
+    try:
+        config = json.loads(config_text)
+    except ValueError as e:
+        return [_issue("config", "error", f"Config is not valid JSON: {e}")]
+    if not isinstance(config, dict):
+        return [_issue("config", "error", "Config must be a JSON object")]
+
+    issues = []
+    if not isinstance(config.get("model"), str) or not config["model"].strip():
+        issues.append(_issue("config", "medium", "'model' must be a non-empty string"))
+    tools = config.get("tools")
+    if not isinstance(tools, list) or not all(isinstance(tool, str) for tool in tools):
+        issues.append(_issue("config", "medium", "'tools' must be a list of strings"))
+    metadata = config.get("metadata")
+    if not isinstance(metadata, dict):
+        issues.append(_issue("config", "medium", "'metadata' must be an object"))
+    elif metadata.get("status") not in CONFIG_STATUSES:
+        issues.append(_issue("config", "medium", f"'metadata.status' must be one of {', '.join(CONFIG_STATUSES)}"))
+    return issues
+
+
+def screen_agent(agent_id, python_file, config_file):
+    """Run every check for one agent; executed in the worker processes"""
+    with open(python_file, "rb") as f:
+        source = f.read()
+    config_text = None
+    if config_file is not None and os.path.exists(config_file):
+        with open(config_file, "r", encoding="utf-8", errors="replace") as f:
+            config_text = f.read()
+
+    issues = check_source(source, str(python_file)) + check_config(config_text)
+    if any(issue["severity"] == "error" for issue in issues):
+        verdict = "fail"
+    elif issues:
+        verdict = "flag"
+    else:
+        verdict = "pass"
+    return {"agent_id": agent_id, "verdict": verdict, "issues": issues}
+
+
+def content_hash(python_file, config_file):
+    """Cache key: agent and config bytes plus the rule version and allow-list"""
+    digest = hashlib.sha256(f"{RULES_VERSION}|{','.join(sorted(ALLOWED_IMPORTS))}|".encode())
+    with open(python_file, "rb") as f:
+        digest.update(f.read())
+    digest.update(b"\0")
+    if config_file is not None and os.path.exists(config_file):
+        with open(config_file, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+class PrescreenCache:
+    """SQLite store of screening results keyed by content hash"""
+
+    def __init__(self, db_path=None):
+        self.db = sqlite3.connect(db_path or DEFAULT_PRESCREEN_DB)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS prescreen ("
+            "content_hash TEXT PRIMARY KEY, verdict TEXT NOT NULL, issues TEXT NOT NULL, screened_at REAL NOT NULL)"
+        )
+        self.db.commit()
+
+    def get_many(self, hashes):
+        results = {}
+        hashes = list(hashes)
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(hashes), 500):
+            batch = hashes[start:start + 500]
+            rows = self.db.execute(
+                f"SELECT content_hash, verdict, issues FROM prescreen WHERE content_hash IN ({', '.join('?' * len(batch))})",
+                batch
+            )
+            for content_hash, verdict, issues in rows:
+                results[content_hash] = {"verdict": verdict, "issues": json.loads(issues)}
+        return results
+
+    def put_many(self, entries):
+        now = time.time()
+        with self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO prescreen (content_hash, verdict, issues, screened_at) VALUES (?, ?, ?, ?)",
+                [(content_hash, result["verdict"], json.dumps(result["issues"]), now) for content_hash, result in entries]
+            )
+
+    def close(self):
+        self.db.close()
+
+
+def pending_agent_files(directory=None):
+    """(agent_id, python_file, config_file or None) for every agent in a directory"""
+    directory = Path(directory or AGENT_LOCATIONS["pending"])
+    if not directory.exists():
+        return []
+    names = set(os.listdir(directory))
+    agents = []
+    for name in sorted(names):
+        if name.endswith(AGENT_SUFFIX):
+            agent_id = name[:-len(AGENT_SUFFIX)]
+            config_name = f"{agent_id}{CONFIG_SUFFIX}"
+            agents.append((agent_id, directory / name, directory / config_name if config_name in names else None))
+    return agents
+
+
+def _screen_batch(batch):
+    return [screen_agent(*agent) for agent in batch]
+
+
+def prescreen_agents(agents=None, cache=None, workers=None, batch_size=64):
+    """Screen agents in a process pool, reusing cached results; returns (results, stats)
+
+    `agents` defaults to everything in Agents-pending. Results are in input order.
+    """
+    agents = pending_agent_files() if agents is None else list(agents)
+    cache = cache or PrescreenCache()
+    started = time.perf_counter()
+
+    hashes = [content_hash(python_file, config_file) for _, python_file, config_file in agents]
+    cached = cache.get_many(set(hashes))
+    to_screen = [(agent, content) for agent, content in zip(agents, hashes) if content not in cached]
+
+    fresh = {}
+    if to_screen:
+        batches = [to_screen[i:i + batch_size] for i in range(0, len(to_screen), batch_size)]
+        # Batches amortize inter-process overhead; tiny runs stay in-process
+        if len(batches) > 1 and (workers or os.cpu_count() or 1) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                screened = executor.map(_screen_batch, [[agent for agent, _ in batch] for batch in batches])
+                for batch, batch_results in zip(batches, screened):
+                    for (_, content), result in zip(batch, batch_results):
+                        fresh[content] = result
+        else:
+            for agent, content in to_screen:
+                fresh[content] = screen_agent(*agent)
+        cache.put_many(fresh.items())
+
+    results = []
+    for (agent_id, _, _), content in zip(agents, hashes):
+        entry = fresh.get(content) or cached[content]
+        results.append({"agent_id": agent_id, "verdict": entry["verdict"], "issues": entry["issues"]})
+
+    stats = {
+        "agents": len(agents),
+        "screened": len(fresh),
+        "cached": len(agents) - len(to_screen),
+        "flagged": sum(1 for result in results if result["verdict"] != "pass"),
+        "elapsed_s": round(time.perf_counter() - started, 3),
+    }
+    return results, stats
@@ -0,0 +1,206 @@
+"""
+ServiceFlow AI Agent Import Profiler
+Measures what importing an agent costs the runtime before it is approved
+
+Each agent is imported in a fresh interpreter started with `-X importtime`, the same way
+the runtime loads approved agents (importlib.util.spec_from_file_location). The profile
+records wall-clock import time, the cost of every module the agent pulls in and the peak
+RSS of the child process. Profiles are stored outside the agent directories, one JSON file
+per agent content hash, so saving one never touches a watched file and it still applies
+after approval moves the unchanged agent. The subprocess keeps a slow or crashing import
+away from the admin process; it is not a sandbox.
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from agent_index import AGENT_LOCATIONS, AGENT_SUFFIX
+from agent_batch import write_json_atomic
+
+PROFILE_DIR = Path(os.getenv("AGENT_PROFILE_DIR", ".agent_profiles"))
+PROFILE_TIMEOUT = float(os.getenv("AGENT_PROFILE_TIMEOUT", "60"))
+TOP_MODULES = int(os.getenv("AGENT_PROFILE_TOP_MODULES", "15"))
+
+# Budgets an agent must stay within to be approved; AGENT_BUDGET_MODE is "warn" or "block"
+DEFAULT_BUDGET = {
+    "import_seconds": float(os.getenv("AGENT_IMPORT_BUDGET_SECONDS", "2.0")),
+    "peak_rss_mb": float(os.getenv("AGENT_RSS_BUDGET_MB", "300")),
+}
+BUDGET_MODE = os.getenv("AGENT_BUDGET_MODE", "warn")
+
+_START_MARKER = "agent-profile: start"
+_RESULT_MARKER = "agent-profile: result "
+
+# Runs in the child interpreter; importtime lines after the start marker belong to the agent
+_LOADER = f"""
+import os, sys, json, time, importlib.util
+try:
+    import resource
+except ImportError:
+    resource = None
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes elsewhere
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+path = sys.argv[1]
+sys.path.insert(0, os.path.dirname(path))
+baseline = peak_rss_mb()
+sys.stderr.write({_START_MARKER!r} + "\\n")
+sys.stderr.flush()
+error = None
+start = time.perf_counter()
+try:
+    spec = importlib.util.spec_from_file_location("agent_under_profile", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+except BaseException as e:
+    error = f"{{type(e).__name__}}: {{e}}"
+elapsed = time.perf_counter() - start
+sys.stdout.write("\\n" + {_RESULT_MARKER!r} + json.dumps({{
+    "import_seconds": round(elapsed, 4), "baseline_rss_mb": baseline, "peak_rss_mb": peak_rss_mb(), "error": error
+}}) + "\\n")
+"""
+
+
+def agent_hash(python_file):
+    with open(python_file, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def parse_importtime(stderr):
+    """Module import costs from `-X importtime` output that follows the start marker
+
+    Returns [{"module", "self_ms", "cumulative_ms", "depth"}] in import order; depth 0 are
+    the agent's own imports.
+    """
+    lines = stderr.splitlines()
+    if _START_MARKER in lines:
+        lines = lines[lines.index(_START_MARKER) + 1:]
+    modules = []
+    for line in lines:
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            # Header line ("self [us] | cumulative | imported package")
+            continue
+        name = fields[2].rstrip()
+        stripped = name.lstrip()
+        modules.append({
+            "module": stripped,
+            "self_ms": round(int(fields[0]) / 1000, 3),
+            "cumulative_ms": round(int(fields[1]) / 1000, 3),
+            # importtime indents nested imports by two spaces per level, after one leading space
+            "depth": (len(name) - len(stripped) - 1) // 2,
+        })
+    return modules
+
+
+def profile_agent(python_file, timeout=None):
+    """Import one agent in a fresh interpreter and return its profile"""
+    profile = {
+        "agent_hash": agent_hash(python_file),
+        "python": sys.version.split()[0],
+        "profiled_at": time.time(),
+    }
+    try:
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", _LOADER, os.path.abspath(python_file)],
+            cwd=os.path.dirname(os.path.abspath(python_file)),
+            capture_output=True, text=True, errors="replace", timeout=timeout or PROFILE_TIMEOUT
+        )
+    except subprocess.TimeoutExpired:
+        return {**profile, "status": "error", "error": f"Import did not finish within {timeout or PROFILE_TIMEOUT}s"}
+
+    result = None
+    for line in reversed(completed.stdout.splitlines()):
+        if line.startswith(_RESULT_MARKER):
+            result = json.loads(line[len(_RESULT_MARKER):])
+            break
+    if result is None:
+        # The agent killed the interpreter (os._exit, segfault) before the loader could report
+        output = [line for line in completed.stderr.splitlines()
+                  if line.strip() and not line.startswith("import time:") and line != _START_MARKER]
+        detail = f": {output[-1]}" if output else ""
+        return {**profile, "status": "error",
+                "error": f"Import aborted with exit code {completed.returncode}{detail}"}
+
+    modules = parse_importtime(completed.stderr)
+    profile.update(result)
+    profile["status"] = "error" if result["error"] else "ok"
+    profile["module_count"] = len(modules)
+    profile["imports"] = sorted((m for m in modules if m["depth"] == 0),
+                                key=lambda m: m["cumulative_ms"], reverse=True)[:TOP_MODULES]
+    profile["heaviest_modules"] = sorted(modules, key=lambda m: m["self_ms"], reverse=True)[:TOP_MODULES]
+    return profile
+
+
+def check_budget(profile, budget=None):
+    """Budget violations for a profile, as human-readable strings"""
+    budget = budget or DEFAULT_BUDGET
+    if profile.get("status") != "ok":
+        return [f"Import failed: {profile.get('error')}"]
+    violations = []
+    if profile["import_seconds"] > budget["import_seconds"]:
+        heaviest = ", ".join(m["module"] for m in profile.get("imports", [])[:3])
+        violations.append(f"Import took {profile['import_seconds']:.2f}s (budget {budget['import_seconds']:.2f}s)"
+                          + (f"; heaviest imports: {heaviest}" if heaviest else ""))
+    if profile.get("peak_rss_mb") is not None and profile["peak_rss_mb"] > budget["peak_rss_mb"]:
+        violations.append(f"Peak RSS {profile['peak_rss_mb']:.0f}MB (budget {budget['peak_rss_mb']:.0f}MB)")
+    return violations
+
+
+def _profile_path(digest, profile_dir=None):
+    return Path(profile_dir or PROFILE_DIR) / f"{digest}.json"
+
+
+def stored_profile(agent_id, location="pending", locations=None, profile_dir=None):
+    """Profile saved for the agent's current source, or None when it was never profiled"""
+    python_file = (locations or AGENT_LOCATIONS)[location] / f"{agent_id}{AGENT_SUFFIX}"
+    if not python_file.exists():
+        return None
+    try:
+        with open(_profile_path(agent_hash(python_file), profile_dir)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def store_profile(profile, profile_dir=None):
+    """Save a profile under its agent hash, atomically"""
+    path = _profile_path(profile["agent_hash"], profile_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_json_atomic(path, profile)
+
+
+def profile_agents(agent_ids, workers=1, refresh=False, locations=None, profile_dir=None):
+    """Profile pending agents, reusing stored profiles of unchanged agents; returns {agent_id: profile}
+
+    Agents are profiled `workers` at a time. Timings are most comparable with the default of 1,
+    since concurrent imports compete for CPU and disk.
+    """
+    locations = locations or AGENT_LOCATIONS
+    directory = locations["pending"]
+
+    def run_one(agent_id):
+        if not (directory / f"{agent_id}{AGENT_SUFFIX}").exists():
+            return agent_id, {"status": "error", "error": f"{agent_id} is not pending approval"}
+        profile = None if refresh else stored_profile(agent_id, "pending", locations, profile_dir)
+        if profile is None:
+            profile = profile_agent(directory / f"{agent_id}{AGENT_SUFFIX}")
+            store_profile(profile, profile_dir)
+        return agent_id, profile
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        return dict(executor.map(run_one, list(dict.fromkeys(agent_ids))))
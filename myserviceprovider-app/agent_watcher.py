@@ -0,0 +1,252 @@
+"""
+ServiceFlow AI Agent Watcher
+Event-driven tracking of the Agents-pending directory
+
+Changes arrive from inotify (via ctypes, Linux) or, where that is unavailable, from a
+lightweight mtime/size poll. Events are debounced per agent so half-written files are not
+picked up, an `_agent.py` waits briefly for its `_config.json` so the pair is handed over
+together, and each ready agent is passed to a callback exactly once per content change.
+"""
+
+import os
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+import logging
+import threading
+from pathlib import Path
+
+from agent_index import AGENT_LOCATIONS, AGENT_SUFFIX, CONFIG_SUFFIX
+
+logger = logging.getLogger(__name__)
+
+DEBOUNCE_SECONDS = float(os.getenv("AGENT_WATCH_DEBOUNCE", "0.5"))
+PAIR_TIMEOUT_SECONDS = float(os.getenv("AGENT_WATCH_PAIR_TIMEOUT", "10"))
+POLL_INTERVAL_SECONDS = float(os.getenv("AGENT_WATCH_POLL_INTERVAL", "2"))
+
+# inotify(7) event bits
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class InotifyBackend:
+    """Directory change notifications from the kernel; raises OSError where inotify is unavailable"""
+
+    name = "inotify"
+
+    def __init__(self, directory):
+        libc_name = ctypes.util.find_library("c")
+        if not libc_name:
+            raise OSError(errno.ENOSYS, "libc not found")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError(errno.ENOSYS, "inotify is not available on this platform")
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if self._libc.inotify_add_watch(self.fd, os.fsencode(directory), _WATCH_MASK) < 0:
+            err = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(err, f"inotify_add_watch failed for {directory}")
+
+    def wait(self, timeout):
+        """Names changed within `timeout` seconds, or None when the kernel queue overflowed"""
+        readable, _, _ = select.select([self.fd], [], [], max(timeout, 0))
+        if not readable:
+            return set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        names, offset = set(), 0
+        while offset < len(data):
+            _, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            if mask & IN_Q_OVERFLOW:
+                return None
+            if length:
+                names.add(os.fsdecode(data[offset:offset + length].rstrip(b"\0")))
+            offset += length
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingBackend:
+    """Fallback that compares directory entries' mtime and size every `interval` seconds"""
+
+    name = "polling"
+
+    def __init__(self, directory, interval=None):
+        self.directory = Path(directory)
+        self.interval = interval or POLL_INTERVAL_SECONDS
+        self._signatures = self._scan()
+        self._next_scan = time.monotonic() + self.interval
+
+    def _scan(self):
+        signatures = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                signatures[entry.name] = (stat.st_mtime_ns, stat.st_size)
+        return signatures
+
+    def wait(self, timeout):
+        delay = self._next_scan - time.monotonic()
+        if delay > timeout:
+            time.sleep(max(timeout, 0))
+            return set()
+        time.sleep(max(delay, 0))
+        self._next_scan = time.monotonic() + self.interval
+        signatures = self._scan()
+        previous, self._signatures = self._signatures, signatures
+        return {name for name in previous.keys() | signatures.keys() if previous.get(name) != signatures.get(name)}
+
+    def close(self):
+        pass
+
+
+def open_backend(directory, polling=False, poll_interval=None):
+    """inotify when the platform has it, otherwise polling"""
+    if not polling:
+        try:
+            return InotifyBackend(directory)
+        except OSError as e:
+            logger.info("inotify unavailable (%s); polling %s instead", e, directory)
+    return PollingBackend(directory, poll_interval)
+
+
+def _agent_id(name):
+    if name.startswith("."):
+        # Temp files from atomic writes
+        return None
+    for suffix in (AGENT_SUFFIX, CONFIG_SUFFIX):
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return None
+
+
+class PendingWatcher:
+    """Keeps the set of ready pending agents current from directory events
+
+    `on_ready(agent_id, python_file, config_file)` is called once an agent's files have been
+    quiet for `debounce` seconds and its config has arrived (or `pair_timeout` passed without
+    one; `config_file` is then None). `on_removed(agent_id)` is called when a ready agent leaves
+    the directory, e.g. after approval.
+    """
+
+    def __init__(self, on_ready, on_removed=None, directory=None, debounce=None, pair_timeout=None,
+                 polling=False, poll_interval=None, emit_existing=False):
+        self.directory = Path(directory or AGENT_LOCATIONS["pending"])
+        self.on_ready = on_ready
+        self.on_removed = on_removed
+        self.debounce = DEBOUNCE_SECONDS if debounce is None else debounce
+        self.pair_timeout = PAIR_TIMEOUT_SECONDS if pair_timeout is None else pair_timeout
+        self.polling = polling
+        self.poll_interval = poll_interval
+        self.emit_existing = emit_existing
+        self.backend = None
+        # agent_id -> signature of the files last handed to on_ready
+        self.ready = {}
+        # agent_id -> [due time, first event time]
+        self._pending = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _signature(self, agent_id):
+        signature = []
+        for suffix in (AGENT_SUFFIX, CONFIG_SUFFIX):
+            try:
+                stat = os.stat(self.directory / f"{agent_id}{suffix}")
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+    def _seed(self):
+        """Register agents already in the directory; they count as ready unless emit_existing"""
+        with os.scandir(self.directory) as entries:
+            agent_ids = {_agent_id(entry.name) for entry in entries} - {None}
+        for agent_id in sorted(agent_ids):
+            if self.emit_existing:
+                self._touch(agent_id, time.monotonic())
+            elif (self.directory / f"{agent_id}{AGENT_SUFFIX}").exists():
+                self.ready[agent_id] = self._signature(agent_id)
+
+    def _touch(self, agent_id, now):
+        entry = self._pending.setdefault(agent_id, [0, now])
+        entry[0] = now + self.debounce
+
+    def _flush(self, now):
+        for agent_id, (due, first_seen) in list(self._pending.items()):
+            if due > now:
+                continue
+            signature = self._signature(agent_id)
+            python_state, config_state = signature
+            if python_state is None:
+                del self._pending[agent_id]
+                if self.ready.pop(agent_id, None) is not None and self.on_removed:
+                    self.on_removed(agent_id)
+                continue
+            if config_state is None and now < first_seen + self.pair_timeout:
+                # Agent file without its config yet: hold it until the pair arrives or we give up
+                self._pending[agent_id][0] = first_seen + self.pair_timeout
+                continue
+            del self._pending[agent_id]
+            if self.ready.get(agent_id) == signature:
+                continue
+            self.ready[agent_id] = signature
+            config_file = self.directory / f"{agent_id}{CONFIG_SUFFIX}" if config_state else None
+            try:
+                self.on_ready(agent_id, self.directory / f"{agent_id}{AGENT_SUFFIX}", config_file)
+            except Exception:
+                logger.exception("Watcher callback failed for %s", agent_id)
+
+    def run(self):
+        """Process events until stop(); blocks the calling thread"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.backend = open_backend(self.directory, self.polling, self.poll_interval)
+        try:
+            self._seed()
+            while not self._stop.is_set():
+                now = time.monotonic()
+                next_due = min((due for due, _ in self._pending.values()), default=now + 1.0)
+                names = self.backend.wait(min(max(next_due - now, 0), 1.0))
+                now = time.monotonic()
+                if names is None:
+                    # Events were lost; re-check everything we know of or can see
+                    names = set(os.listdir(self.directory)) | {f"{agent_id}{AGENT_SUFFIX}" for agent_id in self.ready}
+                for name in names:
+                    agent_id = _agent_id(name)
+                    if agent_id is not None:
+                        self._touch(agent_id, now)
+                self._flush(now)
+        finally:
+            self.backend.close()
+
+    def start(self):
+        """Run in a daemon thread"""
+        self._thread = threading.Thread(target=self.run, name="agent-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
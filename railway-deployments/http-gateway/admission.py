@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Admission control - ServiceFlow AI
+Per-tenant rate limiting, priority classes and upstream concurrency caps for Auditooor
+
+Every request is admitted against its API key's token bucket before any work starts.
+Upstream calls (ChainGPT, RAG, OpenZeppelin) then queue for a bounded number of slots
+per upstream, served by tier priority, so paid traffic overtakes free traffic under
+load. When the estimated queue wait already exceeds the tier's latency budget the
+request is shed immediately with a Retry-After hint instead of timing out later.
+"""
+
+import os
+import math
+import time
+import heapq
+import asyncio
+import itertools
+import contextvars
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Tuple, AsyncIterator
+
+from audit_cache import TTLCache
+from rate_limits import AsyncTokenBucket
+from gateway_metrics import Counter, Gauge, Histogram
+
+ADMISSIONS = Counter("auditooor_admissions_total", "Admission decisions by tier and outcome (admitted, rate_limited, shed)", ("tier", "outcome"))
+UPSTREAM_ACTIVE = Gauge("auditooor_upstream_active", "Upstream calls currently holding a concurrency slot", ("upstream",))
+UPSTREAM_QUEUED = Gauge("auditooor_upstream_queued", "Upstream calls waiting for a concurrency slot", ("upstream",))
+UPSTREAM_QUEUE_WAIT = Histogram("auditooor_upstream_queue_wait_seconds", "Time spent waiting for an upstream slot", ("upstream",))
+
+
+@dataclass(frozen=True)
+class TierPolicy:
+    """Rate, burst and latency budget of a pricing tier; lower priority values are served first"""
+
+    name: str
+    priority: int
+    rate: float
+    burst: float
+    latency_budget: float
+
+    def __post_init__(self):
+        # A bucket that never refills would make every wait, and every Retry-After, infinite
+        if not 0 < self.rate < math.inf:
+            raise ValueError(f"Tier {self.name!r} needs a positive, finite rate; got {self.rate}")
+
+
+def _tier(name: str, priority: int, rate: float, burst: float, latency_budget: float) -> TierPolicy:
+    prefix = f"AUDITOOOR_TIER_{name.upper()}"
+    return TierPolicy(
+        name=name,
+        priority=priority,
+        rate=float(os.getenv(f"{prefix}_RPS", str(rate))),
+        burst=float(os.getenv(f"{prefix}_BURST", str(burst))),
+        latency_budget=float(os.getenv(f"{prefix}_LATENCY_BUDGET", str(latency_budget)))
+    )
+
+
+DEFAULT_TIERS = {
+    "enterprise": _tier("enterprise", 0, 10.0, 50, 60.0),
+    "paid": _tier("paid", 1, 2.0, 20, 30.0),
+    "free": _tier("free", 2, 0.2, 5, 15.0),
+}
+DEFAULT_TIER = os.getenv("AUDITOOOR_DEFAULT_TIER", "free")
+
+# Longest Retry-After ever sent, whatever the estimated wait
+MAX_RETRY_AFTER = 3600
+
+# Upstream calls made outside any admitted request (background jobs) queue behind every tier
+BACKGROUND_PRIORITY = max(tier.priority for tier in DEFAULT_TIERS.values()) + 1
+
+# Concurrent calls allowed per upstream (0 disables the cap)
+DEFAULT_UPSTREAM_CONCURRENCY = {
+    "chaingpt": int(os.getenv("AUDITOOOR_CHAINGPT_CONCURRENCY", "8")),
+    "rag": int(os.getenv("AUDITOOOR_RAG_CONCURRENCY", "16")),
+    "openzeppelin": int(os.getenv("AUDITOOOR_OPENZEPPELIN_CONCURRENCY", "8")),
+}
+
+# Upstreams each admitted operation will call, used to estimate its queue wait
+OPERATION_UPSTREAMS = {
+    "audit": ("chaingpt", "rag"),
+    "audit_incremental": ("chaingpt", "rag"),
+    "generate_with_audit": ("openzeppelin", "chaingpt", "rag"),
+    "generate_batch": ("chaingpt", "rag"),
+}
+
+
+def parse_api_keys(spec: str) -> Dict[str, str]:
+    """API key -> tier from "key1:paid,key2:enterprise" (AUDITOOOR_API_KEYS)"""
+    keys = {}
+    for entry in spec.split(","):
+        key, _, tier = entry.strip().partition(":")
+        if key:
+            keys[key] = tier or DEFAULT_TIER
+    return keys
+
+
+class AdmissionRejected(Exception):
+    """The request was refused before doing any work; surface as 429 with Retry-After"""
+
+    def __init__(self, reason: str, retry_after: float, tier: str):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(min(retry_after, MAX_RETRY_AFTER)))
+        self.tier = tier
+
+
+@dataclass
+class Admission:
+    """An admitted request: who it is for and where it queues"""
+
+    tenant: str
+    tier: TierPolicy
+    operation: str
+    bucket: AsyncTokenBucket
+
+    @property
+    def priority(self) -> int:
+        return self.tier.priority
+
+
+_CURRENT_ADMISSION: contextvars.ContextVar[Optional[Admission]] = contextvars.ContextVar("auditooor_admission", default=None)
+
+
+def current_admission() -> Optional[Admission]:
+    """The admission of the request being served in this task, if any"""
+    return _CURRENT_ADMISSION.get()
+
+
+class PriorityLimiter:
+    """Async concurrency cap whose waiters are served by priority, then arrival order"""
+
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = limit
+        self.active = 0
+        self.acquired = 0
+        # Exponentially weighted mean of how long a slot is held, for wait estimates
+        self.mean_hold = 0.0
+        self._waiters: list = []
+        self._sequence = itertools.count()
+        UPSTREAM_ACTIVE.labels(name).set_function(lambda: self.active)
+        UPSTREAM_QUEUED.labels(name).set_function(self.queued)
+
+    def queued(self, priority: Optional[int] = None) -> int:
+        """Waiters in the queue, or only those that would be served before `priority`"""
+        return sum(1 for waiter_priority, _, future in self._waiters
+                   if not future.done() and (priority is None or waiter_priority <= priority))
+
+    def estimated_wait(self, priority: int) -> float:
+        """Seconds a new call at `priority` would likely wait for a slot"""
+        if self.limit <= 0:
+            return 0.0
+        ahead = self.queued(priority)
+        if self.active < self.limit and not ahead:
+            return 0.0
+        return (ahead + 1) / self.limit * self.mean_hold
+
+    def _release(self):
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                # Hand the slot straight to the next waiter; `active` is unchanged
+                future.set_result(None)
+                return
+        self.active -= 1
+
+    @asynccontextmanager
+    async def slot(self, priority: int) -> AsyncIterator[None]:
+        if self.limit <= 0:
+            yield
+            return
+        queued_at = time.monotonic()
+        if self.active < self.limit and not self.queued():
+            self.active += 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    # Granted and cancelled in the same tick: pass the slot on
+                    self._release()
+                raise
+        UPSTREAM_QUEUE_WAIT.labels(self.name).observe(time.monotonic() - queued_at)
+        self.acquired += 1
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            held = time.monotonic() - started
+            self.mean_hold = held if self.acquired == 1 else 0.8 * self.mean_hold + 0.2 * held
+            self._release()
+
+    def stats(self) -> Dict[str, Any]:
+        queued_by_priority: Dict[int, int] = {}
+        for priority, _, future in self._waiters:
+            if not future.done():
+                queued_by_priority[priority] = queued_by_priority.get(priority, 0) + 1
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "queued": sum(queued_by_priority.values()),
+            "queued_by_priority": queued_by_priority,
+            "acquired": self.acquired,
+            "mean_hold_ms": round(self.mean_hold * 1000, 2)
+        }
+
+
+class AdmissionController:
+    """Admits requests per API key and owns the per-upstream concurrency limiters"""
+
+    def __init__(self, tiers: Optional[Dict[str, TierPolicy]] = None, api_keys: Optional[Dict[str, str]] = None,
+                 upstream_concurrency: Optional[Dict[str, int]] = None, max_tenants: Optional[int] = None):
+        self.tiers = tiers or DEFAULT_TIERS
+        self.api_keys = api_keys if api_keys is not None else parse_api_keys(os.getenv("AUDITOOOR_API_KEYS", ""))
+        self.default_tier = self.tiers.get(DEFAULT_TIER) or max(self.tiers.values(), key=lambda tier: tier.priority)
+        concurrency = {**DEFAULT_UPSTREAM_CONCURRENCY, **(upstream_concurrency or {})}
+        self.upstreams = {name: PriorityLimiter(name, limit) for name, limit in concurrency.items()}
+        # Idle tenants' buckets expire; a returning tenant simply starts with a full bucket
+        self.buckets = TTLCache(
+            max_entries=max_tenants or int(os.getenv("AUDITOOOR_MAX_TENANTS", "10000")),
+            ttl_seconds=3600
+        )
+        self.outcomes: Dict[Tuple[str, str], int] = {}
+
+    def resolve(self, api_key: Optional[str], client: Optional[str] = None) -> Tuple[str, TierPolicy]:
+        """Tenant id and tier; unknown or missing keys are metered per client address at the default tier"""
+        tier_name = self.api_keys.get(api_key) if api_key else None
+        if tier_name is not None and tier_name in self.tiers:
+            return f"key:{api_key}", self.tiers[tier_name]
+        return f"anonymous:{client or 'unknown'}", self.default_tier
+
+    def _bucket(self, tenant: str, tier: TierPolicy) -> AsyncTokenBucket:
+        bucket = self.buckets.get(tenant)
+        if bucket is None:
+            bucket = AsyncTokenBucket(tier.rate, tier.burst)
+            self.buckets.set(tenant, bucket)
+        return bucket
+
+    def _record(self, tier: TierPolicy, outcome: str):
+        ADMISSIONS.labels(tier.name, outcome).inc()
+        self.outcomes[(tier.name, outcome)] = self.outcomes.get((tier.name, outcome), 0) + 1
+
+    def estimated_wait(self, operation: str, priority: int) -> float:
+        """Longest expected slot wait across the upstreams an operation calls"""
+        upstreams = OPERATION_UPSTREAMS.get(operation, tuple(self.upstreams))
+        return max((self.upstreams[name].estimated_wait(priority) for name in upstreams if name in self.upstreams),
+                   default=0.0)
+
+    def admit(self, api_key: Optional[str], operation: str, client: Optional[str] = None) -> Admission:
+        """Admit one request or raise AdmissionRejected; the admission applies to the current task"""
+        tenant, tier = self.resolve(api_key, client)
+        wait = self.estimated_wait(operation, tier.priority)
+        if wait > tier.latency_budget:
+            # Shed before spending the tenant's tokens: the work would miss its budget anyway
+            self._record(tier, "shed")
+            raise AdmissionRejected(
+                f"Audit capacity exhausted: estimated wait {wait:.1f}s exceeds the {tier.name} tier budget",
+                wait - tier.latency_budget, tier.name
+            )
+        bucket = self._bucket(tenant, tier)
+        if not bucket.try_acquire():
+            self._record(tier, "rate_limited")
+            raise AdmissionRejected(f"Rate limit exceeded for the {tier.name} tier", bucket.wait_time(), tier.name)
+
+        self._record(tier, "admitted")
+        admission = Admission(tenant=tenant, tier=tier, operation=operation, bucket=bucket)
+        _CURRENT_ADMISSION.set(admission)
+        return admission
+
+    @staticmethod
+    async def pace():
+        """Spend one more of the current tenant's tokens, waiting for it; used per item of a batch"""
+        admission = current_admission()
+        if admission is not None:
+            await admission.bucket.acquire()
+
+    def upstream_slot(self, upstream: str):
+        """Concurrency slot for one upstream call, queued at the current request's priority"""
+        limiter = self.upstreams.get(upstream)
+        if limiter is None:
+            return _NO_LIMIT
+        admission = current_admission()
+        return limiter.slot(admission.priority if admission is not None else BACKGROUND_PRIORITY)
+
+    def stats(self) -> Dict[str, Any]:
+        outcomes: Dict[str, Dict[str, int]] = {}
+        for (tier, outcome), count in self.outcomes.items():
+            outcomes.setdefault(tier, {})[outcome] = count
+        return {
+            "tiers": {name: {"priority": tier.priority, "rate": tier.rate, "burst": tier.burst,
+                             "latency_budget_s": tier.latency_budget} for name, tier in self.tiers.items()},
+            "tenants": len(self.buckets),
+            "outcomes": outcomes,
+            "upstreams": {name: limiter.stats() for name, limiter in self.upstreams.items()}
+        }
+
+
+class _NoLimit:
+    async def __aenter__(self):
+        return None
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+_NO_LIMIT = _NoLimit()
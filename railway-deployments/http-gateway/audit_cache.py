@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Auditooor Audit Cache - ServiceFlow AI
+Content-addressed cache for audit reports: in-memory LRU with TTL plus an optional SQLite tier
+"""
+
+import os
+import copy
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+
+class TTLCache:
+    """Thread-safe in-memory LRU cache with per-entry time-to-live"""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None when missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None):
+        """Store a value, evicting the least recently used entries beyond max_entries"""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            return entry[1] if entry else None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class AuditCache:
+    """Audit report cache keyed on the hash of the normalized contract source"""
+
+    def __init__(self, max_entries: Optional[int] = None, ttl_seconds: Optional[float] = None,
+                 db_path: Optional[str] = None):
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(os.getenv("AUDITOOOR_CACHE_TTL", "86400"))
+        self.memory = TTLCache(
+            max_entries=max_entries or int(os.getenv("AUDITOOOR_CACHE_SIZE", "1024")),
+            ttl_seconds=self.ttl_seconds
+        )
+        self.db_path = db_path if db_path is not None else os.getenv("AUDITOOOR_CACHE_DB")
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if self.db_path:
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS audit_cache ("
+                "code_hash TEXT PRIMARY KEY, report TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    def get(self, code_hash: str) -> Optional[Dict[str, Any]]:
+        """Look up a report in memory first, then on disk"""
+        report = self.memory.get(code_hash)
+        if report is None and self._db is not None:
+            report = self._load_from_disk(code_hash)
+            if report is not None:
+                self.disk_hits += 1
+                self.memory.set(code_hash, report)
+
+        if report is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return copy.deepcopy(report)
+
+    def set(self, code_hash: str, report: Dict[str, Any]):
+        """Store a report in every configured tier"""
+        report = copy.deepcopy(report)
+        self.memory.set(code_hash, report)
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO audit_cache (code_hash, report, created_at) VALUES (?, ?, ?)",
+                    (code_hash, json.dumps(report), time.time())
+                )
+                self._db.commit()
+
+    def _load_from_disk(self, code_hash: str) -> Optional[Dict[str, Any]]:
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT report, created_at FROM audit_cache WHERE code_hash = ?", (code_hash,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] + self.ttl_seconds < time.time():
+                self._db.execute("DELETE FROM audit_cache WHERE code_hash = ?", (code_hash,))
+                self._db.commit()
+                return None
+        return json.loads(row[0])
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for monitoring"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self.memory),
+            "persistent": self._db is not None
+        }
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
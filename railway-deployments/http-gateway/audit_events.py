@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Auditooor audit events - ServiceFlow AI
+Typed progress events emitted while a comprehensive audit runs
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional
+
+from json_encoding import dumps
+
+# Event types
+AUDIT_STARTED = "started"
+STAGE_STARTED = "stage_started"
+STAGE_FINISHED = "stage_finished"
+PARTIAL_RESULT = "partial_result"
+AUDIT_ERROR = "error"
+AUDIT_COMPLETED = "completed"
+
+
+@dataclass
+class AuditEvent:
+    """One progress event; `elapsed_ms` is measured from the start of the audit"""
+
+    type: str
+    elapsed_ms: float
+    stage: Optional[str] = None
+    data: Dict[str, Any] = field(default_factory=dict)
+    timestamp: float = field(default_factory=time.time)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "type": self.type,
+            "stage": self.stage,
+            "elapsed_ms": self.elapsed_ms,
+            "timestamp": self.timestamp,
+            "data": self.data
+        }
+
+    def to_ndjson(self) -> str:
+        return dumps(self.to_dict()).decode() + "\n"
+
+    def to_sse(self) -> str:
+        """Server-Sent Events frame"""
+        return f"event: {self.type}\ndata: {dumps(self.to_dict()).decode()}\n\n"
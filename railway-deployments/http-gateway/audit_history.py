@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Auditooor audit history - ServiceFlow AI
+Append-only SQLite (WAL) store of every audit report the gateway has produced
+
+Reports are kept as zlib-compressed JSON blobs next to a few indexed summary columns
+(code hash, contract name, client, time, status), so listing and filtering never touch the
+blobs and paging uses the primary key (keyset) rather than OFFSET. Retention by age and
+by row count is applied every `compact_every` writes, after which freed pages are returned
+to the file system.
+"""
+
+import os
+import json
+import time
+import zlib
+import hashlib
+import sqlite3
+import threading
+from typing import Dict, Any, Optional
+
+DEFAULT_RETENTION_DAYS = float(os.getenv("AUDITOOOR_HISTORY_RETENTION_DAYS", "365"))
+DEFAULT_MAX_RECORDS = int(os.getenv("AUDITOOOR_HISTORY_MAX_RECORDS", "0"))
+MAX_PAGE_SIZE = 500
+
+_SUMMARY_COLUMNS = (
+    "audit_id", "code_hash", "contract_name", "client", "operation",
+    "overall_status", "finding_count", "report_bytes", "created_at"
+)
+
+
+def client_label(tenant: Optional[str]) -> Optional[str]:
+    """Admission tenant as stored in the history; API keys are kept only as a short digest"""
+    if tenant and tenant.startswith("key:"):
+        return "key:" + hashlib.sha256(tenant[4:].encode()).hexdigest()[:16]
+    return tenant
+
+
+class AuditHistory:
+    """Compressed, indexed audit reports with keyset-paginated queries
+
+    `db_path` defaults to AUDITOOOR_HISTORY_DB (auditooor_history.db); an empty path keeps the
+    history in memory for the life of the process.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, retention_days: Optional[float] = None,
+                 max_records: Optional[int] = None, compact_every: Optional[int] = None,
+                 compression_level: int = 6):
+        self.db_path = db_path if db_path is not None else os.getenv("AUDITOOOR_HISTORY_DB", "auditooor_history.db")
+        self.retention_days = retention_days if retention_days is not None else DEFAULT_RETENTION_DAYS
+        self.max_records = max_records if max_records is not None else DEFAULT_MAX_RECORDS
+        self.compact_every = compact_every or int(os.getenv("AUDITOOOR_HISTORY_COMPACT_EVERY", "1000"))
+        self.compression_level = compression_level
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._writes_since_compaction = 0
+
+        self.records = 0
+        self.compactions = 0
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.db_path or ":memory:", check_same_thread=False)
+            # Must precede table creation to take effect on a new file
+            self._db.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            self._db.execute("PRAGMA journal_mode=WAL")
+            # Appends survive a process crash; an OS crash may lose the last few, which only costs a re-audit
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS audit_history ("
+                "audit_id INTEGER PRIMARY KEY AUTOINCREMENT, code_hash TEXT NOT NULL, "
+                "contract_name TEXT NOT NULL, client TEXT, operation TEXT NOT NULL, "
+                "overall_status TEXT NOT NULL, finding_count INTEGER NOT NULL, "
+                "report_bytes INTEGER NOT NULL, created_at REAL NOT NULL, report BLOB NOT NULL)"
+            )
+            # Each filter index ends in audit_id so a filtered page is one index range scan, newest first
+            for column in ("code_hash", "contract_name", "client"):
+                self._db.execute(
+                    f"CREATE INDEX IF NOT EXISTS audit_history_{column} ON audit_history ({column}, audit_id)"
+                )
+            self._db.execute("CREATE INDEX IF NOT EXISTS audit_history_created_at ON audit_history (created_at)")
+            self._db.commit()
+        return self._db
+
+    def record(self, report: Dict[str, Any], code_hash: str, client: Optional[str] = None,
+               operation: str = "audit") -> int:
+        """Append one report; returns its audit_id"""
+        raw = json.dumps(report, separators=(",", ":")).encode()
+        blob = zlib.compress(raw, self.compression_level)
+        with self._lock:
+            db = self._connect()
+            cursor = db.execute(
+                "INSERT INTO audit_history (code_hash, contract_name, client, operation, overall_status, "
+                "finding_count, report_bytes, created_at, report) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (code_hash, report.get("contract_name", "Contract"), client, operation,
+                 report.get("overall_status", "completed"), len(report.get("static_findings") or []),
+                 len(raw), time.time(), blob)
+            )
+            db.commit()
+            self.records += 1
+            self.raw_bytes += len(raw)
+            self.stored_bytes += len(blob)
+            self._writes_since_compaction += 1
+            compact = self._writes_since_compaction >= self.compact_every
+        if compact:
+            self.compact()
+        return cursor.lastrowid
+
+    def get(self, audit_id: int) -> Optional[Dict[str, Any]]:
+        """Summary plus the full report, or None"""
+        with self._lock:
+            row = self._connect().execute(
+                f"SELECT {', '.join(_SUMMARY_COLUMNS)}, report FROM audit_history WHERE audit_id = ?", (audit_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        entry = dict(zip(_SUMMARY_COLUMNS, row))
+        entry["report"] = json.loads(zlib.decompress(row[-1]))
+        return entry
+
+    def query(self, code_hash: Optional[str] = None, contract_name: Optional[str] = None,
+              client: Optional[str] = None, status: Optional[str] = None, since: Optional[float] = None,
+              until: Optional[float] = None, limit: int = 50, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """Newest-first summaries matching every given filter
+
+        Pass the returned `next_cursor` back as `cursor` for the following page; it is None on the last page.
+        """
+        conditions, params = [], []
+        for column, value in (("code_hash", code_hash), ("contract_name", contract_name),
+                              ("client", client), ("overall_status", status)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            conditions.append("created_at >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("created_at < ?")
+            params.append(until)
+        if cursor:
+            conditions.append("audit_id < ?")
+            params.append(int(cursor))
+
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+        with self._lock:
+            rows = self._connect().execute(
+                f"SELECT {', '.join(_SUMMARY_COLUMNS)} FROM audit_history {where}ORDER BY audit_id DESC LIMIT ?",
+                (*params, limit + 1)
+            ).fetchall()
+        items = [dict(zip(_SUMMARY_COLUMNS, row)) for row in rows[:limit]]
+        return {
+            "items": items,
+            "next_cursor": str(items[-1]["audit_id"]) if len(rows) > limit else None
+        }
+
+    def compact(self) -> Dict[str, int]:
+        """Apply retention (age, then row count) and release the freed pages"""
+        with self._lock:
+            db = self._connect()
+            expired = 0
+            if self.retention_days > 0:
+                expired = db.execute(
+                    "DELETE FROM audit_history WHERE created_at < ?", (time.time() - self.retention_days * 86400,)
+                ).rowcount
+            trimmed = 0
+            if self.max_records > 0:
+                # Oldest rows beyond the cap; audit_id order is insertion order
+                trimmed = db.execute(
+                    "DELETE FROM audit_history WHERE audit_id <= "
+                    "(SELECT audit_id FROM audit_history ORDER BY audit_id DESC LIMIT 1 OFFSET ?)",
+                    (self.max_records,)
+                ).rowcount
+            db.commit()
+            if expired or trimmed:
+                # executescript steps the pragma to completion; execute() would free a single page
+                db.executescript("PRAGMA incremental_vacuum;")
+                db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._writes_since_compaction = 0
+            self.compactions += 1
+        return {"expired": expired, "trimmed": trimmed}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            db = self._connect()
+            total = db.execute("SELECT COUNT(*) FROM audit_history").fetchone()[0]
+            page_size = db.execute("PRAGMA page_size").fetchone()[0]
+            pages = db.execute("PRAGMA page_count").fetchone()[0]
+            free_pages = db.execute("PRAGMA freelist_count").fetchone()[0]
+        return {
+            "records": total,
+            "recorded_since_start": self.records,
+            "compression_ratio": round(self.raw_bytes / self.stored_bytes, 2) if self.stored_bytes else None,
+            "db_bytes": page_size * pages,
+            "free_bytes": page_size * free_pages,
+            "retention_days": self.retention_days,
+            "max_records": self.max_records,
+            "compactions": self.compactions,
+            "persistent": bool(self.db_path)
+        }
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
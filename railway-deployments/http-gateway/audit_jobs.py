@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Auditooor background jobs - ServiceFlow AI
+Durable SQLite-backed job queue with priorities, retries and webhook delivery
+
+Submitting a job returns its id immediately; an async worker pool executes queued
+jobs in priority order. Jobs that were running when the process stopped are
+re-queued on the next start, so accepted work is never lost.
+"""
+
+import os
+import json
+import time
+import uuid
+import socket
+import asyncio
+import logging
+import sqlite3
+import ipaddress
+import threading
+import contextvars
+from typing import Dict, Any, List, Optional, Callable, Awaitable
+from urllib.parse import urlsplit
+
+import httpx
+
+logger = logging.getLogger("auditooor.jobs")
+
+# Job states
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+JOB_STATES = (JOB_QUEUED, JOB_RUNNING, JOB_SUCCEEDED, JOB_FAILED)
+
+_COLUMNS = (
+    "job_id", "kind", "payload", "priority", "status", "attempts", "max_attempts",
+    "result", "error", "webhook_url", "created_at", "updated_at", "run_after", "client"
+)
+
+# When set, webhooks may only target these hosts (comma-separated)
+WEBHOOK_ALLOWED_HOSTS = frozenset(
+    host.strip().lower() for host in os.getenv("AUDITOOOR_WEBHOOK_HOSTS", "").split(",") if host.strip()
+)
+_INTERNAL_SUFFIXES = (".localhost", ".local", ".internal")
+
+
+def _is_public(address: str) -> bool:
+    # is_global already excludes private, loopback, link-local, shared and reserved ranges
+    ip = ipaddress.ip_address(address)
+    return ip.is_global and not ip.is_multicast
+
+
+def check_webhook_url(webhook_url: str) -> str:
+    """`webhook_url` if job results may be posted to it, else ValueError
+
+    Only https, to an allowlisted host when AUDITOOOR_WEBHOOK_HOSTS is set, and never to a
+    literal private, loopback or link-local address or a local name. Names are checked again,
+    by their resolved addresses, at delivery.
+    """
+    parts = urlsplit(webhook_url)
+    host = parts.hostname
+    if parts.scheme != "https" or not host:
+        raise ValueError("webhook_url must be an https URL")
+    if WEBHOOK_ALLOWED_HOSTS and host not in WEBHOOK_ALLOWED_HOSTS:
+        raise ValueError(f"webhook host {host} is not allowed")
+    try:
+        public = _is_public(host)
+    except ValueError:
+        # A name; only obviously local ones can be refused before resolving it
+        public = host != "localhost" and not host.endswith(_INTERNAL_SUFFIXES)
+    if not public:
+        raise ValueError(f"webhook host {host} is not public")
+    return webhook_url
+
+
+async def public_address(host: str) -> str:
+    """An address `host` resolves to; ValueError when any of them is not public"""
+    infos = await asyncio.get_running_loop().getaddrinfo(host, None, type=socket.SOCK_STREAM)
+    addresses = sorted({info[4][0] for info in infos})
+    blocked = [address for address in addresses if not _is_public(address)]
+    if not addresses or blocked:
+        raise ValueError(f"webhook host {host} resolves to a non-public address {', '.join(blocked)}")
+    return addresses[0]
+
+
+_CURRENT_JOB_CLIENT: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("auditooor_job_client", default=None)
+
+
+def current_job_client() -> Optional[str]:
+    """Client that submitted the job being run in this task, if any"""
+    return _CURRENT_JOB_CLIENT.get()
+
+
+class JobStore:
+    """SQLite (WAL) persistence for queued, running and finished jobs"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or os.getenv("AUDITOOOR_JOBS_DB", "auditooor_jobs.db")
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS audit_jobs ("
+                "job_id TEXT PRIMARY KEY, kind TEXT NOT NULL, payload TEXT NOT NULL, "
+                "priority INTEGER NOT NULL DEFAULT 0, status TEXT NOT NULL, "
+                "attempts INTEGER NOT NULL DEFAULT 0, max_attempts INTEGER NOT NULL, "
+                "result TEXT, error TEXT, webhook_url TEXT, "
+                "created_at REAL NOT NULL, updated_at REAL NOT NULL, run_after REAL NOT NULL, client TEXT)"
+            )
+            # Stores created before jobs were scoped to their client
+            if "client" not in {row[1] for row in self._db.execute("PRAGMA table_info(audit_jobs)")}:
+                self._db.execute("ALTER TABLE audit_jobs ADD COLUMN client TEXT")
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS audit_jobs_queue ON audit_jobs (status, priority DESC, created_at)"
+            )
+            self._db.commit()
+        return self._db
+
+    @staticmethod
+    def _to_job(row: tuple) -> Dict[str, Any]:
+        job = dict(zip(_COLUMNS, row))
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def add(self, kind: str, payload: Dict[str, Any], priority: int = 0, max_attempts: int = 3,
+            webhook_url: Optional[str] = None, client: Optional[str] = None) -> Dict[str, Any]:
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            db = self._connect()
+            db.execute(
+                f"INSERT INTO audit_jobs ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+                (job_id, kind, json.dumps(payload), priority, JOB_QUEUED, 0, max_attempts,
+                 None, None, webhook_url, now, now, now, client)
+            )
+            db.commit()
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._connect().execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM audit_jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        return self._to_job(row) if row else None
+
+    def claim(self) -> Optional[Dict[str, Any]]:
+        """Mark the highest-priority runnable job as running and return it"""
+        now = time.time()
+        with self._lock:
+            db = self._connect()
+            row = db.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM audit_jobs WHERE status = ? AND run_after <= ? "
+                "ORDER BY priority DESC, created_at LIMIT 1",
+                (JOB_QUEUED, now)
+            ).fetchone()
+            if row is None:
+                return None
+            job = self._to_job(row)
+            db.execute(
+                "UPDATE audit_jobs SET status = ?, attempts = attempts + 1, updated_at = ? WHERE job_id = ?",
+                (JOB_RUNNING, now, job["job_id"])
+            )
+            db.commit()
+        job["status"] = JOB_RUNNING
+        job["attempts"] += 1
+        return job
+
+    def next_run_after(self) -> Optional[float]:
+        """When the earliest queued job becomes runnable (None when the queue is empty)"""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT MIN(run_after) FROM audit_jobs WHERE status = ?", (JOB_QUEUED,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def complete(self, job_id: str, result: Dict[str, Any]):
+        self._update(job_id, status=JOB_SUCCEEDED, result=json.dumps(result), error=None)
+
+    def fail(self, job_id: str, error: str, retry_at: Optional[float] = None):
+        """Record a failed attempt; re-queue it when `retry_at` is given"""
+        if retry_at is None:
+            self._update(job_id, status=JOB_FAILED, error=error)
+        else:
+            self._update(job_id, status=JOB_QUEUED, error=error, run_after=retry_at)
+
+    def recover(self) -> int:
+        """Re-queue jobs left running by a previous process"""
+        with self._lock:
+            db = self._connect()
+            cursor = db.execute(
+                "UPDATE audit_jobs SET status = ?, updated_at = ? WHERE status = ?",
+                (JOB_QUEUED, time.time(), JOB_RUNNING)
+            )
+            db.commit()
+        return cursor.rowcount
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._connect().execute("SELECT status, COUNT(*) FROM audit_jobs GROUP BY status").fetchall()
+        return {**{state: 0 for state in JOB_STATES}, **dict(rows)}
+
+    def _update(self, job_id: str, **fields: Any):
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            db = self._connect()
+            db.execute(f"UPDATE audit_jobs SET {assignments} WHERE job_id = ?", (*fields.values(), job_id))
+            db.commit()
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+class AuditJobQueue:
+    """Async worker pool draining a JobStore
+
+    `handlers` maps a job kind to the coroutine that runs it; a handler result with
+    `"status": "error"` (or an exception) counts as a failed attempt and is retried
+    with exponential backoff until `max_attempts` is reached. Store calls run in worker
+    threads, so SQLite never blocks the event loop.
+    """
+
+    def __init__(self, handlers: Dict[str, Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]],
+                 store: Optional[JobStore] = None, workers: Optional[int] = None,
+                 max_attempts: Optional[int] = None, retry_backoff: Optional[float] = None,
+                 poll_interval: float = 1.0, webhook_timeout: float = 10.0):
+        self.handlers = handlers
+        self.store = store if store is not None else JobStore()
+        self.workers = workers or int(os.getenv("AUDITOOOR_JOB_WORKERS", "4"))
+        self.max_attempts = max_attempts or int(os.getenv("AUDITOOOR_JOB_MAX_ATTEMPTS", "3"))
+        self.retry_backoff = retry_backoff if retry_backoff is not None else float(os.getenv("AUDITOOOR_JOB_RETRY_BACKOFF", "5"))
+        self.poll_interval = poll_interval
+        self.webhook_timeout = webhook_timeout
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+        self._webhook_client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self) -> int:
+        """Recover interrupted jobs and start the workers; returns the number of recovered jobs"""
+        if self._tasks:
+            return 0
+        recovered = await asyncio.to_thread(self.store.recover)
+        if recovered:
+            logger.warning("Re-queued %d audit jobs interrupted by a restart", recovered)
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        return recovered
+
+    async def stop(self):
+        """Stop the workers; jobs they were running are re-queued on the next start"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._webhook_client is not None:
+            await self._webhook_client.aclose()
+            self._webhook_client = None
+
+    async def submit(self, kind: str, payload: Dict[str, Any], priority: int = 0,
+                     webhook_url: Optional[str] = None, client: Optional[str] = None) -> Dict[str, Any]:
+        """Persist a job and wake a worker; returns the stored job
+
+        `client` is who submitted it; the job's handler runs with it as current_job_client().
+        """
+        if kind not in self.handlers:
+            return {"status": "error", "error": f"Unsupported job kind: {kind}"}
+        if webhook_url is not None:
+            try:
+                check_webhook_url(webhook_url)
+            except ValueError as e:
+                return {"status": "error", "error": str(e)}
+        job = await asyncio.to_thread(self.store.add, kind, payload, priority, self.max_attempts, webhook_url, client)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self.store.get, job_id)
+
+    async def stats(self) -> Dict[str, Any]:
+        return {"workers": len(self._tasks), "jobs": await asyncio.to_thread(self.store.counts)}
+
+    async def _worker(self):
+        while True:
+            job = await asyncio.to_thread(self.store.claim)
+            if job is None:
+                await self._wait_for_work()
+                continue
+            await self._run(job)
+
+    async def _wait_for_work(self):
+        next_run = await asyncio.to_thread(self.store.next_run_after)
+        timeout = self.poll_interval if next_run is None else min(self.poll_interval, max(0.0, next_run - time.time()))
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _run(self, job: Dict[str, Any]):
+        client_token = _CURRENT_JOB_CLIENT.set(job["client"])
+        try:
+            result = await self.handlers[job["kind"]](job["payload"])
+            error = result.get("error", "job failed") if result.get("status") == "error" else None
+        except Exception as e:
+            result, error = None, str(e)
+        finally:
+            _CURRENT_JOB_CLIENT.reset(client_token)
+
+        if error is None:
+            await asyncio.to_thread(self.store.complete, job["job_id"], result)
+        elif job["attempts"] < job["max_attempts"]:
+            retry_at = time.time() + self.retry_backoff * 2 ** (job["attempts"] - 1)
+            await asyncio.to_thread(self.store.fail, job["job_id"], error, retry_at=retry_at)
+            logger.warning("Audit job %s attempt %d failed, retrying: %s", job["job_id"], job["attempts"], error)
+            return
+        else:
+            await asyncio.to_thread(self.store.fail, job["job_id"], error)
+            logger.error("Audit job %s failed after %d attempts: %s", job["job_id"], job["attempts"], error)
+
+        if job["webhook_url"]:
+            await self._deliver_webhook(job["job_id"], job["webhook_url"])
+
+    async def _deliver_webhook(self, job_id: str, webhook_url: str):
+        """POST the finished job to its webhook; delivery failures only get logged"""
+        try:
+            url = httpx.URL(check_webhook_url(webhook_url))
+            address = await public_address(url.host)
+        except (ValueError, OSError, httpx.InvalidURL) as e:
+            logger.warning("Webhook for audit job %s refused: %s", job_id, e)
+            return
+        if self._webhook_client is None:
+            # Redirects stay off: a public endpoint must not bounce the POST to an internal one
+            self._webhook_client = httpx.AsyncClient(timeout=self.webhook_timeout, follow_redirects=False)
+        try:
+            # Connect to the checked address so a second DNS answer cannot swap in an internal host
+            response = await self._webhook_client.post(
+                url.copy_with(host=address), json=await asyncio.to_thread(self.store.get, job_id),
+                headers={"Host": url.netloc.decode()}, extensions={"sni_hostname": url.host}
+            )
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            logger.warning("Webhook delivery for audit job %s failed: %s", job_id, e)
@@ -5,406 +5,1056 @@ Simplified version for Railway deployment with smart contract auditing and gener
 """
 
 import os
+import sys
 import json
+import time
+import logging
 import asyncio
-from typing import Dict, Any, Optional, List
+import importlib
+import functools
+import collections
+from contextlib import aclosing
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List, Tuple, Callable, Awaitable, AsyncIterator
 from datetime import datetime
 
-# Import our cloud tools
-from Tools.chaingpt_audit_tool import audit_contract_with_chaingpt, analyze_contract_security
-from cloudflare_rag_cloud import search_serviceflow_docs_rag, search_contracts_rag
+# Cold-start accounting: seconds spent importing each dependency, in load order
+IMPORT_TIMINGS: Dict[str, float] = {}
+
+
+def _timed_import(module_name: str):
+    """Import a module, recording how long the first import took"""
+    module = sys.modules.get(module_name)
+    if module is None:
+        started = time.perf_counter()
+        module = importlib.import_module(module_name)
+        IMPORT_TIMINGS[module_name] = round(time.perf_counter() - started, 6)
+    return module
+
+
+_MODULE_LOAD_STARTED = time.perf_counter()
+for _dependency in ("httpx", "oz_mcp_client", "audit_cache", "rate_limits", "circuit_breaker",
+                    "contract_templates", "solidity_source", "solidity_scanner", "json_encoding",
+                    "audit_events", "single_flight", "audit_jobs", "contract_chunker", "admission", "deadlines",
+                    "audit_history", "gateway_metrics"):
+    _timed_import(_dependency)
+
+from audit_cache import AuditCache, TTLCache
+from rate_limits import AsyncTokenBucket
+from oz_mcp_client import OpenZeppelinMCPClient, OZ_MCP_ERRORS, OZ_MCP_TIMEOUTS
+from circuit_breaker import CircuitBreaker, CLOSED, HALF_OPEN
+from contract_templates import ContractTemplateEngine, template_engine
+from solidity_source import SourceUnit, contract_code_hash, split_source_units
+from solidity_scanner import SolidityScanner, ScanResult, Finding, default_scanner
+from single_flight import SingleFlight
+from audit_jobs import AuditJobQueue, current_job_client
+from contract_chunker import ChunkPlan, KnownLibraryIndex, plan_chunks
+from admission import AdmissionController, current_admission
+from deadlines import Deadline, LatencyWindow, current_deadline, deadline_scope, hedged, remaining_budget
+from audit_history import AuditHistory, client_label
+from audit_events import (
+    AuditEvent, AUDIT_STARTED, STAGE_STARTED, STAGE_FINISHED, PARTIAL_RESULT, AUDIT_ERROR, AUDIT_COMPLETED
+)
+
+from gateway_metrics import Counter, Gauge, Histogram
+
+logger = logging.getLogger("auditooor")
+
+# Our cloud tools (ChainGPT client, Cloudflare RAG) are heavy; they load on first use or in warm_up()
+CHAINGPT_MODULE = "Tools.chaingpt_audit_tool"
+RAG_MODULE = "cloudflare_rag_cloud"
+INTEGRATION_MODULES = (CHAINGPT_MODULE, RAG_MODULE)
+
+
+def audit_contract_with_chaingpt(contract_data: Dict[str, Any]) -> Dict[str, Any]:
+    return _timed_import(CHAINGPT_MODULE).audit_contract_with_chaingpt(contract_data)
+
+
+def analyze_contract_security(contract_data: Dict[str, Any]) -> Dict[str, Any]:
+    return _timed_import(CHAINGPT_MODULE).analyze_contract_security(contract_data)
+
+
+async def search_serviceflow_docs_rag(query: str) -> Any:
+    return await _timed_import(RAG_MODULE).search_serviceflow_docs_rag(query)
+
+
+async def search_contracts_rag(query: str) -> Any:
+    return await _timed_import(RAG_MODULE).search_contracts_rag(query)
+
+
+# Instrumentation, exported in Prometheus format by the gateway
+STAGE_LATENCY = Histogram("auditooor_stage_duration_seconds", "Latency of each audit and generation stage", ("stage",))
+STAGE_OUTCOMES = Counter("auditooor_stage_outcomes_total", "Stage results by status (success, timeout, error)", ("stage", "status"))
+REQUEST_LATENCY = Histogram("auditooor_request_duration_seconds", "End-to-end latency of AuditooorCloud entry points", ("operation",))
+IN_FLIGHT = Gauge("auditooor_in_flight_requests", "Requests currently executing", ("operation",))
+CACHE_LOOKUPS = Counter("auditooor_cache_lookups_total", "Audit cache lookups by result (hit, miss)", ("result",))
+GENERATIONS = Counter("auditooor_generations_total", "Generated contracts by source (openzeppelin, template)", ("source",))
+OZ_REQUESTS = Counter("auditooor_oz_requests_total", "OpenZeppelin MCP calls by outcome", ("outcome",))
+CIRCUIT_STATE = Gauge("auditooor_circuit_breaker_state", "Circuit breaker state (0 closed, 1 half-open, 2 open)", ("breaker",))
+COALESCED = Counter("auditooor_upstream_coalesced_total", "Upstream calls avoided by source (in_flight, cache)", ("upstream", "source"))
+
+# Per-stage timeouts (seconds) for the comprehensive audit pipeline
+DEFAULT_STAGE_TIMEOUTS = {
+    "chaingpt": float(os.getenv("AUDITOOOR_CHAINGPT_TIMEOUT", "60")),
+    "rag": float(os.getenv("AUDITOOOR_RAG_TIMEOUT", "20")),
+}
+
+# Stages whose upstream calls are idempotent reads and may be hedged
+HEDGEABLE_STAGES = ("rag",)
+
+# Per-upstream request rates (requests/second, 0 disables the limit)
+DEFAULT_UPSTREAM_RATES = {
+    "chaingpt": float(os.getenv("AUDITOOOR_CHAINGPT_RPS", "0")),
+    "rag": float(os.getenv("AUDITOOOR_RAG_RPS", "0")),
+}
+
 
 class AuditooorCloud:
     """Cloud-optimized Auditooor agent for Railway deployment"""
 
-    def __init__(self):
+    def __init__(self, max_workers: Optional[int] = None, stage_timeouts: Optional[Dict[str, float]] = None,
+                 cache: Optional[AuditCache] = None, upstream_rates: Optional[Dict[str, float]] = None,
+                 batch_concurrency: Optional[int] = None, oz_client: Optional[OpenZeppelinMCPClient] = None,
+                 templates: Optional[ContractTemplateEngine] = None, scanner: Optional[SolidityScanner] = None,
+                 jobs: Optional[AuditJobQueue] = None, known_libraries: Optional[KnownLibraryIndex] = None,
+                 admission: Optional[AdmissionController] = None, hedge_stages: Optional[List[str]] = None,
+                 history: Optional[AuditHistory] = None):
         self.service_name = "Auditooor Cloud Agent"
         self.version = "1.0.0"
 
-    # OpenZeppelin contract generation templates
-    def generate_erc20_template(self, requirements: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate ERC-20 token contract template using OpenZeppelin MCP API"""
-        try:
-            import requests
-
-            name = requirements.get("name", "MyToken")
-            symbol = requirements.get("symbol", "MTK")
-            premint = requirements.get("premint", "1000000")
-
-            # Try OpenZeppelin MCP API first
+        # Blocking upstream clients (ChainGPT) run in a bounded thread pool so they never stall the event loop
+        self.max_workers = max_workers or int(os.getenv("AUDITOOOR_MAX_WORKERS", "8"))
+        self.stage_timeouts = {**DEFAULT_STAGE_TIMEOUTS, **(stage_timeouts or {})}
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        # Audit reports are cached by the hash of the normalized contract source
+        self.cache = cache if cache is not None else AuditCache()
+
+        # Upstream quotas are shared by single and batch audits
+        rates = {**DEFAULT_UPSTREAM_RATES, **(upstream_rates or {})}
+        self.rate_limiters = {stage: AsyncTokenBucket(rate) for stage, rate in rates.items() if rate > 0}
+        self.batch_concurrency = batch_concurrency or int(os.getenv("AUDITOOOR_BATCH_CONCURRENCY", "8"))
+
+        # Every finished report is kept, so past results are looked up instead of re-audited
+        self.history = history if history is not None else AuditHistory()
+
+        # Per-tenant admission and priority-ordered concurrency caps on each upstream
+        self.admission = admission if admission is not None else AdmissionController()
+
+        # Tail-latency hedging: a second copy of a slow idempotent read is sent after the upstream's p95
+        if hedge_stages is None:
+            hedge_stages = [stage.strip() for stage in os.getenv("AUDITOOOR_HEDGE_STAGES", "").split(",")]
+        self.hedge_stages = {stage for stage in hedge_stages if stage in HEDGEABLE_STAGES}
+        self.hedge_quantile = float(os.getenv("AUDITOOOR_HEDGE_QUANTILE", "0.95"))
+        self.upstream_latency = {stage: LatencyWindow() for stage in DEFAULT_STAGE_TIMEOUTS}
+
+        # Identical concurrent upstream calls (same code hash, same RAG query) share one request
+        self.flights = {stage: SingleFlight(stage) for stage in DEFAULT_STAGE_TIMEOUTS}
+        # Per-unit static results and last ChainGPT analysis of each project, for incremental re-audits
+        self.project_states = TTLCache(
+            max_entries=int(os.getenv("AUDITOOOR_PROJECT_STATES", "256")),
+            ttl_seconds=float(os.getenv("AUDITOOOR_PROJECT_STATE_TTL", "86400"))
+        )
+        # RAG queries depend only on the contract name, so answers are reused for a short while
+        self.rag_cache = TTLCache(
+            max_entries=int(os.getenv("AUDITOOOR_RAG_CACHE_SIZE", "512")),
+            ttl_seconds=float(os.getenv("AUDITOOOR_RAG_CACHE_TTL", "300"))
+        )
+
+        # Keep-alive connection pool for OpenZeppelin MCP generation calls
+        self.oz_client = oz_client if oz_client is not None else OpenZeppelinMCPClient()
+
+        # Skip the OpenZeppelin round trip entirely while it is failing; the internal templates take over
+        self.oz_breaker = CircuitBreaker(
+            "openzeppelin_mcp",
+            failure_threshold=int(os.getenv("OZ_MCP_BREAKER_FAILURES", "5")),
+            cooldown_seconds=float(os.getenv("OZ_MCP_BREAKER_COOLDOWN", "30")),
+            min_timeout=float(os.getenv("OZ_MCP_MIN_TIMEOUT", "1")),
+            max_timeout=self.oz_client.timeout.read or 30.0
+        )
+        CIRCUIT_STATE.labels(self.oz_breaker.name).set_function(
+            lambda: {CLOSED: 0, HALF_OPEN: 1}.get(self.oz_breaker.state, 2)
+        )
+
+        # Internal fallback templates; skeletons compile on first use or all at once in warm_up()
+        self.templates = templates if templates is not None else template_engine
+
+        # Static rule registry used for code-based recommendations
+        self.scanner = scanner if scanner is not None else default_scanner
+
+        # Large flattened sources are audited per contract, in parallel, skipping known library code
+        self.known_libraries = known_libraries if known_libraries is not None else KnownLibraryIndex()
+        self.chunk_min_lines = int(os.getenv("AUDITOOOR_CHUNK_MIN_LINES", "400"))
+        self.chunk_concurrency = int(os.getenv("AUDITOOOR_CHUNK_CONCURRENCY", "8"))
+
+        # Durable background jobs for audits that outlive an HTTP request; workers start with the gateway
+        self.jobs = jobs if jobs is not None else AuditJobQueue({
+            "audit": self.audit_contract_comprehensive,
+            "generate_with_audit": self.generate_contract_with_audit,
+            # The jobs route stamps the admitted tenant into the payload
+            "audit_incremental": lambda payload: self.audit_contract_incremental(payload, payload.get("tenant"))
+        })
+
+        # Set by warm_up(); the gateway's readiness probe reports it
+        self.ready = False
+        self.startup_report: Dict[str, Any] = {}
+
+    async def warm_up(self) -> Dict[str, Any]:
+        """Load integrations, open connection pools and precompile templates before serving traffic
+
+        Returns the cold-start report: seconds per dependency import and per warm-up step.
+        """
+        warm_up_started = time.perf_counter()
+        steps: Dict[str, float] = {}
+        errors: Dict[str, str] = {}
+
+        async def timed_step(name: str, call: Callable[[], Any]):
+            started = time.perf_counter()
             try:
-                ozeppelin_api = "https://mcp.openzeppelin.com/contracts/solidity/mcp"
-                contract_params = {
-                    "name": name,
-                    "symbol": symbol,
-                    "premint": premint,
-                    "mintable": requirements.get('mintable', True),
-                    "burnable": requirements.get('burnable', False),
-                    "pausable": requirements.get('pausable', False),
-                    "permit": requirements.get('permit', False),
-                    "votes": requirements.get('votes', False),
-                    "access": requirements.get('access', 'ownable'),
-                    "upgradeable": requirements.get('upgradeable', False)
-                }
+                result = call()
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                errors[name] = str(e)
+            steps[name] = round(time.perf_counter() - started, 6)
+
+        await timed_step("worker_pool", self._get_executor)
+        for module_name in INTEGRATION_MODULES:
+            # Imports run in the pool so health checks keep answering meanwhile
+            await timed_step(f"import {module_name}", lambda name=module_name: self._run_blocking(_timed_import, name))
+        await timed_step("templates", self.templates.precompile)
+        await timed_step("scanner", lambda: self.scanner.scan(""))
+        await timed_step("known_libraries", lambda: self._run_blocking(self.known_libraries.load))
+        await timed_step("openzeppelin_pool", self.oz_client.warm_up)
+
+        self.ready = not errors
+        self.startup_report = {
+            "ready": self.ready,
+            "module_load_s": MODULE_LOAD_SECONDS,
+            "imports_s": dict(IMPORT_TIMINGS),
+            "warm_up_steps_s": steps,
+            "warm_up_total_s": round(time.perf_counter() - warm_up_started, 6),
+            "errors": errors
+        }
+        if errors:
+            logger.error("Auditooor warm-up failed: %s", errors)
+        else:
+            logger.info("Auditooor warm-up completed in %.3fs", self.startup_report["warm_up_total_s"])
+        return self.startup_report
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Audit cache hit/miss counters"""
+        return self.cache.stats()
+
+    def history_stats(self) -> Dict[str, Any]:
+        """Size, compression and retention of the audit history"""
+        return self.history.stats()
+
+    def coalescing_stats(self) -> Dict[str, Any]:
+        """Shared in-flight upstream calls and the RAG answer cache"""
+        stats = {stage: flight.stats() for stage, flight in self.flights.items()}
+        stats["rag_cache_entries"] = len(self.rag_cache)
+        return stats
+
+    def hedging_stats(self) -> Dict[str, Any]:
+        """Upstream latency quantiles and which stages hedge"""
+        stats = {}
+        for stage, window in self.upstream_latency.items():
+            p95 = window.quantile(self.hedge_quantile)
+            stats[stage] = {
+                "hedged": stage in self.hedge_stages,
+                "samples": len(window),
+                "hedge_after_ms": round(p95 * 1000, 2) if p95 is not None else None
+            }
+        return stats
+
+    def circuit_stats(self) -> Dict[str, Any]:
+        """State and trip counts of the upstream circuit breakers"""
+        return {self.oz_breaker.name: self.oz_breaker.stats()}
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Create the shared worker pool on first use"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="auditooor")
+        return self._executor
+
+    async def _run_blocking(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a synchronous call in the worker pool and await its result"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), functools.partial(func, *args))
+
+    async def _record_history(self, audit_report: Dict[str, Any], code_hash: str, operation: str):
+        """Append a finished report to the audit history and tag it with its `history_id`
+
+        A failing history write is logged and never fails the audit itself.
+        """
+        # Background jobs run without an admission; they are recorded for the client that submitted them
+        admission = current_admission()
+        client = client_label(admission.tenant) if admission is not None else current_job_client()
+        try:
+            audit_report["history_id"] = await self._run_blocking(
+                self.history.record, audit_report, code_hash, client, operation
+            )
+        except Exception as e:
+            logger.warning("Could not record audit history for %s: %s", code_hash, e)
+
+    async def _coalesced(self, stage: str, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Join the in-flight upstream call for `key`, or start it (rate limited) if there is none"""
+        flight = self.flights[stage]
+        if flight.in_flight(key):
+            COALESCED.labels(stage, "in_flight").inc()
+
+        async def attempt():
+            async with self.admission.upstream_slot(stage):
+                started = time.perf_counter()
+                result = await call()
+                self.upstream_latency[stage].record(time.perf_counter() - started)
+                return result
+
+        async def upstream_call():
+            # Only the call that actually reaches the upstream spends quota and holds a slot
+            limiter = self.rate_limiters.get(stage)
+            if limiter is not None:
+                await limiter.acquire()
+            if stage not in self.hedge_stages:
+                return await attempt()
+            delay = self.upstream_latency[stage].quantile(self.hedge_quantile)
+            budget = remaining_budget()
+            if delay is None or (budget is not None and budget <= delay):
+                # No latency history yet, or a hedge could not answer before the deadline anyway
+                return await attempt()
+            # The hedge spends quota too, but never waits for it
+            return await hedged(stage, attempt, delay, can_hedge=lambda: limiter is None or limiter.try_acquire())
+
+        return await flight.do(key, upstream_call)
+
+    async def _analyze_contract(self, code_hash: str, contract_code: str, contract_name: str) -> Any:
+        return await self._coalesced("chaingpt", code_hash, lambda: self._run_blocking(analyze_contract_security, {
+            "contract_code": contract_code,
+            "contract_name": contract_name
+        }))
+
+    async def _search_contracts_rag(self, query: str) -> Any:
+        cached = self.rag_cache.get(query)
+        if cached is not None:
+            COALESCED.labels("rag", "cache").inc()
+            return cached
+        result = await self._coalesced("rag", query, lambda: search_contracts_rag(query))
+        self.rag_cache.set(query, result)
+        return result
+
+    async def _run_stage(self, stage: str, call: Callable[[], Awaitable[Any]]) -> Dict[str, Any]:
+        """Run one audit stage under its timeout, capturing failures instead of raising
+
+        The timeout is cut to whatever is left of the current request's deadline.
+        """
+        started = time.perf_counter()
+        deadline = current_deadline()
+        timeout = self.stage_timeouts.get(stage)
+        if deadline is not None:
+            timeout = deadline.clamp(timeout)
+        try:
+            if deadline is not None and deadline.expired:
+                raise asyncio.TimeoutError()
+            result = await asyncio.wait_for(call(), timeout=timeout)
+            outcome = {"status": "success", "result": result}
+        except asyncio.TimeoutError:
+            if deadline is not None and deadline.expired:
+                outcome = {"status": "timeout", "error": f"{stage} stage stopped at the request deadline"}
+            else:
+                outcome = {"status": "timeout", "error": f"{stage} stage timed out after {timeout}s"}
+        except Exception as e:
+            outcome = {"status": "error", "error": f"{stage} stage failed: {str(e)}"}
+        elapsed = time.perf_counter() - started
+        outcome["elapsed_ms"] = round(elapsed * 1000, 2)
+        STAGE_LATENCY.labels(stage).observe(elapsed)
+        STAGE_OUTCOMES.labels(stage, outcome["status"]).inc()
+        return outcome
+
+    def shutdown(self):
+        """Release the worker pool (call on application shutdown)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def aclose(self):
+        """Stop job workers, then close HTTP connection pools and the worker pool"""
+        await self.jobs.stop()
+        await self.oz_client.aclose()
+        self.shutdown()
+        self.history.close()
 
-                response = requests.post(
-                    f"{ozeppelin_api}/erc20",
-                    json=contract_params,
-                    timeout=30
+    # OpenZeppelin contract generation templates
+    @staticmethod
+    def _erc20_params(requirements: Dict[str, Any]) -> Dict[str, Any]:
+        """OpenZeppelin MCP parameters for an ERC-20 request"""
+        return {
+            "name": requirements.get("name", "MyToken"),
+            "symbol": requirements.get("symbol", "MTK"),
+            "premint": requirements.get("premint", "1000000"),
+            "mintable": requirements.get('mintable', True),
+            "burnable": requirements.get('burnable', False),
+            "pausable": requirements.get('pausable', False),
+            "permit": requirements.get('permit', False),
+            "votes": requirements.get('votes', False),
+            "access": requirements.get('access', 'ownable'),
+            "upgradeable": requirements.get('upgradeable', False)
+        }
+
+    @staticmethod
+    def _erc721_params(requirements: Dict[str, Any]) -> Dict[str, Any]:
+        """OpenZeppelin MCP parameters for an ERC-721 request"""
+        return {
+            "name": requirements.get("name", "MyNFT"),
+            "symbol": requirements.get("symbol", "MNFT"),
+            "baseUri": requirements.get("baseUri", "https://api.example.com/metadata/"),
+            "mintable": requirements.get('mintable', True),
+            "burnable": requirements.get('burnable', False),
+            "pausable": requirements.get('pausable', False),
+            "enumerable": requirements.get('enumerable', False),
+            "uriStorage": requirements.get('uriStorage', False),
+            "access": requirements.get('access', 'ownable'),
+            "upgradeable": requirements.get('upgradeable', False)
+        }
+
+    @staticmethod
+    def _oz_generation_result(contract_type: str, contract_params: Dict[str, Any], contract_code: str) -> Dict[str, Any]:
+        """Wrap OpenZeppelin MCP output in the generation result format"""
+        GENERATIONS.labels("openzeppelin").inc()
+        return {
+            "success": True,
+            "status": "success",
+            "contract_code": contract_code,
+            "contract_type": contract_type,
+            "contract_name": contract_params["name"],
+            "name": contract_params["name"],
+            "symbol": contract_params["symbol"],
+            "source": "OpenZeppelin MCP API",
+            "features": list(contract_params.keys()),
+            "timestamp": datetime.now().isoformat()
+        }
+
+    def _request_oz_contract(self, contract_kind: str, contract_params: Dict[str, Any]) -> Optional[str]:
+        """Fetch generated source from OpenZeppelin MCP through the circuit breaker; None means fall back"""
+        if not self.oz_breaker.allow_request():
+            OZ_REQUESTS.labels("short_circuited").inc()
+            return None
+        started = time.perf_counter()
+        try:
+            contract_code = self.oz_client.generate_sync(
+                contract_kind, contract_params, timeout=self.oz_breaker.current_timeout()
+            )
+        except OZ_MCP_ERRORS as e:
+            self.oz_breaker.record_failure()
+            OZ_REQUESTS.labels("timeout" if isinstance(e, OZ_MCP_TIMEOUTS) else "error").inc()
+            logger.warning("OpenZeppelin API failed, using fallback: %s", e)
+            return None
+        except Exception as e:
+            # Anything else still settles the breaker (a half-open probe would otherwise stay in flight)
+            self.oz_breaker.record_failure()
+            OZ_REQUESTS.labels("error").inc()
+            logger.warning("OpenZeppelin API failed unexpectedly, using fallback: %s", e)
+            return None
+        self._record_oz_success(time.perf_counter() - started)
+        return contract_code
+
+    async def _request_oz_contract_async(self, contract_kind: str, contract_params: Dict[str, Any]) -> Optional[str]:
+        """Async variant of _request_oz_contract"""
+        budget = remaining_budget()
+        if budget is not None and budget <= 0:
+            # No time left for the round trip; the template fallback answers instantly
+            return None
+        if not self.oz_breaker.allow_request():
+            OZ_REQUESTS.labels("short_circuited").inc()
+            return None
+        breaker_timeout = self.oz_breaker.current_timeout()
+        timeout = remaining_budget(breaker_timeout)
+        try:
+            # Time queued for a slot is not the upstream's latency, so the clock starts inside it
+            async with self.admission.upstream_slot("openzeppelin"):
+                started = time.perf_counter()
+                # httpx timeouts are per network operation; wait_for bounds the whole exchange
+                contract_code = await asyncio.wait_for(
+                    self.oz_client.generate(contract_kind, contract_params, timeout=timeout), timeout=timeout
                 )
+        except asyncio.CancelledError:
+            self.oz_breaker.abandon()
+            raise
+        except (asyncio.TimeoutError, *OZ_MCP_ERRORS) as e:
+            is_timeout = isinstance(e, OZ_MCP_TIMEOUTS)
+            if is_timeout and timeout < breaker_timeout:
+                # Cut short by the caller's deadline, which says nothing about the upstream's health
+                self.oz_breaker.abandon()
+            else:
+                self.oz_breaker.record_failure()
+            OZ_REQUESTS.labels("timeout" if is_timeout else "error").inc()
+            logger.warning("OpenZeppelin API failed, using fallback: %s", e)
+            return None
+        except Exception as e:
+            self.oz_breaker.record_failure()
+            OZ_REQUESTS.labels("error").inc()
+            logger.warning("OpenZeppelin API failed unexpectedly, using fallback: %s", e)
+            return None
+        self._record_oz_success(time.perf_counter() - started)
+        return contract_code
+
+    def _record_oz_success(self, latency: float):
+        self.oz_breaker.record_success(latency)
+        OZ_REQUESTS.labels("success").inc()
+        STAGE_LATENCY.labels("openzeppelin").observe(latency)
 
-                if response.status_code == 200:
-                    oz_result = response.json()
-                    contract_code = oz_result.get('contract_code', '')
-                    if contract_code:
-                        return {
-                            "success": True,
-                            "contract_code": contract_code,
-                            "contract_type": "ERC20",
-                            "name": name,
-                            "symbol": symbol,
-                            "source": "OpenZeppelin MCP API",
-                            "features": list(contract_params.keys())
-                        }
+    def generate_erc20_template(self, requirements: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate ERC-20 token contract template using OpenZeppelin MCP API"""
+        contract_params = self._erc20_params(requirements)
+        contract_code = self._request_oz_contract("erc20", contract_params)
+        if contract_code:
+            return self._oz_generation_result("ERC20", contract_params, contract_code)
 
-            except requests.exceptions.RequestException as e:
-                print(f"OpenZeppelin API failed, using fallback: {e}")
-
-            # Fallback to internal template
-            mintable = requirements.get("mintable", True)
-            burnable = requirements.get("burnable", False)
-            pausable = requirements.get("pausable", False)
-
-            # Basic ERC-20 template with OpenZeppelin security patterns
-            contract_code = f"""// SPDX-License-Identifier: MIT
-pragma solidity ^0.8.20;
-
-import "@openzeppelin/contracts/token/ERC20/ERC20.sol";
-import "@openzeppelin/contracts/access/Ownable.sol";
-import "@openzeppelin/contracts/security/ReentrancyGuard.sol";"""
-
-            if pausable:
-                contract_code += """
-import "@openzeppelin/contracts/security/Pausable.sol";"""
-
-            if burnable:
-                contract_code += """
-import "@openzeppelin/contracts/token/ERC20/extensions/ERC20Burnable.sol";"""
-
-            contract_code += f"""
-
-/**
- * @title {name}
- * @dev ERC-20 token generated by Auditooor - ServiceFlow AI
- * Generated on: {datetime.now().isoformat()}
- *
- * Security features:
- * - OpenZeppelin standard implementation
- * - Access control with Ownable pattern
- * - Reentrancy protection
- * {('- Pausable functionality' if pausable else '')}
- * {('- Burnable tokens' if burnable else '')}
- * {('- Mintable by owner' if mintable else '')}
- */
-contract {name} is ERC20, Ownable, ReentrancyGuard{(', Pausable' if pausable else '')}{(', ERC20Burnable' if burnable else '')} {{
-
-    /**
-     * @dev Constructor that sets up the token with initial parameters
-     * @param initialOwner Address that will own the contract
-     */
-    constructor(address initialOwner)
-        ERC20("{name}", "{symbol}")
-        Ownable(initialOwner)
-    {{
-        // Mint initial supply to the deployer
-        _mint(msg.sender, {premint} * 10 ** decimals());
-
-        // Transfer ownership to specified address if different
-        if (initialOwner != msg.sender) {{
-            _transferOwnership(initialOwner);
-        }}
-    }}"""
-
-            if mintable:
-                contract_code += f"""
-
-    /**
-     * @dev Mint tokens to specified address
-     * @param to Address to receive the tokens
-     * @param amount Amount of tokens to mint (in wei)
-     */
-    function mint(address to, uint256 amount)
-        public
-        onlyOwner
-        nonReentrant
-        {('whenNotPaused' if pausable else '')}
-    {{
-        require(to != address(0), "{name}: mint to zero address");
-        require(amount > 0, "{name}: mint amount must be positive");
-        _mint(to, amount);
-    }}"""
-
-            if pausable:
-                contract_code += f"""
-
-    /**
-     * @dev Pause all token transfers
-     */
-    function pause() public onlyOwner {{
-        _pause();
-    }}
-
-    /**
-     * @dev Unpause all token transfers
-     */
-    function unpause() public onlyOwner {{
-        _unpause();
-    }}
-
-    /**
-     * @dev Override transfer functions to include pause functionality
-     */
-    function _beforeTokenTransfer(
-        address from,
-        address to,
-        uint256 amount
-    ) internal override whenNotPaused {{
-        super._beforeTokenTransfer(from, to, amount);
-    }}"""
-
-            contract_code += """
-
-    /**
-     * @dev Emergency function to recover accidentally sent tokens
-     * @param tokenAddress Address of the token contract
-     * @param tokenAmount Amount of tokens to recover
-     */
-    function recoverERC20(address tokenAddress, uint256 tokenAmount)
-        public
-        onlyOwner
-        nonReentrant
-    {
-        require(tokenAddress != address(this), "Cannot recover own token");
-        IERC20(tokenAddress).transfer(owner(), tokenAmount);
-    }
-}"""
+        return self._render_erc20_fallback(requirements)
 
-            return {
-                "contract_code": contract_code,
-                "contract_name": name,
-                "contract_type": "ERC-20",
-                "features": {
-                    "mintable": mintable,
-                    "burnable": burnable,
-                    "pausable": pausable,
-                    "premint": premint
-                },
-                "status": "success",
-                "timestamp": datetime.now().isoformat()
-            }
+    async def generate_erc20_template_async(self, requirements: Dict[str, Any]) -> Dict[str, Any]:
+        """Async ERC-20 generation over the pooled OpenZeppelin MCP client"""
+        contract_params = self._erc20_params(requirements)
+        contract_code = await self._request_oz_contract_async("erc20", contract_params)
+        if contract_code:
+            return self._oz_generation_result("ERC20", contract_params, contract_code)
 
-        except Exception as e:
-            return {
-                "error": f"ERC-20 generation failed: {str(e)}",
-                "status": "error"
-            }
+        return self._render_erc20_fallback(requirements)
+
+    def _render_erc20_fallback(self, requirements: Dict[str, Any]) -> Dict[str, Any]:
+        """Render the internal ERC-20 template"""
+        return self._render_template("erc20", requirements)
 
     def generate_erc721_template(self, requirements: Dict[str, Any]) -> Dict[str, Any]:
         """Generate ERC-721 NFT contract template using OpenZeppelin MCP API"""
-        try:
-            import requests
+        contract_params = self._erc721_params(requirements)
+        contract_code = self._request_oz_contract("erc721", contract_params)
+        if contract_code:
+            return self._oz_generation_result("ERC721", contract_params, contract_code)
 
-            name = requirements.get("name", "MyNFT")
-            symbol = requirements.get("symbol", "MNFT")
-            base_uri = requirements.get("baseUri", "https://api.example.com/metadata/")
+        return self._render_erc721_fallback(requirements)
 
-            # Try OpenZeppelin MCP API first
-            try:
-                ozeppelin_api = "https://mcp.openzeppelin.com/contracts/solidity/mcp"
-                contract_params = {
-                    "name": name,
-                    "symbol": symbol,
-                    "baseUri": base_uri,
-                    "mintable": requirements.get('mintable', True),
-                    "burnable": requirements.get('burnable', False),
-                    "pausable": requirements.get('pausable', False),
-                    "enumerable": requirements.get('enumerable', False),
-                    "uriStorage": requirements.get('uriStorage', False),
-                    "access": requirements.get('access', 'ownable'),
-                    "upgradeable": requirements.get('upgradeable', False)
-                }
+    async def generate_erc721_template_async(self, requirements: Dict[str, Any]) -> Dict[str, Any]:
+        """Async ERC-721 generation over the pooled OpenZeppelin MCP client"""
+        contract_params = self._erc721_params(requirements)
+        contract_code = await self._request_oz_contract_async("erc721", contract_params)
+        if contract_code:
+            return self._oz_generation_result("ERC721", contract_params, contract_code)
 
-                response = requests.post(
-                    f"{ozeppelin_api}/erc721",
-                    json=contract_params,
-                    timeout=30
-                )
+        return self._render_erc721_fallback(requirements)
 
-                if response.status_code == 200:
-                    oz_result = response.json()
-                    contract_code = oz_result.get('contract_code', '')
-                    if contract_code:
-                        return {
-                            "success": True,
-                            "contract_code": contract_code,
-                            "contract_type": "ERC721",
-                            "name": name,
-                            "symbol": symbol,
-                            "source": "OpenZeppelin MCP API",
-                            "features": list(contract_params.keys())
-                        }
-
-            except requests.exceptions.RequestException as e:
-                print(f"OpenZeppelin API failed, using fallback: {e}")
-
-            # Fallback to internal template
-
-            contract_code = f"""// SPDX-License-Identifier: MIT
-pragma solidity ^0.8.20;
-
-import "@openzeppelin/contracts/token/ERC721/ERC721.sol";
-import "@openzeppelin/contracts/token/ERC721/extensions/ERC721URIStorage.sol";
-import "@openzeppelin/contracts/access/Ownable.sol";
-import "@openzeppelin/contracts/security/ReentrancyGuard.sol";
-import "@openzeppelin/contracts/utils/Counters.sol";
-
-/**
- * @title {name}
- * @dev ERC-721 NFT contract generated by Auditooor - ServiceFlow AI
- * Generated on: {datetime.now().isoformat()}
- */
-contract {name} is ERC721, ERC721URIStorage, Ownable, ReentrancyGuard {{
-    using Counters for Counters.Counter;
-
-    Counters.Counter private _tokenIdCounter;
-    string private _baseTokenURI;
-
-    constructor(address initialOwner)
-        ERC721("{name}", "{symbol}")
-        Ownable(initialOwner)
-    {{
-        _baseTokenURI = "{base_uri}";
-    }}
-
-    function mint(address to, string memory uri)
-        public
-        onlyOwner
-        nonReentrant
-    {{
-        require(to != address(0), "{name}: mint to zero address");
-
-        uint256 tokenId = _tokenIdCounter.current();
-        _tokenIdCounter.increment();
-
-        _safeMint(to, tokenId);
-        _setTokenURI(tokenId, uri);
-    }}
-
-    function _baseURI() internal view override returns (string memory) {{
-        return _baseTokenURI;
-    }}
-
-    function setBaseURI(string memory newBaseURI) public onlyOwner {{
-        _baseTokenURI = newBaseURI;
-    }}
-
-    function tokenURI(uint256 tokenId)
-        public
-        view
-        override(ERC721, ERC721URIStorage)
-        returns (string memory)
-    {{
-        return super.tokenURI(tokenId);
-    }}
-
-    function _burn(uint256 tokenId) internal override(ERC721, ERC721URIStorage) {{
-        super._burn(tokenId);
-    }}
-
-    function supportsInterface(bytes4 interfaceId)
-        public
-        view
-        override(ERC721, ERC721URIStorage)
-        returns (bool)
-    {{
-        return super.supportsInterface(interfaceId);
-    }}
-}}"""
+    def _render_erc721_fallback(self, requirements: Dict[str, Any]) -> Dict[str, Any]:
+        """Render the internal ERC-721 template"""
+        return self._render_template("erc721", requirements)
 
+    def _render_template(self, template_key: str, requirements: Dict[str, Any]) -> Dict[str, Any]:
+        """Render a precompiled internal template into the generation result format"""
+        try:
+            rendered = self.templates.render(template_key, requirements)
+            GENERATIONS.labels("template").inc()
             return {
-                "contract_code": contract_code,
-                "contract_name": name,
-                "contract_type": "ERC-721",
-                "features": {
-                    "base_uri": base_uri,
-                    "uri_storage": True,
-                    "counter": True
-                },
+                "contract_code": rendered.contract_code,
+                "contract_name": rendered.contract_name,
+                "contract_type": rendered.contract_type,
+                "features": rendered.features,
                 "status": "success",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": rendered.generated_on
             }
 
         except Exception as e:
             return {
-                "error": f"ERC-721 generation failed: {str(e)}",
+                "error": f"{self.templates.get(template_key).contract_type} generation failed: {str(e)}",
                 "status": "error"
             }
 
     async def audit_contract_comprehensive(self, contract_data: Dict[str, Any]) -> Dict[str, Any]:
         """Comprehensive contract audit using multiple analysis methods"""
+        # Closed on return, so the stream's cleanup runs now rather than whenever the generator is collected
+        async with aclosing(self.audit_contract_stream(contract_data)) as events:
+            async for event in events:
+                if event.type == AUDIT_COMPLETED:
+                    return event.data
+                if event.type == AUDIT_ERROR and event.stage is None:
+                    return {"error": event.data["error"], "status": "error"}
+
+        return {"error": "Comprehensive audit failed: no report produced", "status": "error"}
+
+    async def audit_contract_stream(self, contract_data: Dict[str, Any]) -> AsyncIterator[AuditEvent]:
+        """Run the comprehensive audit, yielding typed progress events as stages start and finish
+
+        The final event is either `completed` (data is the full audit report) or an
+        `error` event without a stage.
+        """
+        started = time.perf_counter()
+
+        def event(event_type: str, stage: Optional[str] = None, data: Optional[Dict[str, Any]] = None) -> AuditEvent:
+            elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+            return AuditEvent(type=event_type, elapsed_ms=elapsed_ms, stage=stage, data=data or {})
+
+        tasks: List[asyncio.Task] = []
+        IN_FLIGHT.labels("audit").inc()
         try:
             contract_code = contract_data.get("contract_code", "")
             contract_name = contract_data.get("contract_name", "Contract")
 
             if not contract_code.strip():
-                return {
-                    "error": "No contract code provided for audit",
-                    "status": "error"
+                yield event(AUDIT_ERROR, data={"error": "No contract code provided for audit"})
+                return
+
+            try:
+                deadline = Deadline.for_request(contract_data)
+            except ValueError as e:
+                yield event(AUDIT_ERROR, data={"error": str(e)})
+                return
+
+            code_hash = contract_code_hash(contract_code)
+            yield event(AUDIT_STARTED, data={"contract_name": contract_name, "code_hash": code_hash})
+
+            use_cache = contract_data.get("use_cache", True)
+            if use_cache:
+                cached_report = self.cache.get(code_hash)
+                CACHE_LOOKUPS.labels("miss" if cached_report is None else "hit").inc()
+                if cached_report is not None:
+                    cached_report["contract_name"] = contract_name
+                    cached_report["cache"] = {"hit": True, "code_hash": code_hash}
+                    await self._record_history(cached_report, code_hash, "audit")
+                    yield event(AUDIT_COMPLETED, data=cached_report)
+                    return
+
+            logger.info("Starting comprehensive audit for %s", contract_name)
+
+            # ChainGPT analysis (blocking, in the worker pool), the documentation best-practices
+            # search and the static scan are independent, so they run side by side
+            rag_query = f"smart contract security best practices for {contract_name} audit recommendations"
+            stage_calls = {
+                "chaingpt": lambda: self._analyze_contract(code_hash, contract_code, contract_name),
+                "rag": lambda: self._search_contracts_rag(rag_query),
+                "static": lambda: self._run_blocking(self.scanner.scan, contract_code),
+            }
+
+            # Large multi-contract sources: ChainGPT and the scanner see each unique, non-library contract once
+            chunk_plan = await self._chunk_plan(contract_code)
+            if chunk_plan is not None:
+                stage_calls["chaingpt"] = lambda: self._analyze_chunks(chunk_plan, contract_name)
+                stage_calls["static"] = lambda: self._run_blocking(self._scan_chunks, chunk_plan)
+
+            async def named_stage(stage: str):
+                # Runs as its own task, so the deadline is current for this stage and its upstream calls only
+                with deadline_scope(deadline):
+                    return stage, await self._run_stage(stage, stage_calls[stage])
+
+            tasks = [asyncio.create_task(named_stage(stage)) for stage in stage_calls]
+            for stage in stage_calls:
+                yield event(STAGE_STARTED, stage)
+
+            stages: Dict[str, Dict[str, Any]] = {}
+            for next_stage in asyncio.as_completed(tasks):
+                stage, outcome = await next_stage
+                stages[stage] = outcome
+                yield event(STAGE_FINISHED, stage, {"status": outcome["status"], "elapsed_ms": outcome["elapsed_ms"]})
+                if outcome["status"] == "success":
+                    yield event(PARTIAL_RESULT, stage, self._partial_stage_result(stage, outcome["result"]))
+                else:
+                    yield event(AUDIT_ERROR, stage, {"error": outcome["error"]})
+
+            audit_report = self._build_audit_report(contract_name, contract_code, stages)
+            partial = audit_report["overall_status"] == "partial"
+            if chunk_plan is not None:
+                audit_report["chunking"] = {
+                    **chunk_plan.summary(),
+                    "skipped_libraries": chunk_plan.known_libraries
                 }
 
-            print(f"🔍 Starting comprehensive audit for {contract_name}")
+            # Only complete reports are worth replaying; partial ones should be retried upstream
+            if use_cache and not partial:
+                self.cache.set(code_hash, audit_report)
+            audit_report["cache"] = {"hit": False, "code_hash": code_hash}
+            await self._record_history(audit_report, code_hash, "audit")
 
-            # Step 1: ChainGPT Security Analysis
-            print("1️⃣ Running ChainGPT security analysis...")
-            chaingpt_results = analyze_contract_security({
-                "contract_code": contract_code,
-                "contract_name": contract_name
-            })
+            logger.info("Comprehensive audit completed for %s", contract_name)
+            yield event(AUDIT_COMPLETED, data=audit_report)
 
-            # Step 2: Documentation Best Practices Search
-            print("2️⃣ Searching for security best practices...")
-            try:
-                rag_query = f"smart contract security best practices for {contract_name} audit recommendations"
-                rag_insights = await search_contracts_rag(rag_query)
-            except Exception as e:
-                rag_insights = f"RAG search failed: {str(e)}"
+        except Exception as e:
+            yield event(AUDIT_ERROR, data={"error": f"Comprehensive audit failed: {str(e)}"})
+
+        finally:
+            # Consumer disconnected mid-stream: stop paying for upstream work nobody will read
+            for task in tasks:
+                task.cancel()
+            IN_FLIGHT.labels("audit").dec()
+            REQUEST_LATENCY.labels("audit").observe(time.perf_counter() - started)
+
+    async def _chunk_plan(self, contract_code: str) -> Optional[ChunkPlan]:
+        """Chunk plan for sources worth splitting, None to audit the source as a whole"""
+        if contract_code.count("\n") + 1 < self.chunk_min_lines:
+            return None
+        plan = await self._run_blocking(plan_chunks, contract_code, self.known_libraries)
+        if len(plan.occurrences) < 2 and not plan.known_libraries:
+            return None
+        return plan
+
+    async def _analyze_chunks(self, plan: ChunkPlan, contract_name: str) -> Dict[str, Any]:
+        """ChainGPT analysis of each unique chunk in parallel, merged into one result"""
+        semaphore = asyncio.Semaphore(self.chunk_concurrency)
+
+        async def analyze(code_hash: str, chunk: SourceUnit) -> Dict[str, Any]:
+            async with semaphore:
+                try:
+                    analysis = await self._analyze_contract(code_hash, chunk.code, f"{contract_name}:{chunk.name}")
+                    status = analysis.get("status", "success") if isinstance(analysis, dict) else "success"
+                except Exception as e:
+                    analysis, status = {"status": "error", "error": str(e)}, "error"
+            occurrences = plan.occurrences[code_hash]
+            return {
+                "chunk": chunk.name,
+                "lines": [chunk.start_line, chunk.start_line + chunk.code.count("\n")],
+                "duplicates": [duplicate.name for duplicate in occurrences[1:]],
+                "status": status,
+                "analysis": analysis
+            }
 
-            # Step 3: Generate Security Recommendations
-            print("3️⃣ Generating security recommendations...")
-            security_recommendations = self._generate_security_recommendations(chaingpt_results, contract_code)
+        chunk_results = await asyncio.gather(*(analyze(code_hash, chunk) for code_hash, chunk in plan.unique.items()))
+        failed = sum(1 for result in chunk_results if result["status"] == "error")
+        if chunk_results and failed == len(chunk_results):
+            raise RuntimeError(f"all {failed} chunk analyses failed: {chunk_results[0]['analysis'].get('error')}")
+        return {
+            "status": "success" if not failed else "partial",
+            "chunks": chunk_results,
+            "skipped_libraries": plan.known_libraries
+        }
+
+    def _scan_chunks(self, plan: ChunkPlan) -> ScanResult:
+        """Scan each unique chunk once and report its findings at every occurrence"""
+        merged = ScanResult()
+        kept: Dict[str, int] = collections.Counter()
+        located = []
+        for chunks in plan.occurrences.values():
+            scan_result = self.scanner.scan(chunks[0].code)
+            entry = {"findings": [finding.to_dict() for finding in scan_result.findings]}
+            for chunk in chunks:
+                for rule_id, count in scan_result.matched_rules.items():
+                    merged.matched_rules[rule_id] = merged.matched_rules.get(rule_id, 0) + count
+                located.extend(self._unit_findings(chunk, entry))
+
+        for finding in sorted(located, key=lambda finding: (finding["line"], finding["column"])):
+            kept[finding["rule"]] += 1
+            if kept[finding["rule"]] <= self.scanner.max_locations_per_rule:
+                merged.findings.append(Finding(
+                    finding["rule"], finding["line"], finding["column"], finding["match"], finding["severity"]
+                ))
+        return merged
+
+    def _build_audit_report(self, contract_name: str, contract_code: str,
+                            stages: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Combine the chaingpt, rag and static stage outcomes into an audit report"""
+        chaingpt_stage, rag_stage, static_stage = stages["chaingpt"], stages["rag"], stages["static"]
+
+        if chaingpt_stage["status"] == "success":
+            chaingpt_results = chaingpt_stage["result"]
+        else:
+            chaingpt_results = {"status": "error", "error": chaingpt_stage["error"]}
+
+        if rag_stage["status"] == "success":
+            rag_insights = rag_stage["result"]
+        else:
+            rag_insights = f"RAG search failed: {rag_stage['error']}"
+
+        scan_result = static_stage.get("result") or ScanResult()
+
+        # Generate Security Recommendations
+        recommendations_started = time.perf_counter()
+        security_recommendations = self._generate_security_recommendations(
+            chaingpt_results, contract_code, scan_result
+        )
+        STAGE_LATENCY.labels("recommendations").observe(time.perf_counter() - recommendations_started)
+
+        partial = any(stage["status"] != "success" for stage in stages.values())
+
+        # Combine all analyses
+        return {
+            "contract_name": contract_name,
+            "timestamp": datetime.now().isoformat(),
+            "chaingpt_analysis": chaingpt_results,
+            "documentation_insights": rag_insights,
+            "security_recommendations": security_recommendations,
+            "static_findings": [finding.to_dict() for finding in scan_result.findings],
+            "stage_status": {
+                name: {"status": stage["status"], "elapsed_ms": stage["elapsed_ms"]}
+                for name, stage in stages.items()
+            },
+            "overall_status": "partial" if partial else "completed",
+            "service": "Auditooor Cloud Agent",
+            "version": self.version
+        }
+
+    async def audit_contract_incremental(self, contract_data: Dict[str, Any],
+                                         tenant: Optional[str] = None) -> Dict[str, Any]:
+        """Re-audit an edited contract, analyzing only the units changed since the project's last audit
+
+        Units are contracts' declarations, functions and modifiers. Static findings of unchanged
+        units are reused and the report carries a diff of new and resolved findings. The first
+        audit's ChainGPT analysis of the whole contract is kept as the baseline; afterwards each
+        unit not covered by it is analyzed on its own, and the report merges the baseline with
+        those per-unit analyses, so it always covers the whole contract. Project ids
+        are scoped to `tenant` (the admitted caller), so tenants never see each other's baselines.
+        """
+        started = time.perf_counter()
+        IN_FLIGHT.labels("audit_incremental").inc()
+        try:
+            project_id = contract_data.get("project_id")
+            contract_code = contract_data.get("contract_code", "")
+            contract_name = contract_data.get("contract_name", "Contract")
 
-            # Combine all analyses
-            audit_report = {
-                "contract_name": contract_name,
-                "timestamp": datetime.now().isoformat(),
-                "chaingpt_analysis": chaingpt_results,
-                "documentation_insights": rag_insights,
-                "security_recommendations": security_recommendations,
-                "overall_status": "completed",
-                "service": "Auditooor Cloud Agent",
-                "version": self.version
+            if not project_id:
+                return {"error": "project_id is required for incremental audits", "status": "error"}
+            if not contract_code.strip():
+                return {"error": "No contract code provided for audit", "status": "error"}
+
+            state_key = f"{tenant or 'anonymous'}:{project_id}"
+            units = split_source_units(contract_code)
+            previous = self.project_states.get(state_key)
+            previous_units = previous["units"] if previous else {}
+            changed = [unit for unit in units if unit.digest not in previous_units]
+
+            # ChainGPT coverage: the baseline's units plus units analyzed individually since
+            baseline = previous["chaingpt_baseline"] if previous else None
+            unit_analyses = previous["unit_analyses"] if previous else {}
+            covered = set(baseline["digests"]) | set(unit_analyses) if baseline else set()
+            unanalyzed = [unit for unit in units if unit.digest not in covered]
+
+            if baseline is None:
+                chaingpt_scope = "full"
+                chaingpt_call = lambda: self._analyze_contract(contract_code_hash(contract_code), contract_code, contract_name)
+            elif unanalyzed:
+                chaingpt_scope = "changed_units"
+                chaingpt_call = lambda: self._analyze_units(unanalyzed, contract_name)
+            else:
+                chaingpt_scope = "reused"
+                chaingpt_call = lambda: asyncio.sleep(0, {})
+
+            rag_query = f"smart contract security best practices for {contract_name} audit recommendations"
+            stage_calls = {
+                "chaingpt": chaingpt_call,
+                "rag": lambda: self._search_contracts_rag(rag_query),
+                "static": lambda: self._run_blocking(self._scan_units, units, previous_units),
+            }
+            # Stages cut off by the request deadline come back as errors, so the report is simply partial
+            with deadline_scope(Deadline.for_request(contract_data)):
+                outcomes = await asyncio.gather(*(self._run_stage(stage, call) for stage, call in stage_calls.items()))
+            stages = dict(zip(stage_calls, outcomes))
+
+            unit_results: Dict[str, Dict[str, Any]] = {}
+            if stages["static"]["status"] == "success":
+                unit_results, stages["static"]["result"] = stages["static"]["result"]
+
+            if stages["chaingpt"]["status"] == "success":
+                if baseline is None:
+                    baseline = {"analysis": stages["chaingpt"]["result"], "digests": [unit.digest for unit in units]}
+                else:
+                    # Analyses of units no longer in the source are dropped; failed units stay uncovered
+                    current_digests = {unit.digest for unit in units}
+                    unit_analyses = {
+                        digest: entry for digest, entry in {**unit_analyses, **stages["chaingpt"]["result"]}.items()
+                        if digest in current_digests
+                    }
+                    stages["chaingpt"]["result"] = self._merge_unit_analyses(baseline, unit_analyses, units)
+
+            audit_report = self._build_audit_report(contract_name, contract_code, stages)
+            current_findings = [
+                {**finding, "unit": unit.name}
+                for unit in units for finding in self._unit_findings(unit, unit_results.get(unit.digest))
+            ]
+            previous_findings = previous["findings"] if previous else []
+            new_findings, resolved_findings = self._diff_findings(previous_findings, current_findings)
+
+            current_names = {unit.name for unit in units}
+            audit_report["incremental"] = {
+                "project_id": project_id,
+                "chaingpt_scope": chaingpt_scope,
+                "analyzed_units": [unit.name for unit in unanalyzed] if chaingpt_scope == "changed_units" else [],
+                "changed_units": [unit.name for unit in changed],
+                "unchanged_units": len(units) - len(changed),
+                "removed_units": sorted({
+                    entry["name"] for entry in previous_units.values() if entry["name"] not in current_names
+                }),
+                "new_findings": new_findings,
+                "resolved_findings": resolved_findings
             }
 
-            print("✅ Comprehensive audit completed!")
+            # A partial audit leaves the previous state, so its changed units are analyzed again next time
+            if audit_report["overall_status"] != "partial":
+                self.project_states.set(state_key, {
+                    "units": unit_results,
+                    "findings": current_findings,
+                    "chaingpt_baseline": baseline,
+                    "unit_analyses": unit_analyses
+                })
+            await self._record_history(audit_report, contract_code_hash(contract_code), "audit_incremental")
             return audit_report
 
         except Exception as e:
-            return {
-                "error": f"Comprehensive audit failed: {str(e)}",
-                "status": "error"
-            }
+            return {"error": f"Incremental audit failed: {str(e)}", "status": "error"}
+
+        finally:
+            IN_FLIGHT.labels("audit_incremental").dec()
+            REQUEST_LATENCY.labels("audit_incremental").observe(time.perf_counter() - started)
+
+    async def _analyze_units(self, units: List[SourceUnit], contract_name: str) -> Dict[str, Dict[str, Any]]:
+        """ChainGPT analysis of each unit on its own, in parallel: {digest: {"unit", "analysis"}}
+
+        Units whose analysis fails are left out (and so are retried next time); raises when all fail.
+        """
+        semaphore = asyncio.Semaphore(self.chunk_concurrency)
+
+        async def analyze(unit: SourceUnit):
+            async with semaphore:
+                try:
+                    analysis = await self._analyze_contract(unit.digest, unit.code, f"{contract_name}:{unit.name}")
+                except Exception as e:
+                    return unit, None, str(e)
+            if isinstance(analysis, dict) and analysis.get("status") == "error":
+                return unit, None, analysis.get("error")
+            return unit, analysis, None
+
+        results = await asyncio.gather(*(analyze(unit) for unit in units))
+        analyses = {unit.digest: {"unit": unit.name, "analysis": analysis}
+                    for unit, analysis, _ in results if analysis is not None}
+        if units and not analyses:
+            raise RuntimeError(f"all {len(units)} unit analyses failed: {results[0][2]}")
+        return analyses
+
+    @staticmethod
+    def _merge_unit_analyses(baseline: Dict[str, Any], unit_analyses: Dict[str, Dict[str, Any]],
+                             units: List[SourceUnit]) -> Dict[str, Any]:
+        """Whole-contract ChainGPT result: the baseline plus the newer analyses of units edited since"""
+        baseline_digests = set(baseline["digests"])
+        return {
+            "status": "success",
+            "baseline": baseline["analysis"],
+            "baseline_covers": [unit.name for unit in units if unit.digest in baseline_digests],
+            "units": [unit_analyses[unit.digest] for unit in units if unit.digest in unit_analyses]
+        }
+
+    def _scan_units(self, units: List[SourceUnit],
+                    previous_units: Dict[str, Dict[str, Any]]) -> Tuple[Dict[str, Dict[str, Any]], ScanResult]:
+        """Scan changed units and reuse stored results for the rest, merged into one ScanResult"""
+        unit_results: Dict[str, Dict[str, Any]] = {}
+        merged = ScanResult()
+        kept: Dict[str, int] = collections.Counter()
+        for unit in units:
+            entry = previous_units.get(unit.digest)
+            if entry is None:
+                scan_result = self.scanner.scan(unit.code)
+                # Positions are stored relative to the unit so they survive edits elsewhere in the file
+                entry = {
+                    "name": unit.name,
+                    "findings": [finding.to_dict() for finding in scan_result.findings],
+                    "matched_rules": scan_result.matched_rules
+                }
+            unit_results[unit.digest] = {**entry, "name": unit.name}
+
+            for rule_id, count in entry["matched_rules"].items():
+                merged.matched_rules[rule_id] = merged.matched_rules.get(rule_id, 0) + count
+            for finding in self._unit_findings(unit, entry):
+                kept[finding["rule"]] += 1
+                if kept[finding["rule"]] <= self.scanner.max_locations_per_rule:
+                    merged.findings.append(Finding(
+                        finding["rule"], finding["line"], finding["column"], finding["match"], finding["severity"]
+                    ))
+        return unit_results, merged
+
+    @staticmethod
+    def _unit_findings(unit: SourceUnit, entry: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """A unit's stored findings translated to positions in the whole file"""
+        findings = []
+        for finding in (entry or {}).get("findings", []):
+            column = finding["column"] + (unit.start_column - 1 if finding["line"] == 1 else 0)
+            findings.append({**finding, "line": unit.start_line + finding["line"] - 1, "column": column})
+        return findings
+
+    @staticmethod
+    def _diff_findings(previous: List[Dict[str, Any]],
+                       current: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """New and resolved findings, matched by unit, rule and matched text rather than position"""
+        def key(finding: Dict[str, Any]) -> tuple:
+            return finding["unit"], finding["rule"], finding["match"]
+
+        remaining = collections.Counter(key(finding) for finding in previous)
+        new_findings = []
+        for finding in current:
+            if remaining[key(finding)] > 0:
+                remaining[key(finding)] -= 1
+            else:
+                new_findings.append(finding)
 
-    def _generate_security_recommendations(self, chaingpt_results: Dict[str, Any], contract_code: str) -> List[str]:
+        still_present = collections.Counter(key(finding) for finding in current)
+        resolved_findings = []
+        for finding in previous:
+            if still_present[key(finding)] > 0:
+                still_present[key(finding)] -= 1
+            else:
+                resolved_findings.append(finding)
+        return new_findings, resolved_findings
+
+    def _partial_stage_result(self, stage: str, result: Any) -> Dict[str, Any]:
+        """Report fields a finished stage contributes, so clients can render them early"""
+        if stage == "chaingpt":
+            return {"chaingpt_analysis": result}
+        if stage == "rag":
+            return {"documentation_insights": result}
+        return {
+            "static_findings": [finding.to_dict() for finding in result.findings],
+            "security_recommendations": self.scanner.recommendations(result)
+        }
+
+    async def audit_contracts_batch(self, contracts: List[Dict[str, Any]],
+                                    concurrency: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Audit many contracts with bounded concurrency, yielding reports in completion order
+
+        Contracts after the first are paced by the admitted tenant's token bucket, so one
+        large batch cannot take more than its tier's share of upstream capacity.
+
+        Each item is the regular audit_contract_comprehensive report plus its `batch_index`
+        in the submitted list.
+        """
+        concurrency = max(1, min(concurrency or self.batch_concurrency, len(contracts) or 1))
+        pending: asyncio.Queue = asyncio.Queue()
+        for index, contract_data in enumerate(contracts):
+            pending.put_nowait((index, contract_data))
+        completed: asyncio.Queue = asyncio.Queue()
+
+        async def worker():
+            while True:
+                try:
+                    index, contract_data = pending.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    if index:
+                        # The first contract was paid for at admission; the rest follow the tenant's rate
+                        await self.admission.pace()
+                    if isinstance(contract_data, dict):
+                        report = await self.audit_contract_comprehensive(contract_data)
+                    else:
+                        report = {"error": "Batch entries must be objects with contract_code", "status": "error"}
+                except Exception as e:
+                    # Every index must be answered, or the consumer would wait for it forever
+                    report = {"error": f"Batch audit failed: {str(e)}", "status": "error"}
+                report["batch_index"] = index
+                await completed.put(report)
+
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        try:
+            for _ in range(len(contracts)):
+                yield await completed.get()
+        finally:
+            # Stop outstanding work if the consumer goes away mid-stream
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    def _generate_security_recommendations(self, chaingpt_results: Dict[str, Any], contract_code: str,
+                                           scan_result: Optional[ScanResult] = None) -> List[str]:
         """Generate security recommendations based on audit results and code analysis"""
 
         recommendations = [
@@ -415,23 +1065,10 @@ contract {name} is ERC721, ERC721URIStorage, Ownable, ReentrancyGuard {{
             "🔍 Implement input validation for all external function parameters",
         ]
 
-        # Analyze contract code for specific recommendations
-        code_lower = contract_code.lower()
-
-        if "payable" in code_lower:
-            recommendations.append("💰 Review all payable functions for proper access control and reentrancy protection")
-
-        if "selfdestruct" in code_lower:
-            recommendations.append("⚠️ Consider removing selfdestruct functionality or add strict access controls")
-
-        if "delegatecall" in code_lower:
-            recommendations.append("🚨 Audit delegatecall usage carefully - potential for storage collision attacks")
-
-        if "_mint" in code_lower and "onlyowner" not in code_lower:
-            recommendations.append("🏭 Ensure minting functions have proper access control (onlyOwner modifier)")
-
-        if "transfer" in code_lower and "require" not in code_lower:
-            recommendations.append("✅ Add require statements to validate transfer operations")
+        # Analyze contract code for specific recommendations (comments and strings are ignored)
+        if scan_result is None:
+            scan_result = self.scanner.scan(contract_code)
+        recommendations.extend(self.scanner.recommendations(scan_result))
 
         # Add specific recommendations based on ChainGPT findings
         if isinstance(chaingpt_results, dict) and chaingpt_results.get("status") == "success":
@@ -440,22 +1077,43 @@ contract {name} is ERC721, ERC721URIStorage, Ownable, ReentrancyGuard {{
         return recommendations
 
     async def generate_contract_with_audit(self, generation_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate contract and perform immediate audit"""
+        """Generate contract and perform immediate audit
+
+        Generation and the audit share one deadline (`timeout_seconds`), so a slow
+        OpenZeppelin call leaves the audit stages correspondingly less time.
+        """
+        started = time.perf_counter()
+        IN_FLIGHT.labels("generate_with_audit").inc()
+        try:
+            try:
+                deadline = Deadline.for_request(generation_data)
+            except ValueError as e:
+                return {"error": str(e), "status": "error"}
+            with deadline_scope(deadline):
+                return await self._generate_contract_with_audit(generation_data)
+        finally:
+            IN_FLIGHT.labels("generate_with_audit").dec()
+            REQUEST_LATENCY.labels("generate_with_audit").observe(time.perf_counter() - started)
+
+    async def _generate_contract_with_audit(self, generation_data: Dict[str, Any]) -> Dict[str, Any]:
         try:
             contract_type = generation_data.get("contract_type", "").lower()
             requirements = generation_data.get("requirements", {})
 
             # Generate the contract
+            generation_started = time.perf_counter()
             if contract_type == "erc20":
-                generation_result = self.generate_erc20_template(requirements)
+                generation_result = await self.generate_erc20_template_async(requirements)
             elif contract_type == "erc721":
-                generation_result = self.generate_erc721_template(requirements)
+                generation_result = await self.generate_erc721_template_async(requirements)
             else:
                 return {
                     "error": f"Unsupported contract type: {contract_type}",
                     "status": "error"
                 }
 
+            STAGE_LATENCY.labels("generation").observe(time.perf_counter() - generation_started)
+
             if generation_result.get("status") != "success":
                 return generation_result
 
@@ -481,5 +1139,139 @@ contract {name} is ERC721, ERC721URIStorage, Ownable, ReentrancyGuard {{
                 "status": "error"
             }
 
-# Global instance for HTTP endpoint usage
-auditooor_cloud = AuditooorCloud()
\ No newline at end of file
+    def _skeleton_reference(self, template_key: str, flag_values: Tuple[bool, ...]) -> str:
+        """Canonical rendering of a skeleton: default parameters and a fixed timestamp, so its
+        audit is cached across batches"""
+        template = self.templates.get(template_key)
+        requirements = dict(zip(template.feature_flags, flag_values))
+        return self.templates.render(template_key, requirements, generated_on="skeleton").contract_code
+
+    async def generate_contracts_batch(self, batch_data: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """Generate many contracts from the internal templates, auditing each skeleton once
+
+        `batch_data["tokens"]` holds one requirements object per contract (name, symbol,
+        premint, feature flags, optionally its own contract_type; the batch's contract_type
+        is the default). Contracts are grouped by template and feature flags; parameters are
+        validated so they cannot change the code structure, which lets one audit of the
+        skeleton stand for every contract in its group. Yields NDJSON-ready items:
+        `error` for rejected tokens, then per skeleton a `skeleton_audit` followed by its
+        `contract`s as each audit finishes, and a final `summary`.
+        """
+        started = time.perf_counter()
+        deadline = Deadline.for_request(batch_data)
+        tokens = batch_data.get("tokens") or []
+        default_type = str(batch_data.get("contract_type", "erc20")).lower()
+        IN_FLIGHT.labels("generate_batch").inc()
+        tasks: List[asyncio.Task] = []
+        errors = 0
+        try:
+            # (template key, flags) -> batch indexes, in input order
+            groups: Dict[Tuple[str, Tuple[bool, ...]], List[int]] = {}
+            for index, requirements in enumerate(tokens):
+                template_key = None
+                if not isinstance(requirements, dict):
+                    problems = ["Tokens must be objects"]
+                else:
+                    template_key = str(requirements.get("contract_type", default_type)).lower()
+                    if template_key in self.templates:
+                        problems = self.templates.invalid_parameters(template_key, requirements)
+                    else:
+                        problems = [f"Unsupported contract type: {template_key}"]
+                if problems:
+                    errors += 1
+                    yield {"type": "error", "batch_index": index, "status": "error", "error": "; ".join(problems)}
+                    continue
+                groups.setdefault((template_key, self.templates.resolve_flags(template_key, requirements)), []).append(index)
+
+            # One rendering pass per contract type; every skeleton compiles at most once
+            generated_on = datetime.now().isoformat()
+            by_type: Dict[str, List[int]] = {}
+            for (template_key, _), members in groups.items():
+                by_type.setdefault(template_key, []).extend(members)
+            rendered = {}
+            for template_key, indexes in by_type.items():
+                contracts = self.templates.render_many(template_key, [tokens[index] for index in indexes], generated_on)
+                rendered.update(zip(indexes, contracts))
+            GENERATIONS.labels("template").inc(len(rendered))
+
+            semaphore = asyncio.Semaphore(self.batch_concurrency)
+
+            async def audit_skeleton(group_number: int, group_key: Tuple[str, Tuple[bool, ...]]):
+                template_key, flag_values = group_key
+                with deadline_scope(deadline):
+                    async with semaphore:
+                        if group_number:
+                            # The first skeleton was paid for at admission; the rest follow the tenant's rate
+                            await self.admission.pace()
+                        reference = self._skeleton_reference(template_key, flag_values)
+                        template = self.templates.get(template_key)
+                        report = await self.audit_contract_comprehensive({
+                            "contract_code": reference,
+                            "contract_name": f"{template.contract_type} skeleton"
+                        })
+                return group_key, contract_code_hash(reference)[:16], report
+
+            tasks = [asyncio.create_task(audit_skeleton(number, key)) for number, key in enumerate(groups)]
+            for next_audit in asyncio.as_completed(tasks):
+                group_key, skeleton_id, report = await next_audit
+                template_key, flag_values = group_key
+                members = groups[group_key]
+                audit_status = report.get("overall_status", report.get("status"))
+                yield {
+                    "type": "skeleton_audit",
+                    "skeleton_id": skeleton_id,
+                    "contract_type": self.templates.get(template_key).contract_type,
+                    "feature_flags": dict(zip(self.templates.get(template_key).feature_flags, flag_values)),
+                    "contracts": len(members),
+                    "audit": report
+                }
+                for index in members:
+                    contract = rendered[index]
+                    yield {
+                        "type": "contract",
+                        "batch_index": index,
+                        "skeleton_id": skeleton_id,
+                        "audit_status": audit_status,
+                        "generation": {
+                            "contract_code": contract.contract_code,
+                            "contract_name": contract.contract_name,
+                            "contract_type": contract.contract_type,
+                            "features": contract.features,
+                            "status": "success",
+                            "timestamp": contract.generated_on
+                        }
+                    }
+
+            yield {
+                "type": "summary",
+                "contracts": len(rendered),
+                "skeletons": len(groups),
+                "errors": errors,
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 2)
+            }
+        finally:
+            # Consumer disconnected mid-stream: stop auditing skeletons nobody will receive
+            for task in tasks:
+                task.cancel()
+            IN_FLIGHT.labels("generate_batch").dec()
+            REQUEST_LATENCY.labels("generate_batch").observe(time.perf_counter() - started)
+
+
+MODULE_LOAD_SECONDS = round(time.perf_counter() - _MODULE_LOAD_STARTED, 6)
+
+_auditooor_cloud: Optional[AuditooorCloud] = None
+
+
+def get_auditooor_cloud() -> AuditooorCloud:
+    """Global instance for HTTP endpoint usage, created on first use"""
+    global _auditooor_cloud
+    if _auditooor_cloud is None:
+        _auditooor_cloud = AuditooorCloud()
+    return _auditooor_cloud
+
+
+def __getattr__(name: str):
+    # Keeps `from auditooor_cloud import auditooor_cloud` working without building it at import time
+    if name == "auditooor_cloud":
+        return get_auditooor_cloud()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
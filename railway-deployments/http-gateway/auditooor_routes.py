@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Auditooor HTTP routes - ServiceFlow AI
+FastAPI router exposing the Auditooor Cloud Agent; mount it in the gateway with
+`app.include_router(auditooor_router)`
+"""
+
+import os
+import asyncio
+from contextlib import aclosing, asynccontextmanager
+from typing import Annotated, Dict, Any, List, Literal, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse, Response
+from pydantic import BaseModel, Field, field_validator
+
+from admission import Admission, AdmissionRejected
+from audit_history import MAX_PAGE_SIZE, client_label
+from audit_jobs import check_webhook_url
+from response_encoding import VIEWS, dumps_line, encoded_response, shape
+from auditooor_cloud import get_auditooor_cloud
+from gateway_metrics import REGISTRY, PROMETHEUS_CONTENT_TYPE
+
+
+@asynccontextmanager
+async def auditooor_lifespan(app):
+    """Pre-warm integrations, pools and templates at gateway startup; close pools on shutdown"""
+    cloud = get_auditooor_cloud()
+    await cloud.warm_up()
+    await cloud.jobs.start()
+    try:
+        yield
+    finally:
+        await cloud.aclose()
+
+
+# The lifespan is merged into the app's own when mounted with include_router
+auditooor_router = APIRouter(prefix="/auditooor", tags=["auditooor"], lifespan=auditooor_lifespan)
+
+MAX_BATCH_SIZE = 1000
+MAX_GENERATION_BATCH_SIZE = 5000
+
+# Keys allowed to read every client's audit history and jobs (support, compliance); others see only their own
+HISTORY_ADMIN_KEYS = {key.strip() for key in os.getenv("AUDITOOOR_HISTORY_ADMIN_KEYS", "").split(",") if key.strip()}
+# Reverse proxies in front of the gateway that append to X-Forwarded-For (1 behind Railway's edge)
+TRUSTED_PROXY_HOPS = int(os.getenv("AUDITOOOR_TRUSTED_PROXY_HOPS", "0"))
+
+
+class AuditRequest(BaseModel):
+    contract_code: str
+    contract_name: str = "Contract"
+    use_cache: bool = True
+    timeout_seconds: Optional[float] = Field(
+        None, gt=0, le=3600, description="Time budget for the whole audit; stages still running when it passes are cancelled"
+    )
+
+
+class GenerationRequest(BaseModel):
+    contract_type: Literal["erc20", "erc721"] = "erc20"
+    requirements: Dict[str, Any] = Field(
+        default_factory=dict, description="name, symbol, premint/baseUri and feature flags"
+    )
+    timeout_seconds: Optional[float] = Field(None, gt=0, le=3600, description="Time budget for generation and audit")
+
+
+class IncrementalAuditRequest(AuditRequest):
+    project_id: str = Field(..., min_length=1, description="Groups successive revisions of the same contract")
+
+
+class BatchAuditRequest(BaseModel):
+    contracts: List[Dict[str, Any]] = Field(..., description="Objects with contract_code and contract_name")
+    concurrency: Optional[int] = Field(None, ge=1, le=64)
+
+
+class BatchGenerationRequest(BaseModel):
+    contract_type: Literal["erc20", "erc721"] = "erc20"
+    tokens: List[Dict[str, Any]] = Field(
+        ..., description="One requirements object per contract: name, symbol, premint/baseUri and feature flags"
+    )
+    timeout_seconds: Optional[float] = Field(None, gt=0, le=3600, description="Time budget for the skeleton audits")
+
+
+class JobRequest(BaseModel):
+    kind: Literal["audit", "generate_with_audit", "audit_incremental"] = "audit"
+    payload: Dict[str, Any] = Field(..., description="Arguments for the AuditooorCloud method behind `kind`")
+    priority: int = Field(0, description="Higher runs first")
+    webhook_url: Optional[str] = Field(
+        None, description="https URL on a public host; receives the finished job as a JSON POST"
+    )
+
+    @field_validator("webhook_url")
+    @classmethod
+    def public_webhook(cls, webhook_url: Optional[str]) -> Optional[str]:
+        return webhook_url if webhook_url is None else check_webhook_url(webhook_url)
+
+
+class ResponseShape(BaseModel):
+    """How a JSON report is trimmed before it is sent"""
+
+    view: Literal[tuple(VIEWS)] = Field(
+        "full", description="compact drops the echoed source and verbose analyses; recommendations keeps findings only"
+    )
+    fields: Optional[str] = Field(
+        None, description="Comma-separated dotted paths to keep, e.g. audit.security_recommendations"
+    )
+    exclude: Optional[str] = Field(None, description="Comma-separated dotted paths to drop")
+
+
+def shaped(request: Request, payload: Any, response_shape: ResponseShape, report_key: Optional[str] = None):
+    """Send `payload` as compact JSON, compressed as the client allows
+
+    The projection applies to the whole payload, or only to `payload[report_key]` for
+    envelopes around a report (history entries, jobs).
+    """
+    shape_args = (response_shape.view, response_shape.fields, response_shape.exclude)
+    if report_key is None:
+        payload = shape(payload, *shape_args)
+    elif isinstance(payload.get(report_key), dict):
+        payload = {**payload, report_key: shape(payload[report_key], *shape_args)}
+    return encoded_response(request, payload)
+
+
+def request_api_key(request: Request) -> Optional[str]:
+    """API key from the X-API-Key header or a Bearer token"""
+    api_key = request.headers.get("x-api-key")
+    authorization = request.headers.get("authorization", "")
+    if not api_key and authorization.lower().startswith("bearer "):
+        api_key = authorization[7:].strip()
+    return api_key
+
+
+def client_address(request: Request) -> Optional[str]:
+    """Caller address: the X-Forwarded-For entry added by the outermost trusted proxy, else the peer
+
+    Entries left of that one are supplied by the client and never trusted.
+    """
+    peer = request.client.host if request.client else None
+    if TRUSTED_PROXY_HOPS <= 0:
+        return peer
+    hops = [hop.strip() for header in request.headers.getlist("x-forwarded-for") for hop in header.split(",")]
+    hops = [hop for hop in hops if hop]
+    return hops[-TRUSTED_PROXY_HOPS] if len(hops) >= TRUSTED_PROXY_HOPS else peer
+
+
+def admit(request: Request, operation: str) -> Admission:
+    """Admit a request by its API key, or answer 429 with Retry-After"""
+    api_key = request_api_key(request)
+    try:
+        return get_auditooor_cloud().admission.admit(api_key, operation, client_address(request))
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=429, detail=e.reason, headers={"Retry-After": str(e.retry_after)})
+
+
+@auditooor_router.get("/ready")
+async def auditooor_ready():
+    """Readiness probe: 503 until startup warm-up has completed"""
+    cloud = get_auditooor_cloud()
+    if not cloud.ready:
+        raise HTTPException(status_code=503, detail="Auditooor is warming up")
+    return {"status": "ready"}
+
+
+@auditooor_router.get("/startup")
+async def auditooor_startup():
+    """Cold-start report: import times per dependency and warm-up step timings"""
+    return get_auditooor_cloud().startup_report or {"ready": False}
+
+
+@auditooor_router.get("/stats")
+async def auditooor_stats():
+    """Cache counters, request coalescing, admission queues and upstream circuit breaker state"""
+    cloud = get_auditooor_cloud()
+    return {
+        "cache": cloud.cache_stats(),
+        "admission": cloud.admission.stats(),
+        "coalescing": cloud.coalescing_stats(),
+        "hedging": cloud.hedging_stats(),
+        "history": await asyncio.to_thread(cloud.history_stats),
+        "jobs": await cloud.jobs.stats(),
+        "circuit_breakers": cloud.circuit_stats()
+    }
+
+
+@auditooor_router.get("/metrics")
+async def auditooor_metrics():
+    """Prometheus scrape endpoint"""
+    return Response(REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@auditooor_router.post("/audit/batch")
+async def audit_batch(request: BatchAuditRequest, http_request: Request):
+    """Audit many contracts, streaming one NDJSON report per line as each audit completes"""
+    if not request.contracts:
+        raise HTTPException(status_code=400, detail="No contracts provided for audit")
+    if len(request.contracts) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"Batch limited to {MAX_BATCH_SIZE} contracts")
+    admit(http_request, "audit")
+
+    async def ndjson_reports():
+        async for report in get_auditooor_cloud().audit_contracts_batch(request.contracts, request.concurrency):
+            yield dumps_line(report)
+
+    return StreamingResponse(ndjson_reports(), media_type="application/x-ndjson")
+
+
+@auditooor_router.post("/generate/batch")
+async def generate_batch(request: BatchGenerationRequest, http_request: Request):
+    """Generate many contracts, streaming NDJSON: one audit per unique skeleton, then its contracts"""
+    if not request.tokens:
+        raise HTTPException(status_code=400, detail="No tokens provided for generation")
+    if len(request.tokens) > MAX_GENERATION_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"Batch limited to {MAX_GENERATION_BATCH_SIZE} contracts")
+    admit(http_request, "generate_batch")
+
+    async def ndjson_items():
+        async for item in get_auditooor_cloud().generate_contracts_batch(request.model_dump()):
+            yield dumps_line(item)
+
+    return StreamingResponse(ndjson_items(), media_type="application/x-ndjson")
+
+
+@auditooor_router.post("/generate")
+async def generate_with_audit(request: GenerationRequest, http_request: Request,
+                              response_shape: Annotated[ResponseShape, Query()]):
+    """Generate a contract and audit it; use view/fields to leave out the source or verbose analyses"""
+    admit(http_request, "generate_with_audit")
+    result = await get_auditooor_cloud().generate_contract_with_audit(request.model_dump())
+    if result.get("status") == "error":
+        raise HTTPException(status_code=400, detail=result["error"])
+    return shaped(http_request, result, response_shape)
+
+
+@auditooor_router.post("/audit/incremental")
+async def audit_incremental(request: IncrementalAuditRequest, http_request: Request,
+                            response_shape: Annotated[ResponseShape, Query()]):
+    """Re-audit a revision, analyzing only units changed since the project's previous audit"""
+    admission = admit(http_request, "audit_incremental")
+    report = await get_auditooor_cloud().audit_contract_incremental(
+        request.model_dump(), client_label(admission.tenant)
+    )
+    if report.get("status") == "error":
+        raise HTTPException(status_code=400, detail=report["error"])
+    return shaped(http_request, report, response_shape)
+
+
+@auditooor_router.post("/audit/stream")
+async def audit_stream(audit_request: AuditRequest, request: Request):
+    """Stream audit progress events as Server-Sent Events (Accept: text/event-stream) or NDJSON"""
+    admit(request, "audit")
+    use_sse = "text/event-stream" in request.headers.get("accept", "")
+
+    async def events():
+        async with aclosing(get_auditooor_cloud().audit_contract_stream(audit_request.model_dump())) as stream:
+            async for event in stream:
+                yield event.to_sse() if use_sse else event.to_ndjson()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream" if use_sse else "application/x-ndjson",
+        # Stop reverse proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@auditooor_router.post("/jobs", status_code=202)
+async def submit_job(request: JobRequest, http_request: Request):
+    """Queue an audit in the background; poll GET /auditooor/jobs/{job_id} or wait for the webhook"""
+    admission = admit(http_request, request.kind)
+    client = client_label(admission.tenant)
+    # Overrides any client-supplied value: incremental state is scoped to the admitted tenant
+    payload = {**request.payload, "tenant": client}
+    job = await get_auditooor_cloud().jobs.submit(request.kind, payload, request.priority, request.webhook_url, client)
+    if job.get("status") == "error":
+        raise HTTPException(status_code=400, detail=job["error"])
+    return {"job_id": job["job_id"], "status": job["status"], "priority": job["priority"]}
+
+
+def caller_client(request: Request) -> Optional[str]:
+    """Client label the caller's reads are limited to, None for history admins"""
+    api_key = request_api_key(request)
+    if api_key and api_key in HISTORY_ADMIN_KEYS:
+        return None
+    tenant, _ = get_auditooor_cloud().admission.resolve(api_key, client_address(request))
+    return client_label(tenant)
+
+
+def history_client(request: Request) -> Optional[str]:
+    """History client the caller is limited to, None for history admins
+
+    Anonymous callers get 401: addresses are shared behind NAT and proxies, so they do not
+    identify whose audits they may read.
+    """
+    scope = caller_client(request)
+    if scope is not None and not scope.startswith("key:"):
+        raise HTTPException(status_code=401, detail="Audit history requires an API key",
+                            headers={"WWW-Authenticate": "Bearer"})
+    return scope
+
+
+@auditooor_router.get("/history")
+async def audit_history(
+    http_request: Request,
+    code_hash: Optional[str] = None,
+    contract_name: Optional[str] = None,
+    client: Optional[str] = Query(None, description="Only honored for history admin keys"),
+    status: Optional[Literal["completed", "partial"]] = None,
+    since: Optional[float] = Query(None, description="Unix timestamp, inclusive"),
+    until: Optional[float] = Query(None, description="Unix timestamp, exclusive"),
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, pattern=r"^\d+$", description="next_cursor of the previous page")
+):
+    """Past audits, newest first, without their reports; fetch one with GET /auditooor/history/{audit_id}"""
+    scope = history_client(http_request)
+    # SQLite reads block, so they run off the event loop like the job store's
+    return await asyncio.to_thread(
+        get_auditooor_cloud().history.query,
+        code_hash=code_hash, contract_name=contract_name, client=client if scope is None else scope,
+        status=status, since=since, until=until, limit=limit, cursor=cursor
+    )
+
+
+@auditooor_router.get("/history/{audit_id}")
+async def audit_history_entry(audit_id: int, http_request: Request, response_shape: Annotated[ResponseShape, Query()]):
+    """A stored audit report as it was returned, with its summary"""
+    scope = history_client(http_request)
+    entry = await asyncio.to_thread(get_auditooor_cloud().history.get, audit_id)
+    if entry is None or (scope is not None and entry["client"] != scope):
+        raise HTTPException(status_code=404, detail=f"Unknown audit: {audit_id}")
+    return shaped(http_request, entry, response_shape, report_key="report")
+
+
+@auditooor_router.get("/jobs/{job_id}")
+async def get_job(job_id: str, http_request: Request, response_shape: Annotated[ResponseShape, Query()]):
+    """Job state, attempts and, once finished, its result or last error
+
+    Only the client that submitted the job (the same API key, or for anonymous jobs the same
+    address) can read it; others get the same 404 as for an unknown id.
+    """
+    scope = caller_client(http_request)
+    job = await get_auditooor_cloud().jobs.get(job_id)
+    if job is None or (scope is not None and job["client"] != scope):
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return shaped(http_request, job, response_shape, report_key="result")
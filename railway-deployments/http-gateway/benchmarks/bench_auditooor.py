@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Auditooor offline benchmark - ServiceFlow AI
+Measures AuditooorCloud entry points against local stand-ins for ChainGPT, RAG and
+OpenZeppelin MCP: p50/p95/p99 latency, throughput per concurrency level and peak
+memory, optionally compared against a stored baseline.
+
+Usage:
+    python benchmarks/bench_auditooor.py --concurrency 1,8,32 --requests 100
+    python benchmarks/bench_auditooor.py --save-baseline benchmarks/baseline.json
+    python benchmarks/bench_auditooor.py --baseline benchmarks/baseline.json --tolerance 0.15
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, List, Callable, Awaitable
+
+GATEWAY_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(GATEWAY_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from standins import LatencyProfile, UpstreamStandIns, OpenZeppelinStandInServer
+
+SCENARIOS = (
+    "erc20_template",
+    "erc721_template",
+    "erc20_fallback",
+    "audit",
+    "audit_cached",
+    "generate_with_audit",
+)
+
+SAMPLE_CONTRACT = """// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.20;
+
+contract Vault {
+    mapping(address => uint256) public balances;
+
+    function deposit() external payable {
+        balances[msg.sender] += msg.value;
+    }
+
+    function withdraw(uint256 amount) external {
+        require(balances[msg.sender] >= amount, "insufficient");
+        balances[msg.sender] -= amount;
+        payable(msg.sender).transfer(amount);
+    }
+}
+"""
+
+
+def percentile(sorted_samples: List[float], q: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, max(0, int(round(q * (len(sorted_samples) - 1)))))
+    return sorted_samples[index]
+
+
+def build_scenario(name: str, cloud) -> Callable[[int], Awaitable[Dict[str, Any]]]:
+    """One request of a scenario; `i` makes each request's input unique where it matters"""
+
+    async def in_thread(func, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    if name == "erc20_template":
+        return lambda i: in_thread(cloud.generate_erc20_template, {"name": f"Token{i}", "symbol": "TK"})
+    if name == "erc721_template":
+        return lambda i: in_thread(cloud.generate_erc721_template, {"name": f"Nft{i}", "symbol": "NF"})
+    if name == "erc20_fallback":
+        return lambda i: in_thread(cloud._render_erc20_fallback, {"name": f"Token{i}", "burnable": i % 2 == 0})
+    if name == "audit":
+        return lambda i: cloud.audit_contract_comprehensive({
+            "contract_code": SAMPLE_CONTRACT.replace("Vault", f"Vault{i}"),
+            "contract_name": f"Vault{i}",
+            "use_cache": False,
+        })
+    if name == "audit_cached":
+        return lambda i: cloud.audit_contract_comprehensive({
+            "contract_code": SAMPLE_CONTRACT,
+            "contract_name": "Vault",
+        })
+    if name == "generate_with_audit":
+        return lambda i: cloud.generate_contract_with_audit({
+            "contract_type": "erc20",
+            "requirements": {"name": f"Token{i}", "symbol": "TK"},
+        })
+    raise ValueError(f"Unknown scenario: {name}")
+
+
+def is_error(result: Dict[str, Any]) -> bool:
+    if not isinstance(result, dict):
+        return True
+    if result.get("status") == "error":
+        return True
+    audit = result.get("audit", result)
+    return audit.get("overall_status") == "partial"
+
+
+async def run_load(request: Callable[[int], Awaitable[Dict[str, Any]]], total: int, concurrency: int) -> Dict[str, Any]:
+    """Issue `total` requests with at most `concurrency` in flight"""
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            started = time.perf_counter()
+            try:
+                result = await request(i)
+                failed = is_error(result)
+            except Exception:
+                failed = True
+            latencies.append(time.perf_counter() - started)
+            errors += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "throughput_rps": round(total / wall, 2) if wall else 0.0,
+    }
+
+
+async def measure_peak_memory(request: Callable[[int], Awaitable[Dict[str, Any]]], total: int,
+                              concurrency: int) -> float:
+    """Peak traced allocation (KiB) for a short run; kept separate so tracing doesn't skew latency"""
+    tracemalloc.start()
+    try:
+        await run_load(request, total, concurrency)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(peak / 1024, 1)
+
+
+async def run_benchmarks(args) -> Dict[str, Dict[str, Any]]:
+    upstreams = UpstreamStandIns(
+        chaingpt=LatencyProfile(args.chaingpt_ms, args.chaingpt_ms * args.jitter, args.chaingpt_error_rate),
+        rag=LatencyProfile(args.rag_ms, args.rag_ms * args.jitter, args.rag_error_rate),
+    ).install()
+    oz_server = OpenZeppelinStandInServer(
+        LatencyProfile(args.oz_ms, args.oz_ms * args.jitter, args.oz_error_rate)
+    ).start()
+    os.environ["OZ_MCP_URL"] = oz_server.url
+
+    from auditooor_cloud import AuditooorCloud
+    from audit_cache import AuditCache
+    from audit_history import AuditHistory
+
+    concurrency_levels = [int(c) for c in args.concurrency.split(",")]
+    max_workers = max(concurrency_levels) + 4
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=max_workers))
+
+    results: Dict[str, Dict[str, Any]] = {}
+    try:
+        for scenario in args.scenarios.split(","):
+            for concurrency in concurrency_levels:
+                # Fresh instance per run: cold cache, closed breaker, pool sized for the load; the
+                # history stays in memory so no SQLite writes are timed and no database is left behind
+                cloud = AuditooorCloud(max_workers=max_workers, cache=AuditCache(db_path=""),
+                                       history=AuditHistory(db_path=""))
+                request = build_scenario(scenario, cloud)
+                await request(-1)  # warm connection pools and caches
+
+                stats = await run_load(request, args.requests, concurrency)
+                if not args.no_memory:
+                    stats["peak_memory_kb"] = await measure_peak_memory(
+                        request, min(args.requests, args.memory_requests), concurrency
+                    )
+                results[f"{scenario}@{concurrency}"] = stats
+                print(format_row(scenario, stats), flush=True)
+                await cloud.aclose()
+    finally:
+        oz_server.stop()
+
+    print(f"\nUpstream calls: chaingpt={upstreams.calls['chaingpt']} rag={upstreams.calls['rag']} "
+          f"openzeppelin={oz_server.requests}")
+    return results
+
+
+def format_row(scenario: str, stats: Dict[str, Any]) -> str:
+    memory = f"{stats['peak_memory_kb']:>10.1f}" if "peak_memory_kb" in stats else f"{'-':>10}"
+    return (f"{scenario:<22}{stats['concurrency']:>5}{stats['p50_ms']:>11.2f}{stats['p95_ms']:>11.2f}"
+            f"{stats['p99_ms']:>11.2f}{stats['throughput_rps']:>11.1f}{stats['errors']:>7}{memory}")
+
+
+def compare_with_baseline(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+                          tolerance: float) -> List[str]:
+    """Regressions where p95 grew or throughput dropped by more than `tolerance`"""
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if not previous:
+            continue
+        if previous["p95_ms"] and current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{key}: p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms")
+        if previous["throughput_rps"] and current["throughput_rps"] < previous["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{key}: throughput {previous['throughput_rps']} -> {current['throughput_rps']} req/s")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline Auditooor benchmark")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated scenario names")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=50, help="Requests per scenario and concurrency level")
+    parser.add_argument("--chaingpt-ms", type=float, default=200.0)
+    parser.add_argument("--rag-ms", type=float, default=120.0)
+    parser.add_argument("--oz-ms", type=float, default=80.0)
+    parser.add_argument("--jitter", type=float, default=0.15, help="Latency std-dev as a fraction of the mean")
+    parser.add_argument("--chaingpt-error-rate", type=float, default=0.0)
+    parser.add_argument("--rag-error-rate", type=float, default=0.0)
+    parser.add_argument("--oz-error-rate", type=float, default=0.0)
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc peak-memory pass")
+    parser.add_argument("--memory-requests", type=int, default=20)
+    parser.add_argument("--output", help="Write results as JSON")
+    parser.add_argument("--baseline", help="Compare against a baseline JSON file")
+    parser.add_argument("--save-baseline", help="Store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed regression ratio")
+    parser.add_argument("--verbose", action="store_true", help="Show Auditooor warnings (e.g. fallbacks)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    logging.getLogger("auditooor").setLevel(logging.WARNING if args.verbose else logging.ERROR)
+    print(f"{'scenario':<22}{'conc':>5}{'p50 ms':>11}{'p95 ms':>11}{'p99 ms':>11}{'req/s':>11}{'errors':>7}{'peak KiB':>10}")
+    results = asyncio.run(run_benchmarks(args))
+
+    for path in filter(None, (args.output, args.save_baseline)):
+        Path(path).write_text(json.dumps(results, indent=2))
+        print(f"Results written to {path}")
+
+    if args.baseline:
+        regressions = compare_with_baseline(results, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        if regressions:
+            print("\n❌ Regressions against baseline:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            return 1
+        print("\n✅ No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
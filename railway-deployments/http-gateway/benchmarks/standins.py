@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Offline stand-ins for Auditooor upstreams - ServiceFlow AI
+In-process replacements for ChainGPT (Tools.chaingpt_audit_tool), Cloudflare RAG
+(cloudflare_rag_cloud) and a local HTTP server speaking the OpenZeppelin MCP API,
+each with a configurable latency and error profile.
+"""
+
+import sys
+import json
+import time
+import types
+import random
+import asyncio
+import threading
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional
+
+
+@dataclass
+class LatencyProfile:
+    """Upstream behaviour: normally distributed latency plus an error rate"""
+
+    mean_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+
+    def sample_seconds(self, rng: random.Random) -> float:
+        return max(0.0, rng.gauss(self.mean_ms, self.jitter_ms) if self.jitter_ms else self.mean_ms) / 1000
+
+    def should_fail(self, rng: random.Random) -> bool:
+        return self.error_rate > 0 and rng.random() < self.error_rate
+
+
+class UpstreamError(Exception):
+    """Raised by stand-ins to simulate an upstream failure"""
+
+
+class UpstreamStandIns:
+    """Installs fake ChainGPT and RAG modules into sys.modules and counts their calls"""
+
+    def __init__(self, chaingpt: Optional[LatencyProfile] = None, rag: Optional[LatencyProfile] = None,
+                 seed: int = 7):
+        self.chaingpt = chaingpt or LatencyProfile()
+        self.rag = rag or LatencyProfile()
+        self.calls: Dict[str, int] = {"chaingpt": 0, "rag": 0}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _chaingpt_delay(self) -> float:
+        with self._lock:
+            self.calls["chaingpt"] += 1
+            if self.chaingpt.should_fail(self._rng):
+                raise UpstreamError("ChainGPT stand-in failure")
+            return self.chaingpt.sample_seconds(self._rng)
+
+    def analyze_contract_security(self, contract_data: Dict[str, Any]) -> Dict[str, Any]:
+        # The real client is blocking, so the stand-in blocks too
+        time.sleep(self._chaingpt_delay())
+        return {
+            "status": "success",
+            "contract_name": contract_data.get("contract_name"),
+            "analysis": "No critical issues found (stand-in)",
+        }
+
+    def audit_contract_with_chaingpt(self, contract_data: Dict[str, Any]) -> Dict[str, Any]:
+        return self.analyze_contract_security(contract_data)
+
+    async def search_contracts_rag(self, query: str) -> str:
+        with self._lock:
+            self.calls["rag"] += 1
+            failed = self.rag.should_fail(self._rng)
+            delay = self.rag.sample_seconds(self._rng)
+        await asyncio.sleep(delay)
+        if failed:
+            raise UpstreamError("RAG stand-in failure")
+        return f"Best practices for: {query} (stand-in)"
+
+    async def search_serviceflow_docs_rag(self, query: str) -> str:
+        return await self.search_contracts_rag(query)
+
+    def install(self):
+        """Register the stand-in modules; call before auditooor_cloud loads its integrations"""
+        tools = sys.modules.get("Tools") or types.ModuleType("Tools")
+        tools.__path__ = []
+        chaingpt = types.ModuleType("Tools.chaingpt_audit_tool")
+        chaingpt.analyze_contract_security = self.analyze_contract_security
+        chaingpt.audit_contract_with_chaingpt = self.audit_contract_with_chaingpt
+        tools.chaingpt_audit_tool = chaingpt
+
+        rag = types.ModuleType("cloudflare_rag_cloud")
+        rag.search_contracts_rag = self.search_contracts_rag
+        rag.search_serviceflow_docs_rag = self.search_serviceflow_docs_rag
+
+        sys.modules["Tools"] = tools
+        sys.modules["Tools.chaingpt_audit_tool"] = chaingpt
+        sys.modules["cloudflare_rag_cloud"] = rag
+        return self
+
+
+class OpenZeppelinStandInServer:
+    """Local HTTP server answering POST /erc20 and /erc721 like the OpenZeppelin MCP API"""
+
+    def __init__(self, profile: Optional[LatencyProfile] = None, seed: int = 11):
+        self.profile = profile or LatencyProfile()
+        self.requests = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are separate writes; without this, delayed ACKs add ~40ms per request
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)) or 0)
+                with stand_in._lock:
+                    stand_in.requests += 1
+                    failed = stand_in.profile.should_fail(stand_in._rng)
+                    delay = stand_in.profile.sample_seconds(stand_in._rng)
+                time.sleep(delay)
+
+                if failed:
+                    payload, status = {"error": "stand-in failure"}, 503
+                else:
+                    params = json.loads(body or b"{}")
+                    kind = self.path.rstrip("/").rsplit("/", 1)[-1]
+                    name = params.get("name", "Token")
+                    payload, status = {"contract_code": f"// {kind} stand-in\ncontract {name} {{}}\n"}, 200
+
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "OpenZeppelinStandInServer":
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
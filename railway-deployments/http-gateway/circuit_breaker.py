@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Circuit breaker - ServiceFlow AI
+Fast-fail guard for flaky upstreams with a latency-driven adaptive timeout
+"""
+
+import time
+import threading
+from collections import deque
+from typing import Dict, Any
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Closed -> open after `failure_threshold` consecutive failures, half-open probe after the cool-down"""
+
+    def __init__(self, name: str, failure_threshold: int = 5, cooldown_seconds: float = 30.0,
+                 min_timeout: float = 1.0, max_timeout: float = 30.0, timeout_multiplier: float = 2.0,
+                 latency_window: int = 100):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.min_timeout = min(min_timeout, max_timeout)
+        self.max_timeout = max_timeout
+        self.timeout_multiplier = timeout_multiplier
+
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.trip_count = 0
+        self.successes = 0
+        self.failures = 0
+        self.short_circuited = 0
+
+        self._latencies: deque = deque(maxlen=latency_window)
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """Whether the caller may hit the upstream now; False means use the fallback immediately"""
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.cooldown_seconds:
+                self.state = HALF_OPEN
+                self._probe_in_flight = False
+
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                # Exactly one probe goes through; everyone else keeps falling back
+                self._probe_in_flight = True
+                return True
+
+            self.short_circuited += 1
+            return False
+
+    def record_success(self, latency_seconds: float):
+        with self._lock:
+            self.successes += 1
+            self.consecutive_failures = 0
+            self._latencies.append(latency_seconds)
+            self.state = CLOSED
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.consecutive_failures += 1
+            if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    self.trip_count += 1
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+    def abandon(self):
+        """The caller gave up (e.g. cancelled) without an outcome; let another probe through"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def p95_latency(self) -> float:
+        """95th percentile of recent successful call latencies (seconds), 0 without samples"""
+        samples = sorted(self._latencies)
+        if not samples:
+            return 0.0
+        return samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+
+    def current_timeout(self) -> float:
+        """Adaptive timeout: a multiple of recent p95 latency, clamped to [min_timeout, max_timeout]"""
+        p95 = self.p95_latency()
+        if not p95:
+            return self.max_timeout
+        return max(self.min_timeout, min(self.max_timeout, p95 * self.timeout_multiplier))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "trip_count": self.trip_count,
+            "successes": self.successes,
+            "failures": self.failures,
+            "short_circuited": self.short_circuited,
+            "p95_latency_ms": round(self.p95_latency() * 1000, 2),
+            "current_timeout_s": round(self.current_timeout(), 3)
+        }
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Contract chunker - ServiceFlow AI
+Splits large flattened Solidity sources at contract boundaries for parallel auditing
+
+Identical chunks are audited once, and chunks matching a known library (unmodified
+OpenZeppelin contracts) are skipped entirely.
+"""
+
+import os
+import re
+import logging
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Iterable
+
+from solidity_source import SourceUnit, contract_code_hash, normalize_contract_source, split_source_units
+
+logger = logging.getLogger("auditooor")
+
+# Top-level code made only of pragma/import directives has nothing to audit
+_DIRECTIVES_ONLY = re.compile(r'(?:\s*(?:pragma|import)\b[^;]*;)*\s*')
+
+
+def split_contract_chunks(contract_code: str) -> List[SourceUnit]:
+    """One chunk per contract/interface/library, plus chunks for top-level code between them"""
+    chunks: List[SourceUnit] = []
+    counts: Dict[str, int] = {}
+    group: List[SourceUnit] = []
+
+    def flush():
+        if not group:
+            return
+        first, last = group[0], group[-1]
+        name = first.contract or "<source>"
+        counts[name] = counts.get(name, 0) + 1
+        chunks.append(SourceUnit(
+            kind="contract" if first.contract else "source",
+            name=name if counts[name] == 1 else f"{name}#{counts[name]}",
+            start=first.start,
+            end=last.end,
+            start_line=first.start_line,
+            start_column=first.start_column,
+            code=contract_code[first.start:last.end],
+            contract=first.contract
+        ))
+        group.clear()
+
+    for unit in split_source_units(contract_code):
+        if group and (unit.contract != group[-1].contract or unit.contract is None):
+            flush()
+        group.append(unit)
+    flush()
+    return chunks
+
+
+class KnownLibraryIndex:
+    """Hashes of the contracts in trusted library sources (e.g. node_modules/@openzeppelin/contracts)
+
+    Directories come from AUDITOOOR_KNOWN_LIBRARY_DIRS (os.pathsep separated) and are indexed on
+    first lookup. Hashes are taken over the normalized source, so flattened copies with
+    comments stripped or re-indented still match.
+    """
+
+    def __init__(self, directories: Optional[Iterable[str]] = None):
+        if directories is None:
+            directories = [path for path in os.getenv("AUDITOOOR_KNOWN_LIBRARY_DIRS", "").split(os.pathsep) if path]
+        self.directories = list(directories)
+        self._hashes: Dict[str, str] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def add_source(self, contract_code: str, origin: str) -> int:
+        """Register every contract in a library source file; returns how many were added"""
+        added = 0
+        for chunk in split_contract_chunks(contract_code):
+            if chunk.kind == "contract":
+                self._hashes.setdefault(contract_code_hash(chunk.code), f"{origin}:{chunk.contract}")
+                added += 1
+        return added
+
+    def load(self) -> int:
+        """Index the configured directories (once); returns the number of known contracts"""
+        with self._lock:
+            if not self._loaded:
+                for directory in self.directories:
+                    root = Path(directory)
+                    for path in sorted(root.rglob("*.sol")):
+                        try:
+                            self.add_source(path.read_text(encoding="utf-8"), str(path.relative_to(root)))
+                        except (OSError, UnicodeDecodeError) as e:
+                            logger.warning("Skipping library source %s: %s", path, e)
+                self._loaded = True
+        return len(self._hashes)
+
+    def lookup(self, code_hash: str) -> Optional[str]:
+        """Library name for a chunk hash, or None when the code is not a known library"""
+        if not self._loaded:
+            self.load()
+        return self._hashes.get(code_hash)
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+
+@dataclass
+class ChunkPlan:
+    """How a large source is audited: unique chunks to analyze and which chunks are skipped"""
+
+    chunks: List[SourceUnit]
+    # Normalized hash -> chunks with that code, in file order; the first one gets audited
+    occurrences: Dict[str, List[SourceUnit]] = field(default_factory=dict)
+    # Chunk name -> library it matched
+    known_libraries: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def unique(self) -> Dict[str, SourceUnit]:
+        return {code_hash: chunks[0] for code_hash, chunks in self.occurrences.items()}
+
+    def summary(self) -> Dict[str, int]:
+        audited = sum(len(chunks) for chunks in self.occurrences.values())
+        return {
+            "chunks": len(self.chunks),
+            "audited_chunks": len(self.occurrences),
+            "duplicate_chunks": audited - len(self.occurrences),
+            "skipped_library_chunks": len(self.known_libraries)
+        }
+
+
+def plan_chunks(contract_code: str, known_libraries: Optional[KnownLibraryIndex] = None) -> ChunkPlan:
+    """Split, deduplicate by normalized hash and drop known library contracts and bare directives"""
+    plan = ChunkPlan(chunks=split_contract_chunks(contract_code))
+    for chunk in plan.chunks:
+        if chunk.kind == "source" and _DIRECTIVES_ONLY.fullmatch(normalize_contract_source(chunk.code)):
+            continue
+        code_hash = contract_code_hash(chunk.code)
+        library = known_libraries.lookup(code_hash) if known_libraries is not None and chunk.kind == "contract" else None
+        if library is not None:
+            plan.known_libraries[chunk.name] = library
+        else:
+            plan.occurrences.setdefault(code_hash, []).append(chunk)
+    return plan
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Contract template engine - ServiceFlow AI
+Precompiled Solidity skeletons for Auditooor's internal contract generators
+
+Each contract type registers a ContractTemplate: its boolean feature flags, the
+parameters substituted at render time, and a skeleton builder. The engine builds
+one skeleton per feature combination once, compiles it to a format string, and
+renders requests with a single substitution pass. Batches render in one pass over
+all requests, compiling each feature combination at most once.
+"""
+
+import re
+import itertools
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Any, List, Tuple, Callable, Optional
+
+_PLACEHOLDER = re.compile(r"\$\{(\w+)\}")
+
+
+@dataclass(frozen=True)
+class ContractTemplate:
+    """Declarative description of one generatable contract type"""
+
+    contract_type: str
+    feature_flags: Dict[str, bool]
+    # placeholder -> (requirements key, default value)
+    parameters: Dict[str, Tuple[str, Any]]
+    # flags -> skeleton source with ${placeholder} markers
+    build_skeleton: Callable[[Dict[str, bool]], str]
+    # (flags, raw parameter values) -> "features" block of the generation result
+    describe_features: Callable[[Dict[str, bool], Dict[str, Any]], Dict[str, Any]]
+    # placeholder -> regex its value must fully match; keeps values from altering the code structure
+    parameter_patterns: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class RenderedContract:
+    contract_type: str
+    contract_code: str
+    contract_name: str
+    features: Dict[str, Any]
+    generated_on: str
+
+
+def compile_skeleton(skeleton: str) -> str:
+    """Turn ${placeholder} markers into a %-format string (literal % signs escaped)"""
+    return _PLACEHOLDER.sub(r"%(\1)s", skeleton.replace("%", "%%"))
+
+
+class ContractTemplateEngine:
+    """Registry of contract templates with memoized, precompiled skeletons"""
+
+    def __init__(self):
+        self._templates: Dict[str, ContractTemplate] = {}
+        self._compiled: Dict[Tuple[str, Tuple[bool, ...]], str] = {}
+
+    def register(self, key: str, template: ContractTemplate):
+        """Add (or replace) a contract type, e.g. register("erc1155", ERC1155_TEMPLATE)"""
+        self._templates[key] = template
+        self._compiled = {k: v for k, v in self._compiled.items() if k[0] != key}
+
+    def get(self, key: str) -> ContractTemplate:
+        return self._templates[key]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._templates
+
+    def resolve_flags(self, key: str, requirements: Dict[str, Any]) -> Tuple[bool, ...]:
+        """Feature combination requested, in the template's declared flag order"""
+        template = self._templates[key]
+        return tuple(bool(requirements.get(flag, default)) for flag, default in template.feature_flags.items())
+
+    def invalid_parameters(self, key: str, requirements: Dict[str, Any]) -> List[str]:
+        """Parameters that do not match the template's patterns, as error messages
+
+        A contract whose parameters pass is the skeleton with different literals, so it shares
+        the security profile of every other contract rendered from the same skeleton.
+        """
+        template = self._templates[key]
+        errors = []
+        for placeholder, pattern in template.parameter_patterns.items():
+            requirement_key, default = template.parameters[placeholder]
+            value = str(requirements.get(requirement_key, default))
+            if not re.fullmatch(pattern, value):
+                errors.append(f"Invalid {requirement_key} for {template.contract_type}: {value!r}")
+        return errors
+
+    def compiled(self, key: str, flag_values: Tuple[bool, ...]) -> str:
+        """Compiled skeleton for one feature combination, built on first use"""
+        cache_key = (key, flag_values)
+        compiled = self._compiled.get(cache_key)
+        if compiled is None:
+            template = self._templates[key]
+            flags = dict(zip(template.feature_flags, flag_values))
+            compiled = compile_skeleton(template.build_skeleton(flags))
+            self._compiled[cache_key] = compiled
+        return compiled
+
+    def precompile(self) -> int:
+        """Build every feature combination of every registered template; returns the skeleton count"""
+        for key, template in self._templates.items():
+            for flag_values in itertools.product((False, True), repeat=len(template.feature_flags)):
+                self.compiled(key, flag_values)
+        return len(self._compiled)
+
+    def render(self, key: str, requirements: Dict[str, Any], generated_on: Optional[str] = None) -> RenderedContract:
+        """Render a contract for `requirements` with one substitution pass"""
+        template = self._templates[key]
+        flag_values = self.resolve_flags(key, requirements)
+        raw_values = {
+            placeholder: requirements.get(requirement_key, default)
+            for placeholder, (requirement_key, default) in template.parameters.items()
+        }
+        generated_on = generated_on or datetime.now().isoformat()
+        values = {placeholder: str(value) for placeholder, value in raw_values.items()}
+        values["generated_on"] = generated_on
+
+        return RenderedContract(
+            contract_type=template.contract_type,
+            contract_code=self.compiled(key, flag_values) % values,
+            contract_name=values["name"],
+            features=template.describe_features(dict(zip(template.feature_flags, flag_values)), raw_values),
+            generated_on=generated_on
+        )
+
+    def render_many(self, key: str, requirements_list: List[Dict[str, Any]],
+                    generated_on: Optional[str] = None) -> List[RenderedContract]:
+        """Render many requests in one pass with a shared timestamp, in input order"""
+        generated_on = generated_on or datetime.now().isoformat()
+        return [self.render(key, requirements, generated_on) for requirements in requirements_list]
+
+
+def _erc20_skeleton(flags: Dict[str, bool]) -> str:
+    mintable, burnable, pausable = flags["mintable"], flags["burnable"], flags["pausable"]
+
+    skeleton = """// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.20;
+
+import "@openzeppelin/contracts/token/ERC20/ERC20.sol";
+import "@openzeppelin/contracts/access/Ownable.sol";
+import "@openzeppelin/contracts/security/ReentrancyGuard.sol";"""
+
+    if pausable:
+        skeleton += """
+import "@openzeppelin/contracts/security/Pausable.sol";"""
+
+    if burnable:
+        skeleton += """
+import "@openzeppelin/contracts/token/ERC20/extensions/ERC20Burnable.sol";"""
+
+    skeleton += """
+
+/**
+ * @title ${name}
+ * @dev ERC-20 token generated by Auditooor - ServiceFlow AI
+ * Generated on: ${generated_on}
+ *
+ * Security features:
+ * - OpenZeppelin standard implementation
+ * - Access control with Ownable pattern
+ * - Reentrancy protection
+ * """ + ("- Pausable functionality" if pausable else "") + """
+ * """ + ("- Burnable tokens" if burnable else "") + """
+ * """ + ("- Mintable by owner" if mintable else "") + """
+ */
+contract ${name} is ERC20, Ownable, ReentrancyGuard""" + (", Pausable" if pausable else "") + (", ERC20Burnable" if burnable else "") + """ {
+
+    /**
+     * @dev Constructor that sets up the token with initial parameters
+     * @param initialOwner Address that will own the contract
+     */
+    constructor(address initialOwner)
+        ERC20("${name}", "${symbol}")
+        Ownable(initialOwner)
+    {
+        // Mint initial supply to the deployer
+        _mint(msg.sender, ${premint} * 10 ** decimals());
+
+        // Transfer ownership to specified address if different
+        if (initialOwner != msg.sender) {
+            _transferOwnership(initialOwner);
+        }
+    }"""
+
+    if mintable:
+        skeleton += """
+
+    /**
+     * @dev Mint tokens to specified address
+     * @param to Address to receive the tokens
+     * @param amount Amount of tokens to mint (in wei)
+     */
+    function mint(address to, uint256 amount)
+        public
+        onlyOwner
+        nonReentrant
+        """ + ("whenNotPaused" if pausable else "") + """
+    {
+        require(to != address(0), "${name}: mint to zero address");
+        require(amount > 0, "${name}: mint amount must be positive");
+        _mint(to, amount);
+    }"""
+
+    if pausable:
+        skeleton += """
+
+    /**
+     * @dev Pause all token transfers
+     */
+    function pause() public onlyOwner {
+        _pause();
+    }
+
+    /**
+     * @dev Unpause all token transfers
+     */
+    function unpause() public onlyOwner {
+        _unpause();
+    }
+
+    /**
+     * @dev Override transfer functions to include pause functionality
+     */
+    function _beforeTokenTransfer(
+        address from,
+        address to,
+        uint256 amount
+    ) internal override whenNotPaused {
+        super._beforeTokenTransfer(from, to, amount);
+    }"""
+
+    skeleton += """
+
+    /**
+     * @dev Emergency function to recover accidentally sent tokens
+     * @param tokenAddress Address of the token contract
+     * @param tokenAmount Amount of tokens to recover
+     */
+    function recoverERC20(address tokenAddress, uint256 tokenAmount)
+        public
+        onlyOwner
+        nonReentrant
+    {
+        require(tokenAddress != address(this), "Cannot recover own token");
+        IERC20(tokenAddress).transfer(owner(), tokenAmount);
+    }
+}"""
+    return skeleton
+
+
+def _erc721_skeleton(flags: Dict[str, bool]) -> str:
+    return """// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.20;
+
+import "@openzeppelin/contracts/token/ERC721/ERC721.sol";
+import "@openzeppelin/contracts/token/ERC721/extensions/ERC721URIStorage.sol";
+import "@openzeppelin/contracts/access/Ownable.sol";
+import "@openzeppelin/contracts/security/ReentrancyGuard.sol";
+import "@openzeppelin/contracts/utils/Counters.sol";
+
+/**
+ * @title ${name}
+ * @dev ERC-721 NFT contract generated by Auditooor - ServiceFlow AI
+ * Generated on: ${generated_on}
+ */
+contract ${name} is ERC721, ERC721URIStorage, Ownable, ReentrancyGuard {
+    using Counters for Counters.Counter;
+
+    Counters.Counter private _tokenIdCounter;
+    string private _baseTokenURI;
+
+    constructor(address initialOwner)
+        ERC721("${name}", "${symbol}")
+        Ownable(initialOwner)
+    {
+        _baseTokenURI = "${base_uri}";
+    }
+
+    function mint(address to, string memory uri)
+        public
+        onlyOwner
+        nonReentrant
+    {
+        require(to != address(0), "${name}: mint to zero address");
+
+        uint256 tokenId = _tokenIdCounter.current();
+        _tokenIdCounter.increment();
+
+        _safeMint(to, tokenId);
+        _setTokenURI(tokenId, uri);
+    }
+
+    function _baseURI() internal view override returns (string memory) {
+        return _baseTokenURI;
+    }
+
+    function setBaseURI(string memory newBaseURI) public onlyOwner {
+        _baseTokenURI = newBaseURI;
+    }
+
+    function tokenURI(uint256 tokenId)
+        public
+        view
+        override(ERC721, ERC721URIStorage)
+        returns (string memory)
+    {
+        return super.tokenURI(tokenId);
+    }
+
+    function _burn(uint256 tokenId) internal override(ERC721, ERC721URIStorage) {
+        super._burn(tokenId);
+    }
+
+    function supportsInterface(bytes4 interfaceId)
+        public
+        view
+        override(ERC721, ERC721URIStorage)
+        returns (bool)
+    {
+        return super.supportsInterface(interfaceId);
+    }
+}"""
+
+
+# Contract names become Solidity identifiers; symbols and URIs land inside string literals
+_IDENTIFIER = r"[A-Za-z_][A-Za-z0-9_]{0,63}"
+_SYMBOL = r"[A-Za-z0-9]{1,11}"
+
+ERC20_TEMPLATE = ContractTemplate(
+    contract_type="ERC-20",
+    feature_flags={"mintable": True, "burnable": False, "pausable": False},
+    parameters={
+        "name": ("name", "MyToken"),
+        "symbol": ("symbol", "MTK"),
+        "premint": ("premint", "1000000")
+    },
+    build_skeleton=_erc20_skeleton,
+    describe_features=lambda flags, values: {**flags, "premint": values["premint"]},
+    parameter_patterns={"name": _IDENTIFIER, "symbol": _SYMBOL, "premint": r"\d{1,30}"}
+)
+
+ERC721_TEMPLATE = ContractTemplate(
+    contract_type="ERC-721",
+    feature_flags={},
+    parameters={
+        "name": ("name", "MyNFT"),
+        "symbol": ("symbol", "MNFT"),
+        "base_uri": ("baseUri", "https://api.example.com/metadata/")
+    },
+    build_skeleton=_erc721_skeleton,
+    describe_features=lambda flags, values: {"base_uri": values["base_uri"], "uri_storage": True, "counter": True},
+    parameter_patterns={"name": _IDENTIFIER, "symbol": _SYMBOL, "base_uri": r'[^"\\\r\n]{0,512}'}
+)
+
+# Shared engine used by AuditooorCloud; register additional contract types here
+template_engine = ContractTemplateEngine()
+template_engine.register("erc20", ERC20_TEMPLATE)
+template_engine.register("erc721", ERC721_TEMPLATE)
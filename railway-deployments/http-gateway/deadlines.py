@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Deadlines and hedging - ServiceFlow AI
+Per-request time budgets carried through audit stages, and hedged upstream reads
+
+A Deadline is fixed when a request arrives and travels with it in a contextvar, so every
+stage and upstream call below it can ask how much time is left and use that as its
+timeout. Hedging sends a second copy of an idempotent read once the first has been
+outstanding longer than the upstream's recent p95 latency and keeps whichever answers first.
+"""
+
+import os
+import math
+import time
+import asyncio
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional
+
+from gateway_metrics import Counter
+
+HEDGES = Counter("auditooor_hedged_requests_total", "Hedged upstream reads by outcome (sent, won)", ("upstream", "outcome"))
+
+# Overall budget of a request that does not bring its own
+DEFAULT_REQUEST_TIMEOUT = float(os.getenv("AUDITOOOR_REQUEST_TIMEOUT", "120"))
+
+
+class Deadline:
+    """Absolute point in (monotonic) time by which a request must be answered"""
+
+    def __init__(self, expires_at: float):
+        self.expires_at = expires_at
+
+    @classmethod
+    def after(cls, seconds: float) -> "Deadline":
+        return cls(time.monotonic() + seconds)
+
+    @classmethod
+    def for_request(cls, request_data: Dict[str, Any]) -> "Deadline":
+        """The request's `timeout_seconds`, never later than an enclosing deadline
+
+        Without `timeout_seconds` the enclosing deadline applies, or else the default budget.
+        Raises ValueError when `timeout_seconds` is not a positive number of seconds.
+        """
+        parent = current_deadline()
+        seconds = request_data.get("timeout_seconds")
+        if not seconds:
+            return parent or cls.after(DEFAULT_REQUEST_TIMEOUT)
+        try:
+            seconds = float(seconds)
+        except (TypeError, ValueError):
+            seconds = math.nan
+        if not 0 < seconds < math.inf:
+            raise ValueError(f"timeout_seconds must be a positive number of seconds, got {request_data['timeout_seconds']!r}")
+        deadline = cls.after(seconds)
+        return parent if parent is not None and parent.expires_at < deadline.expires_at else deadline
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def clamp(self, timeout: Optional[float]) -> float:
+        """`timeout` shortened to the time left"""
+        remaining = self.remaining()
+        return remaining if timeout is None else min(timeout, remaining)
+
+
+_CURRENT_DEADLINE: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar("auditooor_deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _CURRENT_DEADLINE.get()
+
+
+def remaining_budget(timeout: Optional[float] = None) -> Optional[float]:
+    """`timeout` clamped to the current request's deadline; unchanged outside any request"""
+    deadline = current_deadline()
+    return timeout if deadline is None else deadline.clamp(timeout)
+
+
+@contextmanager
+def deadline_scope(deadline: Deadline) -> Iterator[Deadline]:
+    """Make `deadline` current for the enclosed code (and tasks it creates)"""
+    token = _CURRENT_DEADLINE.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _CURRENT_DEADLINE.reset(token)
+
+
+class LatencyWindow:
+    """Recent latencies of one upstream; supplies the hedging delay"""
+
+    def __init__(self, size: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples: deque = deque(maxlen=size)
+
+    def record(self, seconds: float):
+        self._samples.append(seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Latency quantile in seconds, None until `min_samples` calls have been seen"""
+        if len(self._samples) < self.min_samples:
+            return None
+        samples = sorted(self._samples)
+        return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+async def hedged(upstream: str, attempt: Callable[[], Awaitable[Any]], delay: float,
+                 can_hedge: Callable[[], bool] = lambda: True) -> Any:
+    """Run `attempt`, start a second one if the first is still outstanding after `delay`, return the first success
+
+    `can_hedge` is asked right before the second request is sent (e.g. to spend a quota token);
+    when it says no the call simply waits for the first attempt. The losing attempt is cancelled.
+    """
+    tasks = [asyncio.ensure_future(attempt())]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if not done and can_hedge():
+            tasks.append(asyncio.ensure_future(attempt()))
+            HEDGES.labels(upstream, "sent").inc()
+
+        pending = set(tasks)
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is not tasks[0]:
+                        HEDGES.labels(upstream, "won").inc()
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Gateway metrics - ServiceFlow AI
+Minimal Prometheus-compatible counters, gauges and histograms for the HTTP gateway
+
+Recording is a dict lookup plus a locked add, cheap enough for every request.
+Metrics render in the Prometheus text exposition format.
+"""
+
+import bisect
+import threading
+from typing import Dict, List, Tuple, Optional, Callable
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+class _CounterValue:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def samples(self, name: str, labels: str) -> List[str]:
+        return [f"{name}{labels} {_format_value(self.value)}"]
+
+
+class _GaugeValue(_CounterValue):
+    def __init__(self):
+        super().__init__()
+        self._function: Optional[Callable[[], float]] = None
+
+    def dec(self, amount: float = 1.0):
+        self.inc(-amount)
+
+    def set(self, value: float):
+        self.value = float(value)
+
+    def set_function(self, function: Callable[[], float]):
+        """Compute the value at scrape time instead of tracking it"""
+        self._function = function
+
+    def current(self) -> float:
+        return float(self._function()) if self._function else self.value
+
+    def samples(self, name: str, labels: str) -> List[str]:
+        return [f"{name}{labels} {_format_value(self.current())}"]
+
+
+class _HistogramValue:
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding quantile q (coarse, for dashboards and tests)"""
+        if not self.count:
+            return 0.0
+        cumulative = 0
+        for bound, count in zip(self.bounds + (float("inf"),), self.counts):
+            cumulative += count
+            if cumulative >= q * self.count:
+                return bound
+        return float("inf")
+
+    def samples(self, name: str, labels: str, label_names=(), label_values=()) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.bounds + (float("inf"),), self.counts):
+            cumulative += count
+            le = f'le="{_format_value(bound)}"'
+            lines.append(f"{name}_bucket{_format_labels(label_names, label_values, le)} {cumulative}")
+        lines.append(f"{name}_sum{labels} {_format_value(self.sum)}")
+        lines.append(f"{name}_count{labels} {self.count}")
+        return lines
+
+
+class _Metric:
+    """A metric family; unlabelled metrics proxy to their single child"""
+
+    metric_type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 registry: Optional["MetricsRegistry"] = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._children[()] = self._new_value()
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def _new_value(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str, **kwargs: str):
+        """Child value for one label combination"""
+        key = tuple(map(str, values)) if values else tuple(str(kwargs[name]) for name in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_value())
+        return child
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+        for label_values, child in list(self._children.items()):
+            labels = _format_labels(self.labelnames, label_values)
+            if isinstance(child, _HistogramValue):
+                lines.extend(child.samples(self.name, labels, self.labelnames, label_values))
+            else:
+                lines.extend(child.samples(self.name, labels))
+        return lines
+
+    def __getattr__(self, attribute):
+        # inc()/observe()/set() on an unlabelled metric go to its only child
+        children = self.__dict__.get("_children", {})
+        if () in children:
+            return getattr(children[()], attribute)
+        raise AttributeError(attribute)
+
+
+class Counter(_Metric):
+    metric_type = "counter"
+
+    def _new_value(self):
+        return _CounterValue()
+
+
+class Gauge(_Metric):
+    metric_type = "gauge"
+
+    def _new_value(self):
+        return _GaugeValue()
+
+
+class Histogram(_Metric):
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS, registry: Optional["MetricsRegistry"] = None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_value(self):
+        return _HistogramValue(self.buckets)
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together on the metrics endpoint"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric):
+        self._metrics[metric.name] = metric
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Default registry shared by the gateway modules
+REGISTRY = MetricsRegistry()
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+JSON encoding - ServiceFlow AI
+Compact JSON serialization shared by Auditooor responses and audit events
+
+orjson is optional: without it the standard library encoder is used with compact separators.
+Nothing here depends on the web framework, so audit code can serialize without importing it.
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _dumps_default(value: Any) -> Any:
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    return str(value)
+
+
+def dumps(payload: Any) -> bytes:
+    """Compact UTF-8 JSON"""
+    if orjson is not None:
+        return orjson.dumps(payload, default=_dumps_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False, default=_dumps_default).encode()
+
+
+def dumps_line(payload: Any) -> bytes:
+    """One NDJSON line"""
+    return dumps(payload) + b"\n"
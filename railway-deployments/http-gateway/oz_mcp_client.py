@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+OpenZeppelin MCP client - ServiceFlow AI
+Keep-alive connection pool for the OpenZeppelin contract generation API
+"""
+
+import os
+import asyncio
+from typing import Dict, Any, Optional
+
+import httpx
+
+OZ_MCP_DEFAULT_URL = "https://mcp.openzeppelin.com/contracts/solidity/mcp"
+
+# Failures that should fall back to the internal templates (transport errors, timeouts, bad JSON)
+OZ_MCP_ERRORS = (httpx.HTTPError, ValueError)
+OZ_MCP_TIMEOUTS = (httpx.TimeoutException, asyncio.TimeoutError)
+
+
+class OpenZeppelinMCPClient:
+    """Shared sync/async HTTP clients for OpenZeppelin MCP generation calls
+
+    Point `base_url` (or OZ_MCP_URL) at a local stand-in server, or pass an httpx
+    transport, to run generation offline.
+    """
+
+    def __init__(self, base_url: Optional[str] = None, max_connections: Optional[int] = None,
+                 max_keepalive: Optional[int] = None, timeout: Optional[float] = None,
+                 connect_timeout: Optional[float] = None,
+                 transport: Optional[httpx.AsyncBaseTransport] = None,
+                 sync_transport: Optional[httpx.BaseTransport] = None):
+        self.base_url = (base_url or os.getenv("OZ_MCP_URL", OZ_MCP_DEFAULT_URL)).rstrip("/")
+        self.limits = httpx.Limits(
+            max_connections=max_connections or int(os.getenv("OZ_MCP_MAX_CONNECTIONS", "20")),
+            max_keepalive_connections=max_keepalive or int(os.getenv("OZ_MCP_MAX_KEEPALIVE", "10")),
+        )
+        self.timeout = httpx.Timeout(
+            timeout if timeout is not None else float(os.getenv("OZ_MCP_TIMEOUT", "30")),
+            connect=connect_timeout if connect_timeout is not None else float(os.getenv("OZ_MCP_CONNECT_TIMEOUT", "5")),
+        )
+        self._transport = transport
+        self._sync_transport = sync_transport
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self._sync_client: Optional[httpx.Client] = None
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        if self._async_client is None or self._async_client.is_closed:
+            self._async_client = httpx.AsyncClient(
+                base_url=self.base_url, limits=self.limits, timeout=self.timeout, transport=self._transport
+            )
+        return self._async_client
+
+    def _get_sync_client(self) -> httpx.Client:
+        if self._sync_client is None or self._sync_client.is_closed:
+            self._sync_client = httpx.Client(
+                base_url=self.base_url, limits=self.limits, timeout=self.timeout, transport=self._sync_transport
+            )
+        return self._sync_client
+
+    @staticmethod
+    def _contract_code(response: httpx.Response) -> Optional[str]:
+        if response.status_code >= 500:
+            # Server-side failures count against upstream health
+            response.raise_for_status()
+        if response.status_code != 200:
+            return None
+        payload = response.json()
+        if not isinstance(payload, dict):
+            # Valid JSON of the wrong shape is as unusable as invalid JSON
+            raise ValueError(f"Expected a JSON object from OpenZeppelin MCP, got {type(payload).__name__}")
+        contract_code = payload.get("contract_code")
+        if contract_code is not None and not isinstance(contract_code, str):
+            raise ValueError("OpenZeppelin MCP contract_code is not a string")
+        return contract_code or None
+
+    def _request_timeout(self, timeout: Optional[float]) -> httpx.Timeout:
+        if timeout is None:
+            return self.timeout
+        return httpx.Timeout(timeout, connect=min(timeout, self.timeout.connect or timeout))
+
+    async def generate(self, contract_kind: str, contract_params: Dict[str, Any],
+                       timeout: Optional[float] = None) -> Optional[str]:
+        """POST a generation request; returns the contract source or None if the API had none
+
+        Raises httpx.HTTPError on transport failures, timeouts and 5xx responses.
+        """
+        response = await self._get_async_client().post(
+            f"/{contract_kind}", json=contract_params, timeout=self._request_timeout(timeout)
+        )
+        return self._contract_code(response)
+
+    def generate_sync(self, contract_kind: str, contract_params: Dict[str, Any],
+                      timeout: Optional[float] = None) -> Optional[str]:
+        """Blocking variant of generate() sharing the same pool settings"""
+        response = self._get_sync_client().post(
+            f"/{contract_kind}", json=contract_params, timeout=self._request_timeout(timeout)
+        )
+        return self._contract_code(response)
+
+    async def warm_up(self):
+        """Open the async connection pool ahead of the first request"""
+        self._get_async_client()
+
+    async def aclose(self):
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+        if self._sync_client is not None:
+            self._sync_client.close()
+            self._sync_client = None
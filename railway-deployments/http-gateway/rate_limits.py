@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Rate limiting primitives - ServiceFlow AI
+Async token buckets used to keep Auditooor within upstream API quotas
+"""
+
+import time
+import asyncio
+from typing import Optional
+
+
+class AsyncTokenBucket:
+    """Token bucket refilled at `rate` tokens per second, holding at most `burst` tokens"""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Take tokens without waiting; returns False when the bucket is empty"""
+        self._refill()
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return True
+        return False
+
+    def wait_time(self, tokens: float = 1.0) -> float:
+        """Seconds until `tokens` would be available"""
+        self._refill()
+        missing = tokens - self._tokens
+        return max(0.0, missing / self.rate) if self.rate > 0 else float("inf")
+
+    async def acquire(self, tokens: float = 1.0):
+        """Wait until tokens are available, serving waiters in FIFO order"""
+        async with self._lock:
+            while not self.try_acquire(tokens):
+                await asyncio.sleep(self.wait_time(tokens))
+
+    @property
+    def available(self) -> float:
+        self._refill()
+        return self._tokens
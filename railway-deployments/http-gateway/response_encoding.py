@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Response encoding - ServiceFlow AI
+Fast JSON serialization, field projections and negotiated compression for Auditooor responses
+
+Serialization comes from json_encoding (orjson when installed); zstandard is optional and
+without it only gzip is offered. Clients trim large reports with a named view or explicit
+dotted field paths, and receive gzip or zstd bodies when their Accept-Encoding allows it
+and the body is large enough to be worth compressing.
+"""
+
+import os
+import gzip
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+from gateway_metrics import Counter
+from json_encoding import dumps, dumps_line
+
+RESPONSE_BYTES = Counter(
+    "auditooor_response_bytes_total", "JSON response bytes before (serialized) and after (sent) compression",
+    ("encoding", "stage")
+)
+
+COMPRESS_MIN_BYTES = int(os.getenv("AUDITOOOR_COMPRESS_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("AUDITOOOR_GZIP_LEVEL", "5"))
+ZSTD_LEVEL = int(os.getenv("AUDITOOOR_ZSTD_LEVEL", "3"))
+
+# Server preference among encodings the client accepts equally
+SUPPORTED_ENCODINGS = ("zstd", "gzip") if zstandard is not None else ("gzip",)
+
+# Kept by every projection so errors are never projected away
+ALWAYS_KEPT = ("status", "error", "combined_status", "overall_status")
+
+# view -> (fields to keep or None for all, fields to drop); paths may name an audit report
+# directly or the `audit`/`generation` parts of a generate-with-audit result
+_VERBOSE_FIELDS = ("chaingpt_analysis", "documentation_insights")
+VIEWS: Dict[str, Tuple[Optional[Tuple[str, ...]], Tuple[str, ...]]] = {
+    "full": (None, ()),
+    "compact": (
+        None,
+        ("generation.contract_code",) + _VERBOSE_FIELDS + tuple(f"audit.{name}" for name in _VERBOSE_FIELDS)
+    ),
+    "recommendations": (
+        tuple(f"{prefix}{name}" for prefix in ("", "audit.") for name in (
+            "contract_name", "overall_status", "security_recommendations", "static_findings", "stage_status", "cache",
+            "history_id", "incremental"
+        )) + ("generation.contract_name", "generation.contract_type", "generation.features"),
+        ()
+    ),
+}
+
+
+def split_fields(spec: Optional[str]) -> List[str]:
+    """"a.b, c" -> ["a.b", "c"]"""
+    return [path.strip() for path in (spec or "").split(",") if path.strip()]
+
+
+def _children(paths: List[List[str]]) -> Dict[str, List[List[str]]]:
+    children: Dict[str, List[List[str]]] = {}
+    for path in paths:
+        children.setdefault(path[0], []).append(path[1:])
+    return children
+
+
+def _keep(payload: Any, paths: List[List[str]]) -> Any:
+    if not isinstance(payload, dict) or any(not path for path in paths):
+        return payload
+    return {key: _keep(payload[key], rest) for key, rest in _children(paths).items() if key in payload}
+
+
+def _drop(payload: Any, paths: List[List[str]]) -> Any:
+    # Only the dicts along the dropped paths are copied; the caller's payload is left untouched
+    if not isinstance(payload, dict):
+        return payload
+    result = dict(payload)
+    for key, rest in _children(paths).items():
+        if key not in result:
+            continue
+        if any(not path for path in rest):
+            del result[key]
+        else:
+            result[key] = _drop(result[key], rest)
+    return result
+
+
+def project(payload: Any, fields: Optional[Iterable[str]] = None, exclude: Iterable[str] = ()) -> Any:
+    """Copy of `payload` with only the dotted `fields` (all when None), minus the `exclude` paths
+
+    Paths that do not exist are ignored, so one projection fits several response shapes.
+    """
+    if fields is not None:
+        payload = _keep(payload, [path.split(".") for path in fields] + [[name] for name in ALWAYS_KEPT])
+    exclude = [path.split(".") for path in exclude]
+    return _drop(payload, exclude) if exclude else payload
+
+
+def shape(payload: Any, view: str = "full", fields: Optional[str] = None, exclude: Optional[str] = None) -> Any:
+    """Apply a named view, then any explicit fields/exclude (comma-separated dotted paths)"""
+    view_fields, view_exclude = VIEWS.get(view, VIEWS["full"])
+    keep = split_fields(fields) or view_fields
+    return project(payload, keep, [*view_exclude, *split_fields(exclude)])
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Best supported content coding from an Accept-Encoding header, None for identity"""
+    weights: Dict[str, float] = {}
+    for item in (accept_encoding or "").split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[coding] = weight
+
+    best, best_weight = None, 0.0
+    for coding in SUPPORTED_ENCODINGS:
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def encoded_response(request: Request, payload: Any, status_code: int = 200) -> Response:
+    """Compact JSON response, compressed when the client allows it and the body is large enough"""
+    body = dumps(payload)
+    headers = {"Vary": "Accept-Encoding"}
+    encoding = negotiate_encoding(request.headers.get("accept-encoding")) if len(body) >= COMPRESS_MIN_BYTES else None
+    RESPONSE_BYTES.labels(encoding or "identity", "serialized").inc(len(body))
+    if encoding is not None:
+        body = compress(body, encoding)
+        headers["Content-Encoding"] = encoding
+    RESPONSE_BYTES.labels(encoding or "identity", "sent").inc(len(body))
+    return Response(body, status_code=status_code, media_type="application/json", headers=headers)
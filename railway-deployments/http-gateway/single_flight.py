@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Request coalescing - ServiceFlow AI
+Single-flight groups: concurrent calls with the same key share one upstream call
+"""
+
+import asyncio
+from typing import Dict, Any, Callable, Awaitable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Collapses concurrent identical calls into one execution whose result every caller awaits
+
+    The shared call runs in its own task, so one caller being cancelled does not fail the
+    others; it is only cancelled once every caller waiting on it has gone away.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[str, int] = {}
+        self.executed = 0
+        self.shared = 0
+
+    def in_flight(self, key: str) -> bool:
+        return key in self._calls
+
+    async def do(self, key: str, factory: Callable[[], Awaitable[T]]) -> T:
+        """Await the in-flight call for `key`, starting it with `factory()` if there is none"""
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._calls[key] = task
+            self._waiters[key] = 0
+            self.executed += 1
+            task.add_done_callback(lambda _, key=key: self._forget(key, task))
+        else:
+            self.shared += 1
+
+        self._waiters[key] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done() and self._waiters.get(key) == 1:
+                task.cancel()
+            raise
+        finally:
+            if self._calls.get(key) is task:
+                self._waiters[key] -= 1
+
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+            del self._waiters[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._calls),
+            "executed": self.executed,
+            "shared": self.shared
+        }
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Solidity static scanner - ServiceFlow AI
+Pluggable rule registry compiled into one multi-pattern matcher for Auditooor
+
+All rules plus the comment and string-literal lexemes are combined into a single
+alternation, so a scan is one left-to-right pass over the source no matter how many
+rules are registered, and keywords inside comments or strings never match.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Tuple
+
+from solidity_source import STRING_LITERAL_PATTERN, COMMENT_PATTERN
+
+# Lexemes that are consumed and ignored; they must come first in the alternation
+_SKIP_PATTERNS = (STRING_LITERAL_PATTERN, COMMENT_PATTERN)
+# Any other identifier is consumed whole, so rules are only tried at token boundaries
+_IDENTIFIER_PATTERN = r"[A-Za-z_$][\w$]*"
+
+
+@dataclass(frozen=True)
+class SecurityRule:
+    """A token pattern plus what to recommend when it is present
+
+    Rules without a recommendation act as markers that other rules reference in `unless`.
+    """
+
+    rule_id: str
+    pattern: str
+    recommendation: Optional[str] = None
+    severity: str = "info"
+    # Suppress this rule's recommendation when any of these rules also matched
+    unless: Tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class Finding:
+    rule_id: str
+    line: int
+    column: int
+    match: str
+    severity: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "rule": self.rule_id,
+            "line": self.line,
+            "column": self.column,
+            "match": self.match,
+            "severity": self.severity
+        }
+
+
+@dataclass
+class ScanResult:
+    findings: List[Finding] = field(default_factory=list)
+    matched_rules: Dict[str, int] = field(default_factory=dict)
+
+    def matched(self, rule_id: str) -> bool:
+        return rule_id in self.matched_rules
+
+
+class SolidityScanner:
+    """Rule registry compiled into one combined regex over a comment/string-aware token stream"""
+
+    def __init__(self, rules: Optional[List[SecurityRule]] = None, max_locations_per_rule: int = 25):
+        self._rules: Dict[str, SecurityRule] = {}
+        self.max_locations_per_rule = max_locations_per_rule
+        self._matcher: Optional[re.Pattern] = None
+        self._group_rules: Dict[str, SecurityRule] = {}
+        for rule in rules or []:
+            self.register(rule)
+
+    def register(self, rule: SecurityRule):
+        """Add or replace a rule; the matcher is recompiled on the next scan"""
+        self._rules[rule.rule_id] = rule
+        self._matcher = None
+
+    @property
+    def rules(self) -> List[SecurityRule]:
+        return list(self._rules.values())
+
+    def _compile(self) -> re.Pattern:
+        alternatives = [f"(?:{pattern})" for pattern in _SKIP_PATTERNS]
+        self._group_rules = {}
+        for index, rule in enumerate(self._rules.values()):
+            group = f"r{index}"
+            self._group_rules[group] = rule
+            alternatives.append(f"(?P<{group}>{rule.pattern})")
+        alternatives.append(_IDENTIFIER_PATTERN)
+        return re.compile("|".join(alternatives), re.IGNORECASE | re.DOTALL)
+
+    def scan(self, contract_code: str) -> ScanResult:
+        """Single pass over the source, recording 1-based line/column for each rule hit"""
+        if self._matcher is None:
+            self._matcher = self._compile()
+
+        result = ScanResult()
+        line = 1
+        line_start = 0
+        position = 0
+
+        for match in self._matcher.finditer(contract_code):
+            group = match.lastgroup
+            if group is None:
+                continue
+            rule = self._group_rules[group]
+
+            start = match.start()
+            newlines = contract_code.count("\n", position, start)
+            if newlines:
+                line += newlines
+                line_start = contract_code.rfind("\n", position, start) + 1
+            position = start
+
+            count = result.matched_rules.get(rule.rule_id, 0)
+            result.matched_rules[rule.rule_id] = count + 1
+            if count < self.max_locations_per_rule:
+                result.findings.append(Finding(
+                    rule_id=rule.rule_id,
+                    line=line,
+                    column=start - line_start + 1,
+                    match=match.group(),
+                    severity=rule.severity
+                ))
+
+        return result
+
+    def recommendations(self, result: ScanResult) -> List[str]:
+        """Recommendations for matched rules, in registration order"""
+        recommendations = []
+        for rule in self._rules.values():
+            if not rule.recommendation or not result.matched(rule.rule_id):
+                continue
+            if any(result.matched(other) for other in rule.unless):
+                continue
+            recommendations.append(rule.recommendation)
+        return recommendations
+
+
+DEFAULT_RULES = [
+    SecurityRule("payable", r"\bpayable\b", "💰 Review all payable functions for proper access control and reentrancy protection", "medium"),
+    SecurityRule("selfdestruct", r"\bselfdestruct\b", "⚠️ Consider removing selfdestruct functionality or add strict access controls", "high"),
+    SecurityRule("delegatecall", r"\bdelegatecall\b", "🚨 Audit delegatecall usage carefully - potential for storage collision attacks", "high"),
+    SecurityRule("mint", r"\b_mint\w*", "🏭 Ensure minting functions have proper access control (onlyOwner modifier)", "medium", unless=("only_owner",)),
+    SecurityRule("transfer", r"[\w$]*transfer[\w$]*", "✅ Add require statements to validate transfer operations", "low", unless=("require",)),
+    SecurityRule("only_owner", r"\bonlyowner\b"),
+    SecurityRule("require", r"\brequire\b"),
+]
+
+# Shared scanner used by AuditooorCloud; register additional rules here
+default_scanner = SolidityScanner(DEFAULT_RULES)
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Solidity source helpers - ServiceFlow AI
+Lightweight lexing utilities shared by the Auditooor cache and analysis stages
+"""
+
+import re
+import hashlib
+from dataclasses import dataclass
+from typing import List, Optional
+
+# Lexemes whose contents never count as code
+STRING_LITERAL_PATTERN = r'"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\''
+COMMENT_PATTERN = r'//[^\n]*|/\*.*?(?:\*/|\Z)'
+
+# One lexer pass: string literals are kept verbatim, comments and whitespace are collapsed
+_LEXER = re.compile(
+    rf'(?P<string>{STRING_LITERAL_PATTERN})'
+    rf'|(?P<comment>{COMMENT_PATTERN})'
+    r'|(?P<space>\s+)',
+    re.DOTALL,
+)
+
+
+# Multi-character operators and comment openers, whose characters must not be fused across whitespace
+_MULTI_CHAR_TOKENS = (
+    "++", "--", "**", "<<", ">>", ">>>", "<=", ">=", "==", "!=", "&&", "||", "+=", "-=", "*=", "/=",
+    "%=", "|=", "&=", "^=", "<<=", ">>=", ">>>=", "->", "=>", ":=", "//", "/*",
+)
+_JOINING_PAIRS = frozenset(token[i:i + 2] for token in _MULTI_CHAR_TOKENS for i in range(len(token) - 1))
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char in "_$"
+
+
+def _needs_separator(before: str, after: str) -> bool:
+    """Whether dropping the whitespace between two characters could join them into one token"""
+    return (_is_word_char(before) and _is_word_char(after)) or before + after in _JOINING_PAIRS
+
+
+def normalize_contract_source(contract_code: str) -> str:
+    """Strip comments and insignificant whitespace so cosmetic edits map to the same source
+
+    A single space survives where removing it would merge two tokens: `a - -b` must not
+    become `a--b`.
+    """
+    parts = []
+    position = 0
+    pending_gap = False
+
+    def append_code(chunk: str):
+        if pending_gap and parts and _needs_separator(parts[-1][-1], chunk[0]):
+            parts.append(" ")
+        parts.append(chunk)
+
+    for match in _LEXER.finditer(contract_code):
+        if match.start() > position:
+            append_code(contract_code[position:match.start()])
+            pending_gap = False
+        position = match.end()
+
+        if match.lastgroup == "string":
+            parts.append(match.group())
+        else:
+            # Comments behave like whitespace: a separator survives only where tokens would merge
+            pending_gap = True
+
+    if position < len(contract_code):
+        append_code(contract_code[position:])
+
+    return "".join(parts)
+
+
+def contract_code_hash(contract_code: str) -> str:
+    """Content address (sha256 hex) of the normalized contract source"""
+    return hashlib.sha256(normalize_contract_source(contract_code).encode("utf-8")).hexdigest()
+
+
+# Declarations that own a brace-delimited body and become their own audit units
+CONTRACT_KEYWORDS = ("contract", "interface", "library")
+MEMBER_KEYWORDS = ("function", "modifier", "constructor", "fallback", "receive")
+
+_UNIT_TOKENS = re.compile(
+    rf'(?:{STRING_LITERAL_PATTERN})|(?:{COMMENT_PATTERN})'
+    r'|(?P<open>\{)|(?P<close>\})|(?P<semicolon>;)'
+    rf'|\b(?P<keyword>{"|".join(CONTRACT_KEYWORDS + MEMBER_KEYWORDS)})\b(?:\s+(?P<name>[A-Za-z_$][\w$]*))?',
+    re.DOTALL,
+)
+_ABSTRACT_PREFIX = re.compile(r'\babstract\s+\Z')
+
+
+@dataclass(frozen=True)
+class SourceUnit:
+    """A contiguous slice of a source file that is audited as one unit
+
+    `kind` is "function" or "modifier" for members, "contract" for the declarations between
+    members (header, state variables, events, closing brace) and "source" for top-level code.
+    """
+
+    kind: str
+    name: str
+    start: int
+    end: int
+    start_line: int
+    start_column: int
+    code: str
+    # Enclosing contract, None for top-level code
+    contract: Optional[str] = None
+
+    @property
+    def digest(self) -> str:
+        """Exact-content hash; finding positions inside the unit are stable for equal digests"""
+        return hashlib.sha256(self.code.encode("utf-8")).hexdigest()
+
+
+def split_source_units(contract_code: str) -> List[SourceUnit]:
+    """Split a source file into contract declarations, functions and modifiers
+
+    The units cover the whole file in order; whitespace- and comment-only gaps are dropped.
+    """
+    units: List[SourceUnit] = []
+    counts = {}
+
+    def emit(kind: str, name: str, start: int, end: int):
+        code = contract_code[start:end]
+        if not normalize_contract_source(code).strip():
+            return
+        # Repeated names (overloads, declaration segments) get an ordinal suffix
+        counts[name] = counts.get(name, 0) + 1
+        if counts[name] > 1:
+            name = f"{name}#{counts[name]}"
+        line_start = contract_code.rfind("\n", 0, start) + 1
+        units.append(SourceUnit(
+            kind=kind,
+            name=name,
+            start=start,
+            end=end,
+            start_line=contract_code.count("\n", 0, start) + 1,
+            start_column=start - line_start + 1,
+            code=code,
+            contract=contract
+        ))
+
+    depth = 0
+    segment_start = 0
+    contract: Optional[str] = None
+    # [kind, name, start, body depth (None until its opening brace)]
+    member: Optional[list] = None
+
+    def gap_unit() -> tuple:
+        return ("contract", contract) if contract is not None else ("source", "<source>")
+
+    for match in _UNIT_TOKENS.finditer(contract_code):
+        keyword = match.group("keyword")
+        if keyword is not None:
+            if member is not None:
+                continue
+            if keyword in CONTRACT_KEYWORDS and contract is None and depth == 0:
+                # `abstract contract X` starts at the modifier
+                abstract = _ABSTRACT_PREFIX.search(contract_code, segment_start, match.start())
+                contract_start = abstract.start() if abstract else match.start()
+                emit("source", "<source>", segment_start, contract_start)
+                contract = match.group("name") or keyword
+                segment_start = contract_start
+            elif keyword in MEMBER_KEYWORDS and depth == (0 if contract is None else 1):
+                emit(*gap_unit(), segment_start, match.start())
+                kind = "modifier" if keyword == "modifier" else "function"
+                name = (match.group("name") if keyword in ("function", "modifier") else None) or keyword
+                qualified = f"{contract}.{name}" if contract is not None else name
+                member = [kind, qualified, match.start(), None]
+        elif match.group("open") is not None:
+            depth += 1
+            if member is not None and member[3] is None:
+                member[3] = depth
+        elif match.group("close") is not None:
+            depth = max(0, depth - 1)
+            if member is not None and member[3] is not None and depth == member[3] - 1:
+                emit(member[0], member[1], member[2], match.end())
+                member = None
+                segment_start = match.end()
+            elif member is None and contract is not None and depth == 0:
+                emit("contract", contract, segment_start, match.end())
+                contract = None
+                segment_start = match.end()
+        elif member is not None and member[3] is None:
+            # Bodiless declaration (interface or abstract function)
+            emit(member[0], member[1], member[2], match.end())
+            member = None
+            segment_start = match.end()
+
+    if member is not None:
+        emit(member[0], member[1], member[2], len(contract_code))
+    else:
+        emit(*gap_unit(), segment_start, len(contract_code))
+    return units
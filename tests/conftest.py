@@ -0,0 +1,77 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+GATEWAY_DIR = ROOT / "railway-deployments" / "http-gateway"
+APP_DIR = ROOT / "myserviceprovider-app"
+
+for _path in (APP_DIR, GATEWAY_DIR / "benchmarks", GATEWAY_DIR):
+    if str(_path) not in sys.path:
+        sys.path.insert(0, str(_path))
+
+from standins import UpstreamStandIns
+
+# Modules UpstreamStandIns.install() puts in sys.modules
+STAND_IN_MODULES = ("Tools", "Tools.chaingpt_audit_tool", "cloudflare_rag_cloud")
+
+
+@pytest.fixture(autouse=True)
+def gateway_databases(tmp_path, monkeypatch):
+    """Keep stores the code under test opens by default out of the working directory"""
+    monkeypatch.setenv("AUDITOOOR_HISTORY_DB", "")
+    monkeypatch.setenv("AUDITOOOR_JOBS_DB", str(tmp_path / "auditooor_jobs.db"))
+
+
+@pytest.fixture
+def gateway_dir():
+    return GATEWAY_DIR
+
+
+@pytest.fixture
+def upstreams():
+    """Install ChainGPT and RAG stand-ins for one test: `upstreams(chaingpt=LatencyProfile(...))`
+
+    The modules they replace are restored afterwards, so later tests never run against them by accident.
+    """
+    saved = {name: sys.modules.get(name) for name in STAND_IN_MODULES}
+    installed = []
+
+    def install(**profiles):
+        installed.append(UpstreamStandIns(**profiles).install())
+        return installed[-1]
+
+    install.installed = installed
+    yield install
+    for name, module in saved.items():
+        if module is None:
+            sys.modules.pop(name, None)
+        else:
+            sys.modules[name] = module
+
+
+@pytest.fixture
+def make_cloud(upstreams):
+    """AuditooorCloud factory with an in-memory cache and history; default stand-ins unless the test installed its own
+
+    Tests close their clouds inside their event loop; the SQLite stores are closed here.
+    """
+    clouds = []
+
+    def make(**kwargs):
+        if not upstreams.installed:
+            upstreams()
+        from auditooor_cloud import AuditooorCloud
+        from audit_cache import AuditCache
+        from audit_history import AuditHistory
+        kwargs.setdefault("cache", AuditCache(db_path=""))
+        kwargs.setdefault("history", AuditHistory(db_path=""))
+        cloud = AuditooorCloud(**kwargs)
+        clouds.append(cloud)
+        return cloud
+
+    yield make
+    for cloud in clouds:
+        cloud.history.close()
+        cloud.jobs.store.close()
@@ -0,0 +1,35 @@
+import admin_agent_approval
+
+
+class PendingIndex:
+    def __init__(self, agents):
+        self.agents = agents
+        self.refreshed = []
+
+    def count(self, location, search=None):
+        return len(self.agents)
+
+    def refresh_agent(self, agent_id):
+        self.refreshed.append(agent_id)
+
+
+def test_a_rejection_that_collides_keeps_the_agent_on_the_page(monkeypatch):
+    agent = {"agent_id": "calc", "name": "calc", "header": "", "config_file": None, "python_file": "calc_agent.py"}
+    index = PendingIndex([agent])
+    reviewed = []
+
+    def decide(agent_id, action, reason=""):
+        raise FileExistsError(f"{agent_id} already exists in rejected")
+
+    answers = iter(["1", "r", "dup", "1", "s", "q"])
+    monkeypatch.setattr(admin_agent_approval, "get_agent_index", lambda: index)
+    monkeypatch.setattr(admin_agent_approval, "list_pending_agents", lambda **kwargs: list(index.agents))
+    monkeypatch.setattr(admin_agent_approval, "show_agent_details", reviewed.append)
+    monkeypatch.setattr(admin_agent_approval, "decide", decide)
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(answers))
+
+    assert admin_agent_approval.reject_agent(agent, "dup") is False
+    admin_agent_approval.interactive_review()
+    # The failed rejection left the agent selectable as number 1
+    assert reviewed == [agent, agent]
+    assert index.refreshed == []
@@ -0,0 +1,98 @@
+import asyncio
+import functools
+import contextvars
+
+import pytest
+
+from admission import AdmissionController, AdmissionRejected, PriorityLimiter, TierPolicy
+
+TIERS = {
+    "paid": TierPolicy("paid", priority=0, rate=100.0, burst=100, latency_budget=30.0),
+    "free": TierPolicy("free", priority=1, rate=0.5, burst=2, latency_budget=5.0),
+}
+
+
+def test_waiters_are_served_by_priority_then_arrival():
+    async def run():
+        limiter = PriorityLimiter("test_priority_upstream", limit=1)
+        order = []
+
+        async def call(name, priority):
+            async with limiter.slot(priority):
+                order.append(name)
+                await asyncio.sleep(0.01)
+
+        holder = asyncio.create_task(call("holder", 1))
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(call(name, priority))
+                   for name, priority in (("free-1", 1), ("paid", 0), ("free-2", 1))]
+        await asyncio.sleep(0)
+        assert limiter.stats()["queued_by_priority"] == {1: 2, 0: 1}
+        await asyncio.gather(holder, *waiters)
+        return order, limiter.stats()
+
+    order, stats = asyncio.run(run())
+    assert order == ["holder", "paid", "free-1", "free-2"]
+    assert stats["active"] == 0 and stats["queued"] == 0
+
+
+def isolated(test):
+    """Run a test in a copied context: admit() binds the admission to the caller's context,
+    which outside a task would leak it into every later test"""
+    @functools.wraps(test)
+    def run(*args, **kwargs):
+        return contextvars.copy_context().run(test, *args, **kwargs)
+    return run
+
+
+@isolated
+def test_tenants_have_separate_buckets():
+    controller = AdmissionController(TIERS, api_keys={"k-paid": "paid", "k-free": "free"}, upstream_concurrency={})
+    controller.admit("k-free", "audit")
+    controller.admit("k-free", "audit")
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.admit("k-free", "audit")
+    assert rejected.value.tier == "free" and rejected.value.retry_after >= 1
+
+    # Another key, and unknown keys (metered per client at the default tier), are unaffected
+    assert controller.admit("k-paid", "audit").tier.name == "paid"
+    assert controller.admit("bogus", "audit", client="10.0.0.9").tenant == "anonymous:10.0.0.9"
+    assert controller.stats()["outcomes"]["free"] == {"admitted": 3, "rate_limited": 1}
+
+
+def test_requests_are_shed_when_the_queue_exceeds_the_tier_budget():
+    async def run():
+        controller = AdmissionController(TIERS, api_keys={"k-paid": "paid", "k-free": "free"},
+                                         upstream_concurrency={"chaingpt": 1, "rag": 0, "openzeppelin": 0})
+        limiter = controller.upstreams["chaingpt"]
+        limiter.mean_hold = 4.0
+        release = asyncio.Event()
+
+        async def hold(priority):
+            async with limiter.slot(priority):
+                await release.wait()
+
+        tasks = [asyncio.create_task(hold(1)) for _ in range(3)]
+        await asyncio.sleep(0)
+        # Free requests would wait behind two queued calls: 3 * 4s > 5s budget
+        with pytest.raises(AdmissionRejected) as shed:
+            controller.admit("k-free", "audit")
+        # Paid requests queue ahead of free ones and fit their 30s budget
+        admitted = controller.admit("k-paid", "audit")
+        release.set()
+        await asyncio.gather(*tasks)
+        return shed.value, admitted, controller
+
+    shed, admitted, controller = asyncio.run(run())
+    assert "estimated wait" in shed.reason and shed.retry_after >= 1
+    assert admitted.priority == 0
+    # Shed requests do not spend tokens
+    assert controller.buckets.get("key:k-free") is None
+
+
+def test_tiers_need_a_positive_rate_and_retry_after_stays_finite():
+    for rate in (0, -1, float("inf"), float("nan")):
+        with pytest.raises(ValueError, match="positive, finite rate"):
+            TierPolicy("free", priority=1, rate=rate, burst=2, latency_budget=5.0)
+    assert AdmissionRejected("Rate limit exceeded", float("inf"), "free").retry_after == 3600
+    assert AdmissionRejected("Rate limit exceeded", 0.2, "free").retry_after == 1
@@ -0,0 +1,113 @@
+import os
+import json
+
+import pytest
+
+from agent_batch import TransactionLog, plan_decision, run_batch, resume_batch, rollback_batch
+
+
+def setup_agents(tmp_path, count):
+    locations = {name: tmp_path / name for name in ("pending", "approved", "rejected")}
+    locations["pending"].mkdir()
+    for i in range(count):
+        (locations["pending"] / f"agent{i}_agent.py").write_text('"""\nAgent\n"""\n')
+        (locations["pending"] / f"agent{i}_config.json").write_text(json.dumps({"metadata": {"status": "PENDING"}}))
+    return locations, TransactionLog(tmp_path / "txn.jsonl")
+
+
+def test_batch_reject_moves_agents_and_updates_configs(tmp_path):
+    locations, log = setup_agents(tmp_path, 20)
+    batch_id, results = run_batch([f"agent{i}" for i in range(20)] + ["missing"], "reject", "spam",
+                                  workers=4, log=log, locations=locations)
+    assert sum(result["status"] == "ok" for result in results) == 20
+    assert list(locations["pending"].iterdir()) == []
+    config = json.loads((locations["rejected"] / "agent7_config.json").read_text())
+    assert config["metadata"] == {"status": "REJECTED", "rejection_reason": "spam"}
+    assert log.unfinished() == []
+
+    assert len(rollback_batch(batch_id, log=log, locations=locations)) == 20
+    assert len(list(locations["pending"].glob("*_agent.py"))) == 20
+    assert list(locations["rejected"].iterdir()) == []
+    config = json.loads((locations["pending"] / "agent7_config.json").read_text())
+    assert config["metadata"] == {"status": "PENDING"}
+
+
+def crash_after_config_write(locations, log):
+    # Journaled and config written, but the process died before the agent file moved
+    txn = plan_decision("agent0", "approve", batch_id="b1", locations=locations)
+    log.append(txn)
+    locations["approved"].mkdir()
+    (locations["approved"] / "agent0_config.json").write_text(json.dumps(txn["new_config"]))
+
+
+def test_resume_finishes_a_crashed_decision(tmp_path):
+    locations, log = setup_agents(tmp_path, 1)
+    crash_after_config_write(locations, log)
+    assert resume_batch(log=log, locations=locations) == ["agent0"]
+    assert sorted(os.listdir(locations["approved"])) == ["agent0_agent.py", "agent0_config.json"]
+    assert os.listdir(locations["pending"]) == []
+    assert log.unfinished() == []
+
+
+def test_rollback_restores_a_crashed_decision(tmp_path):
+    locations, log = setup_agents(tmp_path, 1)
+    crash_after_config_write(locations, log)
+    assert rollback_batch(log=log, locations=locations) == ["agent0"]
+    assert sorted(os.listdir(locations["pending"])) == ["agent0_agent.py", "agent0_config.json"]
+    assert os.listdir(locations["approved"]) == []
+
+
+def test_resume_writes_the_new_config_over_an_existing_destination_agent(tmp_path):
+    locations, log = setup_agents(tmp_path, 1)
+    txn = plan_decision("agent0", "approve", batch_id="b1", locations=locations)
+    log.append(txn)
+    # Crash right after begin; meanwhile an older agent0 reached approved/
+    locations["approved"].mkdir()
+    (locations["approved"] / "agent0_agent.py").write_text("old = True\n")
+    (locations["approved"] / "agent0_config.json").write_text(json.dumps({"metadata": {"status": "OLD"}}))
+
+    assert resume_batch(log=log, locations=locations) == ["agent0"]
+    config = json.loads((locations["approved"] / "agent0_config.json").read_text())
+    assert config["metadata"]["status"] == "APPROVED"
+    assert (locations["approved"] / "agent0_agent.py").read_text() == '"""\nAgent\n"""\n'
+    assert os.listdir(locations["pending"]) == []
+
+    # New decisions refuse to replace an agent already in the destination
+    (locations["pending"] / "agent0_agent.py").write_text("x = 1\n")
+    with pytest.raises(FileExistsError):
+        plan_decision("agent0", "approve", locations=locations)
+
+
+class CountingLog(TransactionLog):
+    reads = 0
+
+    def records(self):
+        self.reads += 1
+        return super().records()
+
+
+def test_the_log_is_read_once_per_resume_and_never_for_fresh_decisions(tmp_path):
+    locations, _ = setup_agents(tmp_path, 12)
+    log = CountingLog(tmp_path / "txn.jsonl")
+    run_batch([f"agent{i}" for i in range(8)], "approve", workers=4, log=log, locations=locations)
+    assert log.reads == 0
+
+    # Crashed after begin, one of them also after writing its config
+    open_txns = [plan_decision(f"agent{i}", "approve", batch_id="b2", locations=locations) for i in (8, 9, 10)]
+    for txn in open_txns:
+        log.append(txn)
+    locations["approved"].mkdir(exist_ok=True)
+    (locations["approved"] / "agent9_config.json").write_text(json.dumps({"written": "before the crash"}))
+    log.append({"step": "config_written", "txn_id": open_txns[1]["txn_id"], "batch_id": "b2", "agent_id": "agent9"})
+
+    assert resume_batch("b2", log=log, locations=locations) == ["agent8", "agent9", "agent10"]
+    assert log.reads == 1
+    # The journaled config write is not repeated
+    assert json.loads((locations["approved"] / "agent9_config.json").read_text()) == {"written": "before the crash"}
+    assert json.loads((locations["approved"] / "agent8_config.json").read_text())["metadata"]["status"] == "APPROVED"
+
+    assert rollback_batch("b2", log=log, locations=locations) == ["agent10", "agent9", "agent8"]
+    assert log.reads == 2
+    assert sorted(path.name for path in locations["pending"].glob("*_agent.py")) == [
+        "agent10_agent.py", "agent11_agent.py", "agent8_agent.py", "agent9_agent.py"
+    ]
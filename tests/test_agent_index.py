@@ -0,0 +1,73 @@
+import os
+import json
+
+from agent_index import AgentIndex, read_header
+
+
+def write_agent(directory, agent_id, header="Weather agent", model="gpt-4o"):
+    (directory / f"{agent_id}_agent.py").write_text(f'"""\n{header}\n"""\n\nprint("hi")\n')
+    (directory / f"{agent_id}_config.json").write_text(json.dumps({
+        "model": model, "tools": ["web"], "description": f"{agent_id} description",
+        "metadata": {"status": "PENDING"}
+    }))
+
+
+def make_index(tmp_path):
+    locations = {name: tmp_path / name for name in ("pending", "approved", "rejected")}
+    locations["pending"].mkdir()
+    return AgentIndex(str(tmp_path / "index.db"), locations), locations
+
+
+def test_refresh_only_reindexes_changed_files(tmp_path):
+    index, locations = make_index(tmp_path)
+    for agent_id in ("alpha", "beta", "gamma"):
+        write_agent(locations["pending"], agent_id)
+    assert index.refresh() == {"added": 3, "updated": 0, "removed": 0, "unchanged": 0}
+
+    write_agent(locations["pending"], "beta", header="Beta v2")
+    (locations["pending"] / "gamma_agent.py").unlink()
+    assert index.refresh() == {"added": 0, "updated": 1, "removed": 1, "unchanged": 1}
+    beta = index.get("beta")
+    assert beta["header"].strip() == "Beta v2"
+    assert beta["tools"] == ["web"] and beta["status"] == "PENDING"
+
+
+def test_listing_pages_and_filters_from_the_index(tmp_path):
+    index, locations = make_index(tmp_path)
+    for i in range(7):
+        write_agent(locations["pending"], f"agent{i}", model="claude" if i % 2 else "gpt-4o")
+    index.refresh()
+
+    first = index.list_agents(limit=3)
+    second = index.list_agents(limit=3, after=first[-1]["agent_id"])
+    assert [a["agent_id"] for a in first + second] == [f"agent{i}" for i in range(6)]
+    assert index.count(model="claude") == 3
+    assert [a["agent_id"] for a in index.list_agents(search="agent4")] == ["agent4"]
+
+    # Agents moved by approval are re-indexed under their new location
+    locations["approved"].mkdir()
+    for suffix in ("_agent.py", "_config.json"):
+        os.replace(locations["pending"] / f"agent4{suffix}", locations["approved"] / f"agent4{suffix}")
+    index.refresh_agent("agent4")
+    assert index.get("agent4") is None
+    assert index.get("agent4", location="approved")["name"] == "Agent4"
+
+
+def test_header_read_is_bounded(tmp_path):
+    agent = tmp_path / "big_agent.py"
+    agent.write_text('"""\nHeader\n"""\n' + "x = 1\n" * 100000)
+    assert read_header(agent, max_bytes=64).strip() == "Header"
+
+
+def test_search_matches_display_names_and_takes_wildcards_literally(tmp_path):
+    index, locations = make_index(tmp_path)
+    for agent_id in ("price_bot", "pricexbot", "weather"):
+        write_agent(locations["pending"], agent_id)
+    (locations["pending"] / "weather_config.json").write_text(json.dumps({"description": "100% uptime \\ fast"}))
+    index.refresh()
+
+    assert [a["agent_id"] for a in index.list_agents(search="Price Bot")] == ["price_bot"]
+    assert [a["agent_id"] for a in index.list_agents(search="price_")] == ["price_bot"]
+    assert [a["agent_id"] for a in index.list_agents(search="100%")] == ["weather"]
+    assert [a["agent_id"] for a in index.list_agents(search="% uptime \\")] == ["weather"]
+    assert index.count(search="%") == 1 and index.count(search="_") == 1
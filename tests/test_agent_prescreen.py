@@ -0,0 +1,42 @@
+import json
+
+from agent_prescreen import PrescreenCache, check_config, check_source, pending_agent_files, prescreen_agents
+
+VALID_CONFIG = {"model": "gpt-4o", "tools": ["search"], "metadata": {"status": "PENDING"}}
+
+
+def test_check_source_resolves_aliases_and_flags_imports():
+    source = b"import subprocess as sp\nfrom os import system\nimport json\nsp.run(['ls'])\nsystem('id')\njson.dumps({})\n"
+    issues = check_source(source)
+    messages = {issue["message"] for issue in issues}
+    assert "Import 'subprocess' is not on the allow-list" in messages
+    assert "Calls subprocess.run()" in messages
+    assert "Calls os.system()" in messages
+    assert not any("json" in message for message in messages)
+    assert check_source(b"def broken(:\n")[0]["severity"] == "error"
+
+
+def test_check_config_schema():
+    assert check_config(json.dumps(VALID_CONFIG)) == []
+    assert check_config("{not json")[0]["severity"] == "error"
+    issues = check_config(json.dumps({"model": "", "tools": "search", "metadata": {"status": "MAYBE"}}))
+    assert len(issues) == 3
+
+
+def test_prescreen_reuses_cached_results(tmp_path):
+    pending = tmp_path / "pending"
+    pending.mkdir()
+    for i in range(5):
+        (pending / f"agent{i}_agent.py").write_text("import os\nos.system('x')\n" if i == 0 else "import json\n")
+        (pending / f"agent{i}_config.json").write_text(json.dumps(VALID_CONFIG))
+    cache = PrescreenCache(str(tmp_path / "prescreen.db"))
+
+    results, stats = prescreen_agents(pending_agent_files(pending), cache=cache, workers=2, batch_size=2)
+    assert [result["verdict"] for result in results] == ["flag", "pass", "pass", "pass", "pass"]
+    # Identical agents share one content hash
+    assert stats["screened"] == 2 and stats["cached"] == 0
+
+    (pending / "agent1_agent.py").write_text("eval('1')\n")
+    results, stats = prescreen_agents(pending_agent_files(pending), cache=cache)
+    assert stats["cached"] == 4 and stats["screened"] == 1
+    assert results[1]["verdict"] == "flag"
@@ -0,0 +1,69 @@
+import json
+
+from agent_profiler import check_budget, parse_importtime, profile_agent, profile_agents, stored_profile
+
+
+def test_parse_importtime_only_counts_modules_after_the_marker():
+    stderr = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       100 |        100 | encodings",
+        "agent-profile: start",
+        "import time:       300 |        300 |   email.charset",
+        "import time:       200 |        500 | email.mime.text",
+        "import time:        50 |         50 | json",
+    ])
+    modules = parse_importtime(stderr)
+    assert [m["module"] for m in modules] == ["email.charset", "email.mime.text", "json"]
+    assert [m["depth"] for m in modules] == [1, 0, 0]
+    assert modules[1]["cumulative_ms"] == 0.5
+
+
+def test_profile_agent_measures_import_and_reports_failures(tmp_path):
+    heavy = tmp_path / "heavy_agent.py"
+    heavy.write_text("import email.mime.text\nprint('noise')\nDATA = [0] * 5_000_000\n")
+    profile = profile_agent(heavy)
+    assert profile["status"] == "ok"
+    assert any(m["module"] == "email.mime.text" for m in profile["imports"])
+    assert check_budget(profile, {"import_seconds": 60, "peak_rss_mb": 1}) == [
+        f"Peak RSS {profile['peak_rss_mb']:.0f}MB (budget 1MB)"
+    ]
+
+    broken = tmp_path / "broken_agent.py"
+    broken.write_text("raise RuntimeError('boom')\n")
+    assert check_budget(profile_agent(broken)) == ["Import failed: RuntimeError: boom"]
+
+
+def test_profiles_are_stored_outside_the_agent_files_and_invalidated_on_change(tmp_path):
+    pending, approved, profiles = tmp_path / "pending", tmp_path / "approved", tmp_path / "profiles"
+    locations = {"pending": pending, "approved": approved}
+    pending.mkdir()
+    approved.mkdir()
+    (pending / "calc_agent.py").write_text("import json\n")
+    config = json.dumps({"metadata": {"status": "PENDING"}})
+    (pending / "calc_config.json").write_text(config)
+    config_mtime = (pending / "calc_config.json").stat().st_mtime_ns
+
+    first = profile_agents(["calc"], locations=locations, profile_dir=profiles)["calc"]
+    assert stored_profile("calc", locations=locations, profile_dir=profiles) == first
+    again = profile_agents(["calc"], locations=locations, profile_dir=profiles)["calc"]
+    assert again["profiled_at"] == first["profiled_at"]
+    # The watched agent files are left alone, so the prescreen cache and watcher are not disturbed
+    assert sorted(path.name for path in pending.iterdir()) == ["calc_agent.py", "calc_config.json"]
+    assert (pending / "calc_config.json").read_text() == config
+    assert (pending / "calc_config.json").stat().st_mtime_ns == config_mtime
+
+    # Keyed by content, so the profile still applies once the agent is approved
+    (pending / "calc_agent.py").rename(approved / "calc_agent.py")
+    assert stored_profile("calc", "approved", locations, profiles) == first
+    assert stored_profile("calc", locations=locations, profile_dir=profiles) is None
+
+    (approved / "calc_agent.py").rename(pending / "calc_agent.py")
+    (pending / "calc_agent.py").write_text("import json, decimal\n")
+    assert stored_profile("calc", locations=locations, profile_dir=profiles) is None
+    changed = profile_agents(["calc"], locations=locations, profile_dir=profiles)["calc"]
+    assert changed["agent_hash"] != first["agent_hash"]
+
+    # An unreadable stored profile is re-measured rather than trusted
+    for path in profiles.iterdir():
+        path.write_text("{not json")
+    assert stored_profile("calc", locations=locations, profile_dir=profiles) is None
@@ -0,0 +1,55 @@
+import time
+import json
+
+import pytest
+
+from agent_watcher import PendingWatcher
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+@pytest.mark.parametrize("polling", [False, True])
+def test_agent_is_ready_once_its_config_arrives(tmp_path, polling):
+    events = []
+    watcher = PendingWatcher(lambda *args: events.append(("ready", *args)),
+                             lambda agent_id: events.append(("removed", agent_id)),
+                             directory=tmp_path, debounce=0.1, pair_timeout=5, polling=polling, poll_interval=0.05)
+    watcher.start()
+    try:
+        time.sleep(0.2)
+        (tmp_path / "calc_agent.py").write_text("import json\n")
+        time.sleep(0.4)
+        # Still waiting for the config to pair with
+        assert events == []
+        (tmp_path / "calc_config.json").write_text(json.dumps({"metadata": {"status": "PENDING"}}))
+        assert wait_for(lambda: events)
+        assert events == [("ready", "calc", tmp_path / "calc_agent.py", tmp_path / "calc_config.json")]
+
+        (tmp_path / "calc_agent.py").unlink()
+        (tmp_path / "calc_config.json").unlink()
+        assert wait_for(lambda: len(events) == 2)
+        assert events[1] == ("removed", "calc")
+    finally:
+        watcher.stop()
+
+
+def test_agent_without_config_is_released_after_pair_timeout(tmp_path):
+    (tmp_path / "old_agent.py").write_text("")
+    ready = []
+    watcher = PendingWatcher(lambda *args: ready.append(args), directory=tmp_path, debounce=0.05, pair_timeout=0.3)
+    watcher.start()
+    try:
+        time.sleep(0.2)
+        (tmp_path / "solo_agent.py").write_text("import json\n")
+        assert wait_for(lambda: ready)
+        # Agents present before the watcher started are not re-emitted
+        assert ready == [("solo", tmp_path / "solo_agent.py", None)]
+    finally:
+        watcher.stop()
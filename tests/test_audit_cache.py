@@ -0,0 +1,56 @@
+import time
+
+from audit_cache import AuditCache, TTLCache
+from solidity_source import normalize_contract_source, contract_code_hash
+
+
+def test_normalization_ignores_comments_and_whitespace():
+    original = 'contract A {\n    // owner only\n    function f() public { x = "a  b"; }\n}'
+    edited = 'contract  A{ /* docs */ function f()  public {x="a  b";}}'
+    assert normalize_contract_source(original) == normalize_contract_source(edited)
+    assert contract_code_hash(original) == contract_code_hash(edited)
+    # String literal contents are significant
+    assert contract_code_hash(original) != contract_code_hash(original.replace("a  b", "a b"))
+
+
+def test_normalization_never_joins_operators_into_a_different_token():
+    cases = {
+        "x = a - -b;": "x=a- -b;",
+        "x = a + +b;": "x=a+ +b;",
+        "x = a - /* c */ -b;": "x=a- -b;",
+        "x = y - --z;": "x=y- --z;",
+        "x = i++ + j;": "x=i++ +j;",
+        "x -= 1; ok = a && !b;": "x-=1;ok=a&&!b;",
+    }
+    for source, normalized in cases.items():
+        assert normalize_contract_source(source) == normalized
+    assert contract_code_hash("x = a - -b;") != contract_code_hash("x = a--b;")
+    assert contract_code_hash("x = a - -b;") == contract_code_hash("x=a  -  -b ;")
+
+
+def test_ttl_cache_evicts_lru_and_expired_entries():
+    cache = TTLCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+
+    cache.set("short", 4, ttl_seconds=0.01)
+    time.sleep(0.02)
+    assert cache.get("short") is None
+
+
+def test_audit_cache_survives_restart_via_sqlite(tmp_path):
+    db_path = str(tmp_path / "audits.db")
+    cache = AuditCache(db_path=db_path)
+    assert cache.get("hash") is None
+    cache.set("hash", {"overall_status": "completed"})
+    cache.close()
+
+    reopened = AuditCache(db_path=db_path)
+    assert reopened.get("hash") == {"overall_status": "completed"}
+    stats = reopened.stats()
+    assert stats["hits"] == 1 and stats["disk_hits"] == 1
+    reopened.close()
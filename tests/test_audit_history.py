@@ -0,0 +1,149 @@
+import time
+import asyncio
+
+from audit_history import AuditHistory, client_label
+
+
+def _report(name, findings=0):
+    return {"contract_name": name, "overall_status": "completed", "static_findings": [{"rule": "r"}] * findings}
+
+
+def test_queries_filter_and_page_by_keyset(tmp_path):
+    history = AuditHistory(db_path=str(tmp_path / "history.db"))
+    for i in range(7):
+        history.record(_report(f"Token{i % 2}", findings=i), f"hash{i % 3}", client="a" if i < 5 else "b")
+
+    pages, cursor = [], None
+    while True:
+        page = history.query(client="a", limit=2, cursor=cursor)
+        pages.append([item["audit_id"] for item in page["items"]])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert pages == [[5, 4], [3, 2], [1]]
+    assert [item["audit_id"] for item in history.query(code_hash="hash0", contract_name="Token0")["items"]] == [7, 1]
+
+    entry = history.get(6)
+    assert entry["report"] == _report("Token1", findings=5) and entry["finding_count"] == 5
+    history.close()
+    # Survives a restart
+    assert AuditHistory(db_path=str(tmp_path / "history.db")).get(6)["client"] == "b"
+
+
+def test_compaction_applies_age_and_count_retention(tmp_path):
+    history = AuditHistory(db_path=str(tmp_path / "history.db"), max_records=3, compact_every=1000)
+    for i in range(5):
+        history.record(_report("Token"), f"hash{i}")
+    history._connect().execute("UPDATE audit_history SET created_at = ? WHERE audit_id = 5", (time.time() - 400 * 86400,))
+    assert history.compact() == {"expired": 1, "trimmed": 1}
+    assert [item["audit_id"] for item in history.query()["items"]] == [4, 3, 2]
+    assert history.stats()["free_bytes"] == 0
+
+
+def test_audits_are_recorded_with_their_client(make_cloud):
+    from admission import AdmissionController
+
+    async def run():
+        cloud = make_cloud(admission=AdmissionController(api_keys={"secret": "paid"}))
+        try:
+            cloud.admission.admit("secret", "audit")
+            first = await cloud.audit_contract_comprehensive({"contract_code": "contract A {}", "contract_name": "A"})
+            cached = await cloud.audit_contract_comprehensive({"contract_code": "contract A {}", "contract_name": "A"})
+            return first, cached, cloud.history.query(code_hash=first["cache"]["code_hash"])["items"]
+        finally:
+            await cloud.aclose()
+
+    first, cached, items = asyncio.run(run())
+    assert cached["cache"]["hit"] and cached["history_id"] == first["history_id"] + 1
+    assert [item["audit_id"] for item in items] == [cached["history_id"], first["history_id"]]
+    assert items[0]["client"] == client_label("key:secret") and "secret" not in items[0]["client"]
+
+
+def test_history_routes_require_an_api_key_and_scope_to_it(make_cloud, monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    import auditooor_cloud
+    import auditooor_routes
+    from admission import AdmissionController
+
+    cloud = make_cloud(admission=AdmissionController(api_keys={"secret": "paid", "other": "paid"}))
+    monkeypatch.setattr(auditooor_cloud, "_auditooor_cloud", cloud)
+    mine = cloud.history.record(_report("Mine"), "hash1", client=client_label("key:secret"))
+    cloud.history.record(_report("Anonymous"), "hash2", client="anonymous:203.0.113.9")
+    app = FastAPI()
+    app.include_router(auditooor_routes.auditooor_router)
+    client = TestClient(app)
+    prefix = auditooor_routes.auditooor_router.prefix
+
+    # Anonymous callers cannot read anyone's history, including audits made from their own address
+    for path in ("/history", f"/history/{mine}", "/history/2"):
+        response = client.get(prefix + path, headers={"X-Forwarded-For": "203.0.113.9"})
+        assert response.status_code == 401
+    assert client.get(prefix + "/history", headers={"X-API-Key": "unknown"}).status_code == 401
+
+    items = client.get(prefix + "/history", headers={"X-API-Key": "secret"}).json()["items"]
+    assert [item["audit_id"] for item in items] == [mine]
+    assert client.get(prefix + f"/history/{mine}", headers={"Authorization": "Bearer other"}).status_code == 404
+    assert client.get(prefix + f"/history/{mine}", headers={"X-API-Key": "secret"}).json()["contract_name"] == "Mine"
+
+
+def test_client_address_trusts_only_the_configured_proxy_hops(monkeypatch):
+    from starlette.requests import Request
+    import auditooor_routes
+
+    def request(*forwarded):
+        headers = [(b"x-forwarded-for", value.encode()) for value in forwarded]
+        return Request({"type": "http", "headers": headers, "client": ("10.0.0.2", 4000)})
+
+    assert auditooor_routes.client_address(request("198.51.100.7")) == "10.0.0.2"
+    monkeypatch.setattr(auditooor_routes, "TRUSTED_PROXY_HOPS", 1)
+    # A client-supplied entry ahead of the proxy's own is ignored
+    assert auditooor_routes.client_address(request("6.6.6.6, 198.51.100.7")) == "198.51.100.7"
+    assert auditooor_routes.client_address(request("6.6.6.6", "198.51.100.7")) == "198.51.100.7"
+    assert auditooor_routes.client_address(request()) == "10.0.0.2"
+    monkeypatch.setattr(auditooor_routes, "TRUSTED_PROXY_HOPS", 2)
+    assert auditooor_routes.client_address(request("6.6.6.6, 198.51.100.7, 10.0.0.1")) == "198.51.100.7"
+
+
+def test_history_reads_do_not_block_the_event_loop(make_cloud, monkeypatch):
+    import httpx
+    from fastapi import FastAPI
+    import auditooor_cloud
+    import auditooor_routes
+    from admission import AdmissionController
+
+    history = AuditHistory(db_path="")
+    audit_id = history.record(_report("Slow"), "hash1", client=client_label("key:secret"))
+    for name in ("query", "get"):
+        read = getattr(history, name)
+        # A large history: every read holds its thread for a while
+        monkeypatch.setattr(history, name, lambda *args, read=read, **kwargs: (time.sleep(0.3), read(*args, **kwargs))[1])
+    cloud = make_cloud(history=history, admission=AdmissionController(api_keys={"secret": "paid"}))
+    cloud.ready = True
+    monkeypatch.setattr(auditooor_cloud, "_auditooor_cloud", cloud)
+    app = FastAPI()
+    app.include_router(auditooor_routes.auditooor_router)
+    prefix = auditooor_routes.auditooor_router.prefix
+
+    async def run():
+        finished = []
+
+        async def get(client, path, **kwargs):
+            response = await client.get(prefix + path, **kwargs)
+            finished.append(path)
+            return response
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://gateway") as client:
+            key = {"X-API-Key": "secret"}
+            responses = await asyncio.gather(
+                get(client, "/history", headers=key), get(client, f"/history/{audit_id}", headers=key),
+                get(client, "/ready")
+            )
+        return finished, responses
+
+    finished, (listing, entry, ready) = asyncio.run(run())
+    # The probe was answered while both reads were still sleeping in their threads
+    assert finished[0] == "/ready" and ready.status_code == 200
+    assert [item["audit_id"] for item in listing.json()["items"]] == [audit_id]
+    assert entry.json()["contract_name"] == "Slow"
@@ -0,0 +1,165 @@
+import time
+import asyncio
+import sqlite3
+
+import pytest
+
+from audit_jobs import (
+    AuditJobQueue, JobStore, JOB_QUEUED, JOB_RUNNING, JOB_SUCCEEDED, JOB_FAILED, check_webhook_url, public_address
+)
+
+
+def test_claim_order_follows_priority_then_age(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    low = store.add("audit", {"n": 1}, priority=0)
+    high = store.add("audit", {"n": 2}, priority=10)
+    assert store.claim()["job_id"] == high["job_id"]
+    assert store.claim()["job_id"] == low["job_id"]
+    assert store.claim() is None
+
+
+def test_running_jobs_are_requeued_after_restart(tmp_path):
+    db_path = str(tmp_path / "jobs.db")
+    store = JobStore(db_path)
+    job = store.add("audit", {"contract_code": "contract A {}"})
+    store.claim()
+    store.close()
+
+    reopened = JobStore(db_path)
+    assert reopened.get(job["job_id"])["status"] == JOB_RUNNING
+    assert reopened.recover() == 1
+    assert reopened.get(job["job_id"])["status"] == JOB_QUEUED
+
+
+def test_failed_attempts_retry_until_max_attempts(tmp_path):
+    attempts = {"flaky": 0}
+
+    async def flaky(payload):
+        attempts["flaky"] += 1
+        if attempts["flaky"] < 2:
+            return {"status": "error", "error": "upstream unavailable"}
+        return {"status": "success", "echo": payload["n"]}
+
+    async def broken(payload):
+        raise RuntimeError("always broken")
+
+    async def run():
+        queue = AuditJobQueue({"flaky": flaky, "broken": broken}, store=JobStore(str(tmp_path / "jobs.db")),
+                              workers=2, max_attempts=2, retry_backoff=0.01, poll_interval=0.01)
+        await queue.start()
+        ok = await queue.submit("flaky", {"n": 7})
+        failed = await queue.submit("broken", {})
+        for _ in range(200):
+            jobs = [await queue.get(job["job_id"]) for job in (ok, failed)]
+            if all(job["status"] in (JOB_SUCCEEDED, JOB_FAILED) for job in jobs):
+                break
+            await asyncio.sleep(0.01)
+        await queue.stop()
+        return jobs
+
+    ok, failed = asyncio.run(run())
+    assert ok["status"] == JOB_SUCCEEDED and ok["attempts"] == 2 and ok["result"]["echo"] == 7
+    assert failed["status"] == JOB_FAILED and failed["attempts"] == 2 and "always broken" in failed["error"]
+
+
+@pytest.mark.parametrize("webhook_url", [
+    "http://hooks.example.com/audit",
+    "https://127.0.0.1/hook",
+    "https://10.1.2.3/hook",
+    "https://169.254.169.254/latest/meta-data",
+    "https://[::1]:8443/hook",
+    "https://localhost/hook",
+    "https://metadata.google.internal/hook",
+    "file:///etc/passwd",
+])
+def test_webhooks_to_internal_or_plaintext_targets_are_refused(tmp_path, webhook_url):
+    with pytest.raises(ValueError):
+        check_webhook_url(webhook_url)
+
+    async def run():
+        queue = AuditJobQueue({"audit": None}, store=JobStore(str(tmp_path / "jobs.db")))
+        return await queue.submit("audit", {}, webhook_url=webhook_url), await queue.stats()
+
+    rejected, stats = asyncio.run(run())
+    assert rejected["status"] == "error" and stats["jobs"][JOB_QUEUED] == 0
+
+
+def test_public_webhooks_pass_and_names_are_checked_by_address():
+    assert check_webhook_url("https://hooks.example.com/audit?x=1") == "https://hooks.example.com/audit?x=1"
+    assert check_webhook_url("https://8.8.8.8/hook") == "https://8.8.8.8/hook"
+    with pytest.raises(ValueError, match="non-public"):
+        asyncio.run(public_address("127.0.0.1"))
+
+
+def test_webhook_is_posted_to_the_checked_address_with_the_original_host(tmp_path):
+    import httpx
+    delivered = []
+
+    def handler(request):
+        delivered.append((str(request.url), request.headers["host"], request.extensions.get("sni_hostname")))
+        return httpx.Response(204)
+
+    async def run():
+        queue = AuditJobQueue({"audit": None}, store=JobStore(str(tmp_path / "jobs.db")))
+        queue._webhook_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        job = await queue.submit("audit", {}, webhook_url="https://93.184.216.34:8443/hook")
+        await queue._deliver_webhook(job["job_id"], "https://93.184.216.34:8443/hook")
+        await queue._deliver_webhook(job["job_id"], "https://[fe80::1]/hook")
+        await queue.stop()
+
+    asyncio.run(run())
+    assert delivered == [("https://93.184.216.34:8443/hook", "93.184.216.34:8443", "93.184.216.34")]
+
+
+def test_stores_from_before_client_scoping_gain_the_column(tmp_path):
+    db_path = str(tmp_path / "jobs.db")
+    db = sqlite3.connect(db_path)
+    db.execute(
+        "CREATE TABLE audit_jobs (job_id TEXT PRIMARY KEY, kind TEXT NOT NULL, payload TEXT NOT NULL, "
+        "priority INTEGER NOT NULL DEFAULT 0, status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, "
+        "max_attempts INTEGER NOT NULL, result TEXT, error TEXT, webhook_url TEXT, "
+        "created_at REAL NOT NULL, updated_at REAL NOT NULL, run_after REAL NOT NULL)"
+    )
+    db.execute("INSERT INTO audit_jobs VALUES ('old', 'audit', '{}', 0, 'queued', 0, 3, NULL, NULL, NULL, 0, 0, 0)")
+    db.commit()
+    db.close()
+
+    store = JobStore(db_path)
+    assert store.get("old")["client"] is None
+    assert store.add("audit", {}, client="key:abc")["client"] == "key:abc"
+
+
+def test_jobs_are_readable_only_by_their_client_and_recorded_in_its_history(make_cloud, monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    import auditooor_cloud
+    import auditooor_routes
+    from admission import AdmissionController
+
+    # The default queue, with the cloud's handlers, on the per-test AUDITOOOR_JOBS_DB
+    cloud = make_cloud(admission=AdmissionController(api_keys={"alice": "paid", "bob": "paid"}))
+    monkeypatch.setattr(auditooor_cloud, "_auditooor_cloud", cloud)
+    app = FastAPI()
+    app.include_router(auditooor_routes.auditooor_router)
+    prefix = auditooor_routes.auditooor_router.prefix
+    alice, bob = {"X-API-Key": "alice"}, {"X-API-Key": "bob"}
+
+    with TestClient(app) as client:
+        submitted = client.post(prefix + "/jobs", headers=alice, json={
+            "kind": "audit", "payload": {"contract_code": "contract A { function f() external {} }"}
+        })
+        job_id = submitted.json()["job_id"]
+        for _ in range(100):
+            job = client.get(prefix + f"/jobs/{job_id}", headers=alice).json()
+            if job["status"] == JOB_SUCCEEDED:
+                break
+            time.sleep(0.05)
+        assert job["status"] == JOB_SUCCEEDED
+
+        # Other tenants and anonymous callers cannot tell the job apart from an unknown one
+        assert client.get(prefix + f"/jobs/{job_id}", headers=bob).status_code == 404
+        assert client.get(prefix + f"/jobs/{job_id}").status_code == 404
+
+        items = client.get(prefix + "/history", headers=alice).json()["items"]
+        assert [item["audit_id"] for item in items] == [job["result"]["history_id"]]
+        assert client.get(prefix + "/history", headers=bob).json()["items"] == []
@@ -0,0 +1,97 @@
+import sys
+import time
+import subprocess
+import asyncio
+from contextlib import aclosing
+
+from standins import LatencyProfile
+
+CONTRACT = "pragma solidity ^0.8.20;\ncontract Box { function f() external { selfdestruct(payable(msg.sender)); } }\n"
+
+
+def in_flight():
+    from auditooor_cloud import IN_FLIGHT
+    return IN_FLIGHT.labels("audit").current()
+
+
+def test_events_arrive_in_stage_order_and_failed_stages_are_reported(make_cloud, upstreams):
+    upstreams(rag=LatencyProfile(error_rate=1.0))
+
+    async def run():
+        cloud = make_cloud()
+        try:
+            return [event async for event in cloud.audit_contract_stream({"contract_code": CONTRACT})]
+        finally:
+            await cloud.aclose()
+
+    events = asyncio.run(run())
+    types = [event.type for event in events]
+    assert types[0] == "started" and types[-1] == "completed"
+    assert types[1:4] == ["stage_started"] * 3
+    finished = [index for index, event in enumerate(events) if event.type == "stage_finished"]
+    assert sorted(events[index].stage for index in finished) == ["chaingpt", "rag", "static"]
+    # Every finished stage is followed by its result, or by a stage-scoped error
+    for index in finished:
+        follower = events[index + 1]
+        assert follower.stage == events[index].stage
+        assert follower.type == ("error" if follower.stage == "rag" else "partial_result")
+    assert [event.elapsed_ms for event in events] == sorted(event.elapsed_ms for event in events)
+    assert events[-1].data["overall_status"] == "partial"
+
+
+def test_missing_code_ends_the_stream_with_a_single_error(make_cloud, upstreams):
+    upstreams()
+
+    async def run():
+        cloud = make_cloud()
+        try:
+            events = [event async for event in cloud.audit_contract_stream({"contract_code": "  "})]
+            return events, await cloud.audit_contract_comprehensive({"contract_code": ""})
+        finally:
+            await cloud.aclose()
+
+    events, report = asyncio.run(run())
+    assert [(event.type, event.stage) for event in events] == [("error", None)]
+    assert report == {"error": "No contract code provided for audit", "status": "error"}
+
+
+def test_returning_early_closes_the_stream_and_cancels_its_stages(make_cloud, upstreams):
+    stand_ins = upstreams(rag=LatencyProfile(mean_ms=5000))
+    baseline = in_flight()
+
+    async def run():
+        cloud = make_cloud()
+        try:
+            # The comprehensive audit returns on `completed`; its stream is finalized before it returns
+            await cloud.audit_contract_comprehensive({"contract_code": CONTRACT, "timeout_seconds": 0.2})
+            after_report = in_flight()
+
+            started = time.perf_counter()
+            async with aclosing(cloud.audit_contract_stream({"contract_code": CONTRACT, "use_cache": False})) as stream:
+                async for event in stream:
+                    if event.type == "partial_result":
+                        break
+            return after_report, in_flight(), time.perf_counter() - started
+        finally:
+            await cloud.aclose()
+
+    after_report, after_break, elapsed = asyncio.run(run())
+    assert after_report == after_break == baseline
+    # The slow RAG stage was cancelled rather than awaited
+    assert elapsed < 2 and stand_ins.calls["rag"] >= 1
+
+
+def test_events_serialize_without_the_web_framework(gateway_dir):
+    # Workers and scripts import the audit code without starlette/fastapi installed
+    script = (
+        "import sys\n"
+        "class Blocked:\n"
+        "    def find_spec(self, name, path=None, target=None):\n"
+        "        if name.split('.')[0] in ('starlette', 'fastapi'):\n"
+        "            raise ImportError(name)\n"
+        "sys.meta_path.insert(0, Blocked())\n"
+        "from audit_events import AuditEvent\n"
+        "print(AuditEvent('started', 1.5, data={'n': 1}).to_ndjson(), end='')\n"
+    )
+    output = subprocess.run([sys.executable, "-c", script], cwd=gateway_dir, capture_output=True, text=True, check=True)
+    assert output.stdout.startswith('{"type":"started","stage":null,"elapsed_ms":1.5,')
@@ -0,0 +1,106 @@
+import asyncio
+from contextlib import aclosing
+
+
+def instrument(cloud):
+    """Replace the single-contract audit with one that sleeps `delay` and tracks concurrency"""
+    tracking = {"running": 0, "peak": 0, "started": []}
+
+    async def audit(contract_data):
+        tracking["running"] += 1
+        tracking["peak"] = max(tracking["peak"], tracking["running"])
+        tracking["started"].append(contract_data["contract_name"])
+        try:
+            await asyncio.sleep(contract_data["delay"])
+            return {"contract_name": contract_data["contract_name"], "overall_status": "completed"}
+        finally:
+            tracking["running"] -= 1
+
+    cloud.audit_contract_comprehensive = audit
+    return tracking
+
+
+def test_batch_streams_reports_in_completion_order_within_the_concurrency_bound(make_cloud):
+    delays = [0.3, 0.02, 0.04, 0.01, 0.03]
+    contracts = [{"contract_name": f"C{i}", "delay": delay} for i, delay in enumerate(delays)]
+
+    async def run():
+        cloud = make_cloud()
+        tracking = instrument(cloud)
+        try:
+            return [report async for report in cloud.audit_contracts_batch(contracts, concurrency=2)], tracking
+        finally:
+            await cloud.aclose()
+
+    reports, tracking = asyncio.run(run())
+    assert tracking["peak"] == 2
+    # C0 holds one worker throughout while the other drains C1..C4 in turn
+    assert [report["batch_index"] for report in reports] == [1, 2, 3, 4, 0]
+    assert all(report["contract_name"] == f"C{report['batch_index']}" for report in reports)
+
+
+def test_invalid_entries_fail_alone(make_cloud):
+    contracts = [
+        {"contract_code": "contract A { function f() external {} }", "contract_name": "A"},
+        "contract B {}",
+        {"contract_code": "   ", "contract_name": "Empty"},
+    ]
+
+    async def run():
+        cloud = make_cloud()
+        try:
+            return [report async for report in cloud.audit_contracts_batch(contracts, concurrency=3)]
+        finally:
+            await cloud.aclose()
+
+    reports = {report["batch_index"]: report for report in asyncio.run(run())}
+    assert sorted(reports) == [0, 1, 2]
+    assert reports[0]["overall_status"] == "completed" and reports[0]["contract_name"] == "A"
+    assert reports[1] == {"error": "Batch entries must be objects with contract_code", "status": "error",
+                          "batch_index": 1}
+    assert reports[2]["status"] == "error" and "No contract code" in reports[2]["error"]
+
+
+def test_closing_the_stream_early_cancels_the_remaining_audits(make_cloud):
+    contracts = [{"contract_name": f"C{i}", "delay": 0.01 if i == 0 else 5} for i in range(6)]
+
+    async def run():
+        cloud = make_cloud()
+        tracking = instrument(cloud)
+        try:
+            async with aclosing(cloud.audit_contracts_batch(contracts, concurrency=2)) as reports:
+                first = await reports.__anext__()
+            return first, tracking
+        finally:
+            await cloud.aclose()
+
+    first, tracking = asyncio.run(asyncio.wait_for(run(), timeout=2))
+    assert first["batch_index"] == 0
+    assert tracking["running"] == 0
+    # Only the contracts already picked up were started; the rest never ran
+    assert len(tracking["started"]) <= 3
+
+
+def test_an_audit_that_raises_is_reported_and_the_stream_still_ends(make_cloud):
+    contracts = [{"contract_name": f"C{i}", "delay": 0.01} for i in range(4)]
+
+    async def run():
+        cloud = make_cloud()
+        instrument(cloud)
+        audit = cloud.audit_contract_comprehensive
+
+        async def flaky(contract_data):
+            if contract_data["contract_name"] == "C1":
+                raise RuntimeError("scanner crashed")
+            return await audit(contract_data)
+
+        cloud.audit_contract_comprehensive = flaky
+        try:
+            return [report async for report in cloud.audit_contracts_batch(contracts, concurrency=2)]
+        finally:
+            await cloud.aclose()
+
+    reports = {report["batch_index"]: report for report in asyncio.run(asyncio.wait_for(run(), timeout=2))}
+    assert sorted(reports) == [0, 1, 2, 3]
+    assert reports[1] == {"error": "Batch audit failed: scanner crashed", "status": "error", "batch_index": 1}
+    assert all(reports[index]["overall_status"] == "completed" for index in (0, 2, 3))
@@ -0,0 +1,41 @@
+import asyncio
+
+from contract_templates import template_engine
+
+
+def test_parameters_that_would_change_the_skeleton_are_rejected():
+    assert template_engine.invalid_parameters("erc20", {"name": "Launch", "symbol": "LNCH", "premint": 1000}) == []
+    problems = template_engine.invalid_parameters("erc20", {"name": "X { function drain() }", "symbol": "TOOLONGSYMBOL1"})
+    assert len(problems) == 2
+    assert template_engine.invalid_parameters("erc721", {"name": "Art", "baseUri": 'ipfs://x"; }'}) != []
+
+
+def test_render_many_matches_single_renders():
+    requirements = [{"name": f"Tok{i}", "symbol": f"T{i}", "burnable": i % 2 == 0} for i in range(4)]
+    batch = template_engine.render_many("erc20", requirements, generated_on="2026-01-01")
+    assert [c.contract_name for c in batch] == ["Tok0", "Tok1", "Tok2", "Tok3"]
+    assert batch[1] == template_engine.render("erc20", requirements[1], generated_on="2026-01-01")
+
+
+def test_batch_audits_each_skeleton_once(upstreams, make_cloud):
+    stand_ins = upstreams()
+
+    async def run():
+        cloud = make_cloud()
+        tokens = [{"name": f"Tok{i}", "symbol": f"T{i}", "premint": i, "pausable": i % 2 == 0} for i in range(40)]
+        tokens.append({"name": "not valid"})
+        try:
+            return [item async for item in cloud.generate_contracts_batch({"tokens": tokens})]
+        finally:
+            await cloud.aclose()
+
+    items = asyncio.run(run())
+    summary = items[-1]
+    assert summary["type"] == "summary"
+    assert (summary["contracts"], summary["skeletons"], summary["errors"]) == (40, 2, 1)
+    assert stand_ins.calls["chaingpt"] == 2
+    skeletons = {item["skeleton_id"] for item in items if item["type"] == "skeleton_audit"}
+    contracts = [item for item in items if item["type"] == "contract"]
+    assert {item["skeleton_id"] for item in contracts} == skeletons
+    by_index = {item["batch_index"]: item["generation"]["contract_name"] for item in contracts}
+    assert by_index == {i: f"Tok{i}" for i in range(40)}
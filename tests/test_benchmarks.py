@@ -0,0 +1,115 @@
+import json
+import random
+import asyncio
+import urllib.error
+import urllib.request
+
+import pytest
+
+from standins import LatencyProfile, OpenZeppelinStandInServer, UpstreamError
+from bench_auditooor import compare_with_baseline, main, percentile, run_load
+
+
+def post(url, payload):
+    request = urllib.request.Request(url, data=json.dumps(payload).encode(), method="POST",
+                                     headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_latency_profiles_are_reproducible_and_never_negative():
+    profile = LatencyProfile(mean_ms=10, jitter_ms=50)
+    first = [profile.sample_seconds(random.Random(3)) for _ in range(3)]
+    assert first == [profile.sample_seconds(random.Random(3)) for _ in range(3)]
+    assert all(sample >= 0 for sample in (profile.sample_seconds(random.Random(seed)) for seed in range(50)))
+    assert LatencyProfile(mean_ms=250).sample_seconds(random.Random()) == 0.25
+    assert not LatencyProfile().should_fail(random.Random())
+
+
+def test_stand_ins_count_calls_and_raise_on_failure(upstreams):
+    failing = upstreams(chaingpt=LatencyProfile(error_rate=1.0), rag=LatencyProfile(error_rate=1.0))
+    from Tools.chaingpt_audit_tool import analyze_contract_security
+    import cloudflare_rag_cloud
+
+    with pytest.raises(UpstreamError, match="ChainGPT stand-in failure"):
+        analyze_contract_security({"contract_name": "A"})
+    with pytest.raises(UpstreamError, match="RAG stand-in failure"):
+        asyncio.run(cloudflare_rag_cloud.search_serviceflow_docs_rag("reentrancy"))
+    # Failed calls still reached the upstream
+    assert failing.calls == {"chaingpt": 1, "rag": 1}
+
+    healthy = upstreams()
+    from Tools.chaingpt_audit_tool import audit_contract_with_chaingpt
+    assert audit_contract_with_chaingpt({"contract_name": "A"})["status"] == "success"
+    assert healthy.calls == {"chaingpt": 1, "rag": 0} and failing.calls["chaingpt"] == 1
+
+
+def test_openzeppelin_stand_in_serves_contracts_and_failures():
+    server = OpenZeppelinStandInServer().start()
+    failing = OpenZeppelinStandInServer(LatencyProfile(error_rate=1.0)).start()
+    try:
+        status, body = post(server.url + "/erc721", {"name": "Art"})
+        assert status == 200 and body["contract_code"] == "// erc721 stand-in\ncontract Art {}\n"
+        assert post(failing.url + "/erc20", {}) == (503, {"error": "stand-in failure"})
+        assert server.requests == failing.requests == 1
+    finally:
+        server.stop()
+        failing.stop()
+    server.stop()  # stopping twice is harmless
+
+
+def test_load_runs_count_exceptions_and_partial_reports_as_errors():
+    async def request(i):
+        await asyncio.sleep(0.001 * (i % 3))
+        if i % 5 == 0:
+            raise UpstreamError("down")
+        if i % 5 == 1:
+            return {"overall_status": "partial"}
+        if i % 5 == 2:
+            return {"audit": {"overall_status": "partial"}}
+        return {"overall_status": "completed"}
+
+    stats = asyncio.run(run_load(request, total=20, concurrency=4))
+    assert stats["requests"] == 20 and stats["concurrency"] == 4
+    assert stats["errors"] == 12
+    assert 0 <= stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"]
+    assert percentile([], 0.5) == 0.0 and percentile([1.0, 2.0, 3.0], 0.99) == 3.0
+
+
+def test_baseline_comparison_flags_latency_and_throughput_regressions():
+    baseline = {
+        "audit@1": {"p95_ms": 100.0, "throughput_rps": 50.0},
+        "audit@8": {"p95_ms": 0.0, "throughput_rps": 0.0},
+    }
+    results = {
+        "audit@1": {"p95_ms": 120.0, "throughput_rps": 40.0},
+        "audit@8": {"p95_ms": 500.0, "throughput_rps": 1.0},
+        "audit@32": {"p95_ms": 900.0, "throughput_rps": 1.0},
+    }
+    assert compare_with_baseline(results, baseline, tolerance=0.1) == [
+        "audit@1: p95 100.0ms -> 120.0ms",
+        "audit@1: throughput 50.0 -> 40.0 req/s",
+    ]
+    # Within tolerance, missing baselines and zero baselines are not regressions
+    assert compare_with_baseline(results, baseline, tolerance=0.25) == []
+
+
+def test_benchmark_run_saves_a_baseline_and_fails_on_regression(tmp_path, monkeypatch, capsys):
+    monkeypatch.setenv("OZ_MCP_URL", "http://127.0.0.1:9")
+    baseline = tmp_path / "baseline.json"
+    quick = ["--scenarios", "audit,erc20_template", "--concurrency", "1,2", "--requests", "4", "--no-memory",
+             "--chaingpt-ms", "0", "--rag-ms", "0", "--oz-ms", "0", "--rag-error-rate", "1"]
+
+    assert main(quick + ["--save-baseline", str(baseline)]) == 0
+    results = json.loads(baseline.read_text())
+    assert sorted(results) == ["audit@1", "audit@2", "erc20_template@1", "erc20_template@2"]
+    # Every audit loses its RAG stage, while template generation does not touch RAG
+    assert results["audit@2"]["errors"] == 4 and results["erc20_template@2"]["errors"] == 0
+
+    impossible = {key: dict(stats, p95_ms=1e-6, throughput_rps=1e9) for key, stats in results.items()}
+    baseline.write_text(json.dumps(impossible))
+    assert main(quick + ["--baseline", str(baseline)]) == 1
+    assert "Regressions against baseline" in capsys.readouterr().out
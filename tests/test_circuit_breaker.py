@@ -0,0 +1,41 @@
+import time
+
+from circuit_breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+
+
+def test_breaker_trips_and_recovers_through_half_open_probe():
+    breaker = CircuitBreaker("oz", failure_threshold=2, cooldown_seconds=0.05)
+    assert breaker.allow_request()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow_request()
+
+    time.sleep(0.06)
+    assert breaker.allow_request()
+    assert breaker.state == HALF_OPEN
+    # Only one probe at a time while half-open
+    assert not breaker.allow_request()
+
+    breaker.record_success(0.1)
+    assert breaker.state == CLOSED
+    stats = breaker.stats()
+    assert stats["trip_count"] == 1 and stats["short_circuited"] == 2
+
+
+def test_failed_probe_reopens_breaker():
+    breaker = CircuitBreaker("oz", failure_threshold=1, cooldown_seconds=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.trip_count == 2
+
+
+def test_adaptive_timeout_follows_p95_latency():
+    breaker = CircuitBreaker("oz", min_timeout=0.5, max_timeout=30, timeout_multiplier=2)
+    assert breaker.current_timeout() == 30
+    for _ in range(100):
+        breaker.record_success(0.4)
+    assert breaker.current_timeout() == 0.8
@@ -0,0 +1,75 @@
+import asyncio
+
+from contract_chunker import KnownLibraryIndex, plan_chunks, split_contract_chunks
+
+LIBRARY = """// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.20;
+
+abstract contract Context {
+    function _msgSender() internal view virtual returns (address) {
+        return msg.sender;
+    }
+}
+"""
+
+HELPER = """
+library Math {
+    function max(uint256 a, uint256 b) internal pure returns (uint256) { return a > b ? a : b; }
+}
+"""
+
+VAULT = """
+contract Vault is Context {
+    function withdraw(uint256 amount) external {
+        payable(_msgSender()).transfer(amount);
+    }
+}
+"""
+
+# Flattened: library re-indented without comments, a helper inlined twice
+FLATTENED = (
+    "pragma solidity ^0.8.20;\n"
+    + LIBRARY.split("pragma solidity ^0.8.20;\n")[1].replace("    ", "  ")
+    + HELPER + VAULT + HELPER
+)
+
+
+def test_chunks_split_at_contract_boundaries():
+    chunks = split_contract_chunks(FLATTENED)
+    assert [(chunk.kind, chunk.name) for chunk in chunks] == [
+        ("source", "<source>"), ("contract", "Context"), ("contract", "Math"),
+        ("contract", "Vault"), ("contract", "Math#2"),
+    ]
+    assert chunks[1].code.startswith("abstract contract Context")
+
+
+def test_plan_dedupes_chunks_and_skips_known_libraries(tmp_path):
+    (tmp_path / "utils").mkdir()
+    (tmp_path / "utils" / "Context.sol").write_text(LIBRARY)
+    index = KnownLibraryIndex([str(tmp_path)])
+
+    plan = plan_chunks(FLATTENED, index)
+    assert plan.known_libraries == {"Context": "utils/Context.sol:Context"}
+    assert [[chunk.name for chunk in chunks] for chunks in plan.occurrences.values()] == [["Math", "Math#2"], ["Vault"]]
+    assert plan.summary() == {"chunks": 5, "audited_chunks": 2, "duplicate_chunks": 1, "skipped_library_chunks": 1}
+
+
+def test_chunked_audit_remaps_findings_to_original_lines(upstreams, make_cloud):
+    stand_ins = upstreams()
+
+    source = FLATTENED + "".join(f"\ncontract Filler{i} {{ uint256 public value; }}" for i in range(5))
+
+    async def run():
+        cloud = make_cloud(known_libraries=KnownLibraryIndex([]))
+        cloud.chunk_min_lines = 1
+        calls_before = stand_ins.calls["chaingpt"]
+        report = await cloud.audit_contract_comprehensive({"contract_code": source, "use_cache": False})
+        await cloud.aclose()
+        return report, stand_ins.calls["chaingpt"] - calls_before, cloud.scanner.scan(source)
+
+    report, chaingpt_calls, full_scan = asyncio.run(run())
+    assert report["overall_status"] == "completed"
+    # Context, Math (once), Vault and the fillers
+    assert chaingpt_calls == 8
+    assert report["chunking"]["duplicate_chunks"] == 1
+    assert report["static_findings"] == [finding.to_dict() for finding in full_scan.findings]
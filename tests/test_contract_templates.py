@@ -0,0 +1,29 @@
+from contract_templates import ContractTemplate, ContractTemplateEngine, ERC20_TEMPLATE, template_engine
+
+
+def test_erc20_render_reflects_feature_flags():
+    rendered = template_engine.render("erc20", {"name": "Tok", "symbol": "TK", "pausable": True, "mintable": False})
+    assert "contract Tok is ERC20, Ownable, ReentrancyGuard, Pausable {" in rendered.contract_code
+    assert "function pause()" in rendered.contract_code
+    assert "function mint(" not in rendered.contract_code
+    assert rendered.features == {"mintable": False, "burnable": False, "pausable": True, "premint": "1000000"}
+    assert rendered.generated_on in rendered.contract_code
+
+
+def test_precompile_builds_one_skeleton_per_feature_combination():
+    engine = ContractTemplateEngine()
+    engine.register("erc20", ERC20_TEMPLATE)
+    assert engine.precompile() == 8
+
+
+def test_new_contract_types_register_without_engine_changes():
+    engine = ContractTemplateEngine()
+    engine.register("vesting", ContractTemplate(
+        contract_type="Vesting",
+        feature_flags={"revocable": False},
+        parameters={"name": ("name", "Vesting"), "rate": ("rate", "5")},
+        build_skeleton=lambda flags: "contract ${name} { uint r = ${rate} % 100; }" + (" // revocable" if flags["revocable"] else ""),
+        describe_features=lambda flags, values: flags
+    ))
+    rendered = engine.render("vesting", {"name": "Team", "revocable": True})
+    assert rendered.contract_code == "contract Team { uint r = 5 % 100; } // revocable"
@@ -0,0 +1,107 @@
+import time
+import asyncio
+
+import pytest
+
+from deadlines import Deadline, current_deadline, deadline_scope, hedged, remaining_budget
+
+
+def test_hedge_wins_when_the_first_attempt_stalls():
+    async def run():
+        delays = [1.0, 0.01]
+        cancelled = []
+
+        async def attempt():
+            delay = delays.pop(0)
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                cancelled.append(delay)
+                raise
+            return delay
+
+        started = time.monotonic()
+        result = await hedged("test_upstream", attempt, delay=0.05)
+        elapsed = time.monotonic() - started
+        await asyncio.sleep(0)
+        # Without quota for a hedge the call just waits for the first attempt
+        delays.extend([0.1, 0.01])
+        refused = await hedged("test_upstream", attempt, delay=0.01, can_hedge=lambda: False)
+        return result, elapsed, cancelled, refused
+
+    result, elapsed, cancelled, refused = asyncio.run(run())
+    assert result == 0.01 and elapsed < 0.5
+    assert cancelled == [1.0]
+    assert refused == 0.1
+
+
+def test_nested_deadlines_never_extend_the_outer_budget():
+    with deadline_scope(Deadline.after(5)):
+        inner = Deadline.for_request({"timeout_seconds": 60})
+        assert inner is current_deadline()
+        assert Deadline.for_request({}) is current_deadline()
+        assert Deadline.for_request({"timeout_seconds": 1}).remaining() <= 1
+        assert remaining_budget(30) <= 5
+    assert current_deadline() is None and remaining_budget(30) == 30
+
+
+def test_stages_still_running_at_the_deadline_are_cancelled(upstreams, make_cloud):
+    from standins import LatencyProfile
+    upstreams(chaingpt=LatencyProfile(mean_ms=1000))
+
+    async def run():
+        cloud = make_cloud()
+        started = time.monotonic()
+        report = await cloud.audit_contract_comprehensive({
+            "contract_code": "contract Slow { function f() public {} }", "use_cache": False, "timeout_seconds": 0.2
+        })
+        elapsed = time.monotonic() - started
+        await cloud.aclose()
+        return report, elapsed
+
+    report, elapsed = asyncio.run(run())
+    assert elapsed < 0.8
+    assert report["overall_status"] == "partial"
+    assert report["chaingpt_analysis"]["error"] == "chaingpt stage stopped at the request deadline"
+    assert report["stage_status"]["chaingpt"]["status"] == "timeout"
+    assert report["stage_status"]["static"]["status"] == "success"
+
+
+def test_incremental_audits_honor_timeout_seconds(upstreams, make_cloud):
+    from standins import LatencyProfile
+    upstreams(chaingpt=LatencyProfile(mean_ms=1000))
+
+    async def run():
+        cloud = make_cloud()
+        started = time.monotonic()
+        report = await cloud.audit_contract_incremental({
+            "project_id": "slow", "contract_code": "contract Slow { function f() public {} }", "timeout_seconds": 0.2
+        })
+        elapsed = time.monotonic() - started
+        await cloud.aclose()
+        return report, elapsed
+
+    report, elapsed = asyncio.run(run())
+    assert elapsed < 0.8
+    assert report["overall_status"] == "partial"
+    assert report["stage_status"]["chaingpt"]["status"] == "timeout"
+
+
+def test_an_invalid_timeout_is_reported_rather_than_raised(make_cloud):
+    for seconds in ("soon", -1, float("inf"), [5]):
+        with pytest.raises(ValueError, match="timeout_seconds must be a positive number"):
+            Deadline.for_request({"timeout_seconds": seconds})
+
+    async def run():
+        cloud = make_cloud()
+        try:
+            audit = await cloud.audit_contract_comprehensive({
+                "contract_code": "contract A { function f() public {} }", "timeout_seconds": "soon"
+            })
+            generated = await cloud.generate_contract_with_audit({"contract_type": "erc20", "timeout_seconds": "soon"})
+            return audit, generated
+        finally:
+            await cloud.aclose()
+
+    expected = {"error": "timeout_seconds must be a positive number of seconds, got 'soon'", "status": "error"}
+    assert asyncio.run(run()) == (expected, expected)
@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from gateway_metrics import Counter, Gauge, Histogram, MetricsRegistry
+
+
+def sample(text, line_prefix):
+    """Value of the one exposition line starting with `line_prefix`"""
+    values = [line.rsplit(" ", 1)[1] for line in text.splitlines() if line.startswith(line_prefix + " ")]
+    assert len(values) == 1, (line_prefix, values)
+    return float(values[0])
+
+
+def test_exposition_format_escapes_labels_and_accumulates_buckets():
+    registry = MetricsRegistry()
+    requests = Counter("requests_total", "Requests", ("path",), registry=registry)
+    latency = Histogram("latency_seconds", "Latency", buckets=(0.1, 1.0), registry=registry)
+    queued = Gauge("queued", "Queued", registry=registry)
+
+    requests.labels('/a"b\n').inc()
+    requests.labels(path='/a"b\n').inc(2)
+    for value in (0.05, 0.1, 0.5, 3):
+        latency.observe(value)
+    queued.set(4)
+    queued.dec()
+
+    text = registry.render()
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{path="/a\\"b\\n"} 3' in text
+    assert 'latency_seconds_bucket{le="0.1"} 2' in text
+    assert 'latency_seconds_bucket{le="1"} 3' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 4' in text
+    assert "latency_seconds_count 4" in text and "latency_seconds_sum 3.65" in text
+    assert "queued 3" in text
+    assert latency.quantile(0.5) == 0.1 and latency.quantile(0.99) == float("inf")
+
+
+def test_labelled_metrics_must_be_used_through_labels():
+    registry = MetricsRegistry()
+    outcomes = Counter("outcomes_total", "Outcomes", ("status",), registry=registry)
+    with pytest.raises(AttributeError):
+        outcomes.inc()
+    with pytest.raises(KeyError):
+        outcomes.labels(other="x")
+    # Nothing was recorded by the failed calls
+    assert registry.render().splitlines()[2:] == []
+
+
+def test_audits_record_stage_outcomes_and_latency_on_the_scrape_endpoint(upstreams, make_cloud):
+    from standins import LatencyProfile
+    upstreams(chaingpt=LatencyProfile(error_rate=1.0))
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from auditooor_routes import auditooor_router
+    from gateway_metrics import REGISTRY, PROMETHEUS_CONTENT_TYPE
+
+    app = FastAPI()
+    app.include_router(auditooor_router)
+    client = TestClient(app)
+
+    def scrape():
+        response = client.get(auditooor_router.prefix + "/metrics")
+        assert response.headers["content-type"] == PROMETHEUS_CONTENT_TYPE
+        return response.text
+
+    def counts(text):
+        return (
+            sample(text, 'auditooor_stage_outcomes_total{stage="chaingpt",status="error"}'),
+            sample(text, 'auditooor_stage_duration_seconds_count{stage="rag"}'),
+            sample(text, 'auditooor_request_duration_seconds_count{operation="audit"}'),
+        )
+
+    async def run():
+        cloud = make_cloud()
+        try:
+            for _ in range(2):
+                await cloud.audit_contract_comprehensive({"contract_code": "contract A { function f() external {} }"})
+        finally:
+            await cloud.aclose()
+
+    # The labels exist once any audit has run, so earlier tests in the session only shift the baseline
+    asyncio.run(run())
+    before = counts(scrape())
+    asyncio.run(run())
+    assert [after - prior for after, prior in zip(counts(scrape()), before)] == [2, 2, 2]
+    assert scrape() == REGISTRY.render()
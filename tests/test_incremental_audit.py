@@ -0,0 +1,90 @@
+import asyncio
+
+from solidity_source import split_source_units
+
+CONTRACT = """pragma solidity ^0.8.20;
+
+contract Vault {
+    uint256 public total; // function fake() {
+    string note = "function nope() {}";
+
+    modifier positive(uint256 amount) { require(amount > 0); _; }
+
+    function deposit() external payable {
+        total += msg.value;
+    }
+
+    function withdraw(uint256 amount) external positive(amount) {
+        payable(msg.sender).transfer(amount);
+    }
+}
+"""
+
+
+def test_units_cover_contract_members_and_ignore_comments_and_strings():
+    units = split_source_units(CONTRACT)
+    assert [(unit.kind, unit.name) for unit in units] == [
+        ("source", "<source>"),
+        ("contract", "Vault"),
+        ("modifier", "Vault.positive"),
+        ("function", "Vault.deposit"),
+        ("function", "Vault.withdraw"),
+        ("contract", "Vault#2"),
+    ]
+    withdraw = units[4]
+    assert CONTRACT[withdraw.start:withdraw.end] == withdraw.code
+    assert (withdraw.start_line, withdraw.start_column) == (13, 5)
+
+
+def test_reaudit_only_touches_changed_units_and_diffs_findings(upstreams, make_cloud):
+    stand_ins = upstreams()
+
+    edited = CONTRACT.replace("payable(msg.sender).transfer(amount);", "total -= amount;")
+
+    async def run():
+        cloud = make_cloud()
+        first = await cloud.audit_contract_incremental({"contract_code": CONTRACT, "project_id": "vault"})
+        calls_after_first = stand_ins.calls["chaingpt"]
+        second = await cloud.audit_contract_incremental({"contract_code": edited, "project_id": "vault"})
+        full = await cloud.audit_contract_comprehensive({"contract_code": edited, "use_cache": False})
+        third = await cloud.audit_contract_incremental({"contract_code": edited, "project_id": "vault"})
+        await cloud.aclose()
+        return first, calls_after_first, second, full, third
+
+    first, calls_after_first, second, full, third = asyncio.run(run())
+    assert first["incremental"]["chaingpt_scope"] == "full"
+    assert second["incremental"]["chaingpt_scope"] == "changed_units"
+    assert second["incremental"]["changed_units"] == ["Vault.withdraw"]
+    assert second["incremental"]["new_findings"] == []
+    assert {f["rule"] for f in second["incremental"]["resolved_findings"]} == {"payable", "transfer"}
+    # Merged results match a from-scratch audit of the edited source
+    assert second["static_findings"] == full["static_findings"]
+    assert second["security_recommendations"] == full["security_recommendations"]
+    assert stand_ins.calls["chaingpt"] == calls_after_first + 2
+
+    # An unchanged revision reuses the analyses, which still cover the whole contract
+    assert third["incremental"]["chaingpt_scope"] == "reused"
+    analysis = third["chaingpt_analysis"]
+    assert analysis["baseline"] == first["chaingpt_analysis"]
+    assert [entry["unit"] for entry in analysis["units"]] == ["Vault.withdraw"]
+    assert "Vault.deposit" in analysis["baseline_covers"] and "Vault.withdraw" not in analysis["baseline_covers"]
+    assert third["chaingpt_analysis"] == second["chaingpt_analysis"]
+
+
+def test_project_state_is_scoped_to_the_tenant(make_cloud):
+    edited = CONTRACT.replace("payable(msg.sender).transfer(amount);", "total -= amount;")
+
+    async def run():
+        cloud = make_cloud()
+        await cloud.audit_contract_incremental({"contract_code": CONTRACT, "project_id": "vault"}, tenant="key:a")
+        other = await cloud.audit_contract_incremental({"contract_code": edited, "project_id": "vault"}, tenant="key:b")
+        owner = await cloud.audit_contract_incremental({"contract_code": edited, "project_id": "vault"}, tenant="key:a")
+        await cloud.aclose()
+        return other, owner
+
+    other, owner = asyncio.run(run())
+    # Tenant b starts its own baseline and learns nothing about tenant a's earlier findings
+    assert other["incremental"]["chaingpt_scope"] == "full"
+    assert other["incremental"]["resolved_findings"] == []
+    assert owner["incremental"]["chaingpt_scope"] == "changed_units"
+    assert owner["incremental"]["resolved_findings"] != []
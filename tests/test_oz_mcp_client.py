@@ -0,0 +1,94 @@
+import json
+import asyncio
+
+import httpx
+import pytest
+
+from oz_mcp_client import OpenZeppelinMCPClient
+
+
+def _client(handler):
+    return OpenZeppelinMCPClient(base_url="http://oz.test", transport=httpx.MockTransport(handler),
+                                 sync_transport=httpx.MockTransport(handler))
+
+
+def test_calls_share_one_pooled_client_and_return_the_source():
+    seen = []
+
+    def handler(request):
+        seen.append((request.url.path, json.loads(request.content)))
+        return httpx.Response(200, json={"contract_code": "contract T {}"})
+
+    async def run():
+        client = _client(handler)
+        first = await client.generate("erc20", {"name": "T"})
+        pool = client._async_client
+        second = await client.generate("erc721", {"name": "N"})
+        reused = client._async_client is pool
+        await client.aclose()
+        return first, second, reused
+
+    first, second, reused = asyncio.run(run())
+    assert first == second == "contract T {}" and reused
+    assert seen == [("/erc20", {"name": "T"}), ("/erc721", {"name": "N"})]
+    assert _client(handler).generate_sync("erc20", {}) == "contract T {}"
+
+
+@pytest.mark.parametrize("response, outcome", [
+    (httpx.Response(404), None),
+    (httpx.Response(200, json={"other": 1}), None),
+    (httpx.Response(503), httpx.HTTPStatusError),
+    (httpx.Response(200, content=b"not json"), ValueError),
+    (httpx.Response(200, json=["contract T {}"]), ValueError),
+    (httpx.Response(200, json=None), ValueError),
+    (httpx.Response(200, json={"contract_code": 7}), ValueError),
+])
+def test_unusable_responses(response, outcome):
+    client = _client(lambda request: response)
+    if outcome is None:
+        assert client.generate_sync("erc20", {}) is None
+    else:
+        with pytest.raises(outcome):
+            client.generate_sync("erc20", {})
+
+
+def test_generators_fall_back_to_templates_on_a_non_object_body(make_cloud):
+    async def run():
+        cloud = make_cloud(oz_client=_client(lambda request: httpx.Response(200, json="contract T {}")))
+        try:
+            return (await cloud.generate_erc20_template_async({"name": "Tok", "symbol": "TK"}),
+                    cloud.generate_erc721_template({"name": "Nft", "symbol": "NF"}),
+                    cloud.oz_breaker.failures)
+        finally:
+            await cloud.aclose()
+
+    erc20, erc721, failures = asyncio.run(run())
+    assert erc20["status"] == erc721["status"] == "success"
+    assert "contract Tok" in erc20["contract_code"] and "contract Nft" in erc721["contract_code"]
+    assert failures == 2
+
+
+def test_a_half_open_probe_that_raises_unexpectedly_reopens_the_breaker(make_cloud):
+    from circuit_breaker import CircuitBreaker, OPEN
+
+    def handler(request):
+        raise RuntimeError("unexpected client bug")
+
+    async def run():
+        cloud = make_cloud(oz_client=_client(handler))
+        cloud.oz_breaker = CircuitBreaker("openzeppelin", failure_threshold=1, cooldown_seconds=0)
+        cloud.oz_breaker.record_failure()
+        try:
+            outcomes = []
+            # The cool-down is zero, so each call is a fresh half-open probe; a stuck probe would short-circuit
+            for generate in (cloud.generate_erc20_template_async, cloud.generate_erc20_template):
+                result = generate({"name": "Tok", "symbol": "TK"})
+                result = await result if asyncio.iscoroutine(result) else result
+                outcomes.append((result["status"], cloud.oz_breaker.state, cloud.oz_breaker.short_circuited))
+            return outcomes, cloud.oz_breaker.failures
+        finally:
+            await cloud.aclose()
+
+    outcomes, failures = asyncio.run(run())
+    assert outcomes == [("success", OPEN, 0), ("success", OPEN, 0)]
+    assert failures == 3
@@ -0,0 +1,55 @@
+import gzip
+import json
+
+from starlette.requests import Request
+
+from response_encoding import encoded_response, negotiate_encoding, shape
+
+
+def _result():
+    return {
+        "generation": {"contract_code": "contract T {}", "contract_name": "T", "status": "success"},
+        "audit": {
+            "chaingpt_analysis": {"analysis": "long"},
+            "documentation_insights": "long",
+            "security_recommendations": ["Use SafeERC20"],
+            "overall_status": "completed"
+        },
+        "combined_status": "success"
+    }
+
+
+def test_views_and_fields_project_without_touching_the_original():
+    result = _result()
+    compact = shape(result, "compact")
+    assert "contract_code" not in compact["generation"] and "chaingpt_analysis" not in compact["audit"]
+    assert compact["audit"]["security_recommendations"] == ["Use SafeERC20"]
+
+    recommendations = shape(result, "recommendations")
+    assert set(recommendations["audit"]) == {"security_recommendations", "overall_status"}
+    assert recommendations["combined_status"] == "success"
+
+    projected = shape(result, fields="audit", exclude="audit.documentation_insights")
+    assert set(projected) == {"audit", "combined_status"} and "documentation_insights" not in projected["audit"]
+    assert result == _result()
+
+
+def test_encoding_follows_accept_encoding_weights():
+    assert negotiate_encoding("gzip, deflate, br") == "gzip"
+    assert negotiate_encoding("gzip;q=0") is None
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("*;q=0.5") == "gzip"
+    assert negotiate_encoding(None) is None
+
+
+def test_large_responses_are_compressed_small_ones_are_not():
+    def request(accept_encoding):
+        return Request({"type": "http", "method": "GET", "path": "/", "headers": [(b"accept-encoding", accept_encoding)]})
+
+    large = {"static_findings": [{"rule": "reentrancy", "line": line} for line in range(200)]}
+    response = encoded_response(request(b"gzip"), large)
+    assert response.headers["content-encoding"] == "gzip" and response.headers["vary"] == "Accept-Encoding"
+    assert json.loads(gzip.decompress(response.body)) == large
+
+    small = encoded_response(request(b"gzip"), {"status": "ok"})
+    assert "content-encoding" not in small.headers and json.loads(small.body) == {"status": "ok"}
@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    calls = []
+
+    async def upstream(value):
+        calls.append(value)
+        await asyncio.sleep(0.01)
+        return value * 2
+
+    async def run():
+        flight = SingleFlight("rag")
+        results = await asyncio.gather(*(flight.do("q", lambda: upstream(21)) for _ in range(10)))
+        # Once finished, the next call goes upstream again
+        again = await flight.do("q", lambda: upstream(1))
+        return flight, results, again
+
+    flight, results, again = asyncio.run(run())
+    assert results == [42] * 10
+    assert again == 2
+    assert calls == [21, 1]
+    assert flight.stats() == {"in_flight": 0, "executed": 2, "shared": 9}
+
+
+def test_errors_propagate_to_every_waiter():
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream down")
+
+    async def run():
+        flight = SingleFlight("chaingpt")
+        return await asyncio.gather(*(flight.do("h", failing) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_cancelling_one_waiter_keeps_the_shared_call_alive():
+    async def slow():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def run():
+        flight = SingleFlight("rag")
+        first = asyncio.create_task(flight.do("q", slow))
+        second = asyncio.create_task(flight.do("q", slow))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(run()) == "done"
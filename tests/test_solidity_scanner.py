@@ -0,0 +1,32 @@
+from solidity_scanner import SecurityRule, SolidityScanner, default_scanner
+
+CONTRACT = """contract Vault {
+    // selfdestruct is never called here
+    string note = "uses delegatecall";
+    function deposit() external payable {}
+    function mint(address to) external onlyOwner { _mint(to, 1); }
+}"""
+
+
+def test_scanner_ignores_comments_and_strings_and_reports_locations():
+    result = default_scanner.scan(CONTRACT)
+    assert not result.matched("selfdestruct")
+    assert not result.matched("delegatecall")
+
+    payable = [f for f in result.findings if f.rule_id == "payable"]
+    assert [(f.line, f.column) for f in payable] == [(4, 33)]
+
+
+def test_unless_rules_suppress_recommendations():
+    recommendations = default_scanner.recommendations(default_scanner.scan(CONTRACT))
+    assert any("payable" in r for r in recommendations)
+    # _mint is guarded because onlyOwner is present
+    assert not any("minting" in r for r in recommendations)
+
+
+def test_registered_rules_join_the_combined_matcher():
+    scanner = SolidityScanner(default_scanner.rules)
+    scanner.register(SecurityRule("tx_origin", r"\btx\.origin\b", "Avoid tx.origin for authorization", "high"))
+    result = scanner.scan("function f() { require(tx.origin == owner); }")
+    assert result.matched("tx_origin")
+    assert "Avoid tx.origin for authorization" in scanner.recommendations(result)
@@ -0,0 +1,78 @@
+import sys
+import asyncio
+import subprocess
+
+CONTRACT = "contract A { function f() external {} }"
+
+
+def test_importing_the_gateway_leaves_the_integrations_unloaded(gateway_dir):
+    script = (
+        "import sys, auditooor_cloud\n"
+        "assert not {'Tools.chaingpt_audit_tool', 'cloudflare_rag_cloud'} & set(sys.modules)\n"
+        "assert not {'Tools.chaingpt_audit_tool', 'cloudflare_rag_cloud'} & set(auditooor_cloud.IMPORT_TIMINGS)\n"
+        "assert 'audit_cache' in auditooor_cloud.IMPORT_TIMINGS\n"
+    )
+    subprocess.run([sys.executable, "-c", script], cwd=gateway_dir, check=True)
+
+
+def test_timed_import_records_only_the_first_import(tmp_path, monkeypatch):
+    from auditooor_cloud import IMPORT_TIMINGS, _timed_import
+    (tmp_path / "warm_up_probe.py").write_text("VALUE = 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "warm_up_probe", raising=False)
+    try:
+        assert _timed_import("warm_up_probe").VALUE == 1
+        first = IMPORT_TIMINGS["warm_up_probe"]
+        (tmp_path / "warm_up_probe.py").write_text("VALUE = 2\n")
+        assert _timed_import("warm_up_probe").VALUE == 1
+        assert IMPORT_TIMINGS["warm_up_probe"] == first
+    finally:
+        IMPORT_TIMINGS.pop("warm_up_probe", None)
+        sys.modules.pop("warm_up_probe", None)
+
+
+def test_readiness_follows_the_startup_warm_up(monkeypatch, make_cloud):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    import auditooor_cloud
+    import auditooor_routes
+
+    cloud = make_cloud()
+    monkeypatch.setattr(auditooor_cloud, "_auditooor_cloud", cloud)
+    app = FastAPI()
+    app.include_router(auditooor_routes.auditooor_router)
+    prefix = auditooor_routes.auditooor_router.prefix
+
+    # Without the lifespan having run, the probe keeps traffic away
+    cold = TestClient(app)
+    assert cold.get(prefix + "/ready").status_code == 503
+    assert cold.get(prefix + "/startup").json() == {"ready": False}
+
+    with TestClient(app) as client:
+        assert client.get(prefix + "/ready").json() == {"status": "ready"}
+        report = client.get(prefix + "/startup").json()
+    assert report["ready"] and report["errors"] == {}
+    assert {"worker_pool", "import Tools.chaingpt_audit_tool", "import cloudflare_rag_cloud", "templates",
+            "scanner", "known_libraries", "openzeppelin_pool"} == set(report["warm_up_steps_s"])
+
+
+def test_a_failed_integration_import_keeps_the_gateway_unready(make_cloud, upstreams):
+    upstreams()
+    # A None entry makes the import raise, like a missing or broken dependency; the fixture restores it
+    sys.modules["cloudflare_rag_cloud"] = None
+
+    async def run():
+        cloud = make_cloud()
+        try:
+            return await cloud.warm_up(), cloud.ready, await cloud.audit_contract_comprehensive({"contract_code": CONTRACT})
+        finally:
+            await cloud.aclose()
+        
+    report, ready, audit = asyncio.run(run())
+    assert not ready and not report["ready"]
+    assert list(report["errors"]) == ["import cloudflare_rag_cloud"]
+    # The remaining steps still ran, and audits degrade to a partial report instead of failing
+    assert "openzeppelin_pool" in report["warm_up_steps_s"]
+    assert audit["overall_status"] == "partial"
+    assert audit["stage_status"]["rag"]["status"] == "error"
+    assert audit["stage_status"]["chaingpt"]["status"] == "success"